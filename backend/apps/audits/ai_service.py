@@ -1,103 +1,111 @@
-import openai
+import logging
+
 from django.conf import settings
-import json
+from checklist_schema import ChecklistParseError, parse_checklist, require_questions
+from llm_client import OpenAIProvider, get_client
+from prompts import AUDIT_CHECKLIST_PROMPT, RECOMMENDATIONS_PROMPT
+
+logger = logging.getLogger(__name__)
+
+OPENAI_MODEL = "gpt-3.5-turbo"
+
+
+def get_openai_client():
+    return get_client(OpenAIProvider, settings.OPENAI_API_KEY, OPENAI_MODEL, settings.OPENAI_BASE_URL)
+
+# Recorded as the prompt_version of audits that got the fallback checklist
+FALLBACK_PROMPT_VERSION = "fallback"
+
+FALLBACK_CHECKLIST = {
+    "prompt_version": FALLBACK_PROMPT_VERSION,
+    "categories": [
+        {
+            "name": "Documentation Review",
+            "description": "Review of company documentation and policies",
+            "questions": [
+                "Are all required policies documented and up to date?",
+                "Is there evidence of regular policy reviews?",
+                "Are procedures clearly defined and accessible?",
+                "Is document control process implemented?",
+                "Are records maintained according to standards?"
+            ]
+        }
+    ]
+}
+
+
+def audit_prompt_data(audit):
+    """The audit fields used in checklist and recommendation prompts"""
+    return {
+        'company_name': audit.company_name,
+        'industry': audit.industry,
+        'location': audit.location
+    }
+
+
+def checklist_request(audit_data):
+    """Build the checklist request; standard, size and country are optional audit fields"""
+    return AUDIT_CHECKLIST_PROMPT.request(
+        company_name=audit_data['company_name'],
+        industry=audit_data['industry'],
+        standard=audit_data.get('standard', 'applicable'),
+        company_size=audit_data.get('company_size', 'Not specified'),
+        country=audit_data.get('country', audit_data.get('location', 'Not specified')),
+    )
+
+
+def parse_checklist_response(content):
+    """
+    Validate a checklist response against the shared schema and return it as
+    {'prompt_version': ..., 'categories': [...]}. Repairs are logged; output
+    without questions raises ChecklistParseError.
+    """
+    parsed = parse_checklist(content)
+    for diagnostic in parsed.diagnostics:
+        logger.warning("Checklist response: %s", diagnostic)
+    return {'prompt_version': AUDIT_CHECKLIST_PROMPT.tag, **require_questions(parsed).as_dict()}
 
-openai.api_key = settings.OPENAI_API_KEY
 
 class AuditAIService:
     @staticmethod
     def generate_checklist(audit_data):
         """Generate audit checklist using OpenAI"""
-        prompt = f"""
-        Generate a comprehensive audit checklist for the following company:
-        - Company: {audit_data['company_name']}
-        - Industry: {audit_data['industry']}
-        - Standard: {audit_data['standard']}
-        - Size: {audit_data['company_size']}
-        - Country: {audit_data['country']}
-        
-        Create 5-7 categories with 5-8 questions each. Return as JSON with this structure:
-        {{
-            "categories": [
-                {{
-                    "name": "Category Name",
-                    "description": "Category description",
-                    "questions": [
-                        "Question 1 text",
-                        "Question 2 text"
-                    ]
-                }}
-            ]
-        }}
-        
-        Focus on {audit_data['standard']} compliance requirements for {audit_data['industry']} industry.
-        """
-        
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert auditor. Generate comprehensive audit checklists in JSON format."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.7
-            )
-            
-            content = response.choices[0].message.content
-            return json.loads(content)
+            return parse_checklist_response(get_openai_client().generate(checklist_request(audit_data)))
+        except ChecklistParseError as e:
+            logger.warning("Using the fallback checklist: %s", e)
+            return FALLBACK_CHECKLIST
         except Exception as e:
             # Fallback checklist if AI fails
-            return {
-                "categories": [
-                    {
-                        "name": "Documentation Review",
-                        "description": "Review of company documentation and policies",
-                        "questions": [
-                            "Are all required policies documented and up to date?",
-                            "Is there evidence of regular policy reviews?",
-                            "Are procedures clearly defined and accessible?",
-                            "Is document control process implemented?",
-                            "Are records maintained according to standards?"
-                        ]
-                    }
-                ]
-            }
+            return FALLBACK_CHECKLIST
+    
+    @staticmethod
+    async def agenerate_checklist(audit_data):
+        """Async version of generate_checklist for ASGI views"""
+        try:
+            return parse_checklist_response(await get_openai_client().agenerate(checklist_request(audit_data)))
+        except ChecklistParseError as e:
+            logger.warning("Using the fallback checklist: %s", e)
+            return FALLBACK_CHECKLIST
+        except Exception as e:
+            return FALLBACK_CHECKLIST
     
     @staticmethod
     def generate_recommendations(audit_data, responses):
-        """Generate recommendations based on audit responses"""
+        """Generate recommendations based on audit responses; raises if the LLM call fails"""
         scores_summary = []
         for category, questions in responses.items():
-            avg_score = sum(questions.values()) / len(questions)
+            # Accepts per-question scores or the per-category averages stored on AuditResult
+            if isinstance(questions, dict):
+                avg_score = sum(questions.values()) / len(questions)
+            else:
+                avg_score = questions
             scores_summary.append(f"{category}: {avg_score:.1f}/10")
         
-        prompt = f"""
-        Based on the audit results for {audit_data['company_name']} ({audit_data['industry']} industry, {audit_data['standard']} standard):
-        
-        Scores by category:
-        {chr(10).join(scores_summary)}
-        
-        Provide specific, actionable recommendations to improve compliance. Focus on:
-        1. Areas with scores below 7
-        2. Industry-specific best practices
-        3. {audit_data['standard']} requirements
-        4. Priority actions (immediate vs long-term)
-        
-        Format as clear, numbered recommendations.
-        """
-        
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert compliance consultant. Provide specific, actionable recommendations."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-        except Exception as e:
-            return "Unable to generate AI recommendations at this time. Please review low-scoring areas and consult with compliance experts." 
\ No newline at end of file
+        # Failures propagate so the recommendations task can record them
+        return get_openai_client().generate(RECOMMENDATIONS_PROMPT.request(
+            company_name=audit_data['company_name'],
+            industry=audit_data['industry'],
+            standard=audit_data.get('standard', 'applicable'),
+            scores=chr(10).join(scores_summary),
+        ))
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AuditsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.audits'
+
+
+def start_background_workers():
+    """
+    Start the sweeper that re-queues recommendations lost with a previous process.
+    Called from the WSGI/ASGI entry points, so management commands and tests start no threads.
+    """
+    from .tasks import start_sweeper
+    start_sweeper()
@@ -0,0 +1,186 @@
+"""
+Async versions of the audit endpoints for ASGI deployments (uvicorn workers).
+
+DRF views are synchronous, so these are plain Django async views. They run
+the AuditViewSet's authentication, permission and throttle checks and its
+queryset, reuse its serializers, run ORM work through
+sync_to_async and await the LLM client, so a worker keeps serving other
+requests while generations are in flight. They are routed in place of the
+viewset actions when AUDIT_ASYNC_VIEWS is enabled (asgi.py turns it on).
+"""
+
+import asyncio
+import functools
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+
+from .ai_service import AuditAIService, audit_prompt_data
+from .checklists import save_checklist
+from .models import Audit, AuditResult
+from .scoring import complete_audit
+from .serializers import AuditSerializer
+from .views import MAX_RECOMMENDATIONS_WAIT, RECOMMENDATIONS_POLL_INTERVAL, AuditViewSet
+
+audit_list = AuditViewSet.as_view({'get': 'list'})
+
+
+def _error_response(view, exc):
+    """Render an APIException the way the sync viewset would"""
+    response = view.finalize_response(view.request, view.handle_exception(exc))
+    return response.render()
+
+
+def _initial(request, action):
+    """
+    Run the AuditViewSet's DRF checks (authentication, permissions, throttles) for an action.
+    Returns the view, and the rendered error response if a check failed.
+    """
+    view = AuditViewSet(action_map={request.method.lower(): action}, format_kwarg=None, args=(), kwargs={})
+    view.request = view.initialize_request(request)
+    view.headers = view.default_response_headers
+    try:
+        view.initial(view.request)
+    except exceptions.APIException as exc:
+        return view, _error_response(view, exc)
+    return view, None
+
+
+def drf_view(action):
+    """Apply the viewset's DRF checks for action before the async view runs"""
+    def decorator(view_func):
+        @csrf_exempt
+        @functools.wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            view, error = await sync_to_async(_initial)(request, action)
+            if error is not None:
+                return error
+            request.user = view.request.user
+            request.drf_view = view
+            try:
+                return await view_func(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                return await sync_to_async(_error_response)(view, exc)
+        return wrapper
+    return decorator
+
+
+def _json_body(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+def _get_object(view, pk):
+    """The audit as the sync viewset's get_object finds it: its queryset, then object permissions"""
+    audit = view.get_queryset().filter(pk=pk).first()
+    if audit is not None:
+        view.check_object_permissions(view.request, audit)
+    return audit
+
+
+async def _get_audit(request, pk):
+    return await sync_to_async(_get_object)(request.drf_view, pk)
+
+
+def _create_audit(user, data):
+    serializer = AuditSerializer(data=data)
+    if not serializer.is_valid():
+        return serializer.errors, 400
+    serializer.save(created_by=user)
+    return serializer.data, 201
+
+
+@csrf_exempt
+async def audit_list_create(request):
+    if request.method != 'POST':
+        # Listing has no slow I/O; hand it to the DRF viewset
+        return await sync_to_async(lambda: audit_list(request).render())()
+    return await create_audit(request)
+
+
+@drf_view('create')
+async def create_audit(request):
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'detail': 'JSON parse error'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'detail': 'Expected a JSON object'}, status=400)
+    payload, status = await sync_to_async(_create_audit)(request.user, data)
+    return JsonResponse(payload, status=status)
+
+
+@drf_view('generate_checklist')
+async def generate_checklist(request, pk):
+    if request.method != 'POST':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    audit = await _get_audit(request, pk)
+    if audit is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    if await audit.categories.aexists():
+        return JsonResponse({'error': 'Checklist already exists for this audit'}, status=400)
+
+    checklist_data = await AuditAIService.agenerate_checklist(audit_prompt_data(audit))
+    await sync_to_async(save_checklist)(audit, checklist_data)
+
+    return JsonResponse({'message': 'Checklist generated successfully'})
+
+
+@drf_view('submit_responses')
+async def submit_responses(request, pk):
+    if request.method != 'POST':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    audit = await _get_audit(request, pk)
+    if audit is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    data = _json_body(request)
+    if data is None:
+        return JsonResponse({'detail': 'JSON parse error'}, status=400)
+    responses = data.get('responses', {}) if isinstance(data, dict) else None
+    if not isinstance(responses, dict):
+        return JsonResponse({'error': 'responses must be an object of question ids to scores'}, status=400)
+
+    overall_score, category_scores, result = await sync_to_async(complete_audit)(audit, responses)
+
+    return JsonResponse({
+        'message': 'Audit completed successfully',
+        'overall_score': overall_score,
+        'category_scores': category_scores,
+        'recommendations_status': result.recommendations_status
+    })
+
+
+@drf_view('recommendations')
+async def recommendations(request, pk):
+    """Long-poll for recommendations; waiting sleeps on the event loop instead of holding a thread"""
+    if request.method != 'GET':
+        return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    audit = await _get_audit(request, pk)
+    if audit is None:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    try:
+        wait = min(float(request.GET.get('wait', 0)), MAX_RECOMMENDATIONS_WAIT)
+    except ValueError:
+        return JsonResponse({'error': 'wait must be a number'}, status=400)
+
+    deadline = time.monotonic() + wait
+    while True:
+        result = await AuditResult.objects.filter(audit=audit).only(
+            'recommendations', 'recommendations_status'
+        ).afirst()
+        if result is None:
+            return JsonResponse({'error': 'Results not available'}, status=404)
+        if result.recommendations_status != 'pending' or time.monotonic() >= deadline:
+            break
+        await asyncio.sleep(RECOMMENDATIONS_POLL_INTERVAL)
+
+    return JsonResponse({
+        'recommendations_status': result.recommendations_status,
+        'recommendations': result.recommendations
+    })
@@ -0,0 +1,29 @@
+from django.db import transaction
+
+from .models import Audit, ChecklistCategory, ChecklistQuestion
+
+
+def save_checklist(audit: Audit, checklist_data: dict) -> None:
+    """
+    Store a generated checklist ({'prompt_version': ..., 'categories': [...]}) as
+    categories and questions, recording the prompt version on the audit
+    """
+    with transaction.atomic():
+        audit.prompt_version = checklist_data.get('prompt_version', '')
+        if audit.status == 'created':
+            audit.status = 'in_progress'
+        audit.save(update_fields=['prompt_version', 'status', 'updated_at'])
+        for idx, category_data in enumerate(checklist_data['categories']):
+            category = ChecklistCategory.objects.create(
+                audit=audit,
+                name=category_data['name'],
+                description=category_data.get('description', ''),
+                order=idx + 1
+            )
+            
+            for q_idx, question_text in enumerate(category_data['questions']):
+                ChecklistQuestion.objects.create(
+                    category=category,
+                    question_text=question_text,
+                    order=q_idx + 1
+                )
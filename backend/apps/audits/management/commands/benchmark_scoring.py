@@ -0,0 +1,52 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.audits.models import Audit, ChecklistCategory, ChecklistQuestion
+from apps.audits.scoring import compute_scores, upsert_responses
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Measure query count and time of audit scoring for growing checklist sizes (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000],
+                            help='Number of questions per audit to benchmark')
+        parser.add_argument('--categories', type=int, default=5, help='Categories per audit')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'questions':>10} {'queries':>8} {'ms':>10}")
+        for size in options['sizes']:
+            with transaction.atomic():
+                queries, elapsed_ms = self.run_once(size, options['categories'])
+                transaction.set_rollback(True)
+            self.stdout.write(f"{size:>10} {queries:>8} {elapsed_ms:>10.1f}")
+
+    def run_once(self, size, category_count):
+        user = User.objects.create_user(username=f'benchmark-{time.time_ns()}', password=None)
+        audit = Audit.objects.create(
+            title='Scoring benchmark', description='', company_name='Benchmark',
+            industry='other', location='', created_by=user
+        )
+        categories = ChecklistCategory.objects.bulk_create([
+            ChecklistCategory(audit=audit, name=f'Category {i + 1}', order=i + 1)
+            for i in range(category_count)
+        ])
+        questions = ChecklistQuestion.objects.bulk_create([
+            ChecklistQuestion(category=categories[i % category_count], question_text=f'Question {i + 1}', order=i + 1)
+            for i in range(size)
+        ])
+        responses = {question.id: random.randint(1, 10) for question in questions}
+
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            upsert_responses(audit, responses)
+            compute_scores(audit)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        return len(ctx.captured_queries), elapsed_ms
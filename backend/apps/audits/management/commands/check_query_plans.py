@@ -0,0 +1,66 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from apps.audits.models import Audit, AuditResponse, ChecklistCategory, ChecklistQuestion
+from query_plans import check_plan, index_friendly_planner
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the audit list, checklist and scoring queries and fail if they do not use indexes (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failing ones')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with index_friendly_planner():
+                checks = self.run_checks()
+            transaction.set_rollback(True)
+
+        failed = [check for check in checks if not check.ok]
+        for check in checks:
+            status = self.style.SUCCESS('ok') if check.ok else self.style.ERROR('FAIL')
+            self.stdout.write(f"{status:>4} {check.name}: {'; '.join(check.problems) or 'index used'}")
+            if options['verbose_plans'] or not check.ok:
+                self.stdout.write(f"     {check.plan}".replace('\n', '\n     '))
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(checks)} queries do not use an index")
+
+    def run_checks(self):
+        user = User.objects.create_user(username=f'plans-{time.time_ns()}', password=None)
+        audit = Audit.objects.create(
+            title='Query plan check', description='', company_name='Plans',
+            industry='other', location='', created_by=user
+        )
+        category = ChecklistCategory.objects.create(audit=audit, name='Category 1', order=1)
+        question = ChecklistQuestion.objects.create(category=category, question_text='Question 1', order=1)
+        AuditResponse.objects.create(audit=audit, question=question, score=5)
+
+        return [
+            check_plan(
+                'audit list (owner)',
+                Audit.objects.filter(created_by=user).order_by('-created_at'),
+                sorted_by_index=True
+            ),
+            check_plan('audit retrieve', Audit.objects.filter(created_by=user, pk=audit.pk)),
+            check_plan('checklist categories', audit.categories.all(), sorted_by_index=True),
+            check_plan('checklist questions', category.questions.all(), sorted_by_index=True),
+            # The GROUP BY in scoring.compute_scores
+            check_plan(
+                'scoring',
+                AuditResponse.objects.filter(audit=audit, question__category__audit=audit)
+                .values('question__category_id', 'question__category__name')
+                .annotate(total=Sum('score'), count=Count('id'))
+                .order_by('question__category__order')
+            ),
+            check_plan(
+                'response upsert lookup',
+                AuditResponse.objects.filter(audit=audit, question=question)
+            ),
+        ]
@@ -0,0 +1,66 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.audits.models import Audit
+from llm_client import OpenAIProvider, provider_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Send concurrent generate_checklist requests to one in-process ASGI worker and report '
+        'how many LLM calls were in flight at once. Point OPENAI_BASE_URL at fake_llm_server.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Concurrent generate_checklist requests')
+
+    def handle(self, *args, **options):
+        if not settings.AUDIT_ASYNC_VIEWS:
+            raise CommandError('Run with AUDIT_ASYNC_VIEWS=True so the async views are routed')
+
+        count = options['requests']
+        user = User.objects.create_user(username=f'loadtest-{time.time_ns()}', password=None)
+        try:
+            audits = Audit.objects.bulk_create([
+                Audit(title=f'Load test {i + 1}', description='', company_name='Load Test',
+                      industry='other', location='', created_by=user)
+                for i in range(count)
+            ])
+            token = str(AccessToken.for_user(user))
+            latencies, statuses, elapsed = asyncio.run(self.run([audit.pk for audit in audits], token))
+        finally:
+            user.delete()
+
+        stats = provider_stats(OpenAIProvider.name).snapshot()
+        self.stdout.write(f"requests:            {count}")
+        self.stdout.write(f"status codes:        {dict(sorted(statuses.items()))}")
+        self.stdout.write(f"elapsed:             {elapsed:.2f}s")
+        self.stdout.write(f"latency median/max:  {statistics.median(latencies):.2f}s / {max(latencies):.2f}s")
+        self.stdout.write(f"serial estimate:     {sum(latencies):.2f}s")
+        self.stdout.write(f"max LLM in flight:   {stats['max_in_flight']} (limit LLM_MAX_CONCURRENCY)")
+
+    async def run(self, audit_ids, token):
+        transport = httpx.ASGITransport(app=get_asgi_application())
+        headers = {'Authorization': f'Bearer {token}'}
+        statuses = {}
+
+        async with httpx.AsyncClient(transport=transport, base_url='http://localhost', timeout=None) as client:
+            async def generate(audit_id):
+                started = time.perf_counter()
+                response = await client.post(f'/api/audits/create/{audit_id}/generate_checklist/', headers=headers)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                return time.perf_counter() - started
+
+            started = time.perf_counter()
+            latencies = await asyncio.gather(*(generate(audit_id) for audit_id in audit_ids))
+            return latencies, statuses, time.perf_counter() - started
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Audit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('company_name', models.CharField(max_length=255)),
+                ('industry', models.CharField(choices=[('manufacturing', 'Manufacturing'), ('healthcare', 'Healthcare'), ('retail', 'Retail'), ('technology', 'Technology'), ('finance', 'Finance'), ('education', 'Education'), ('construction', 'Construction'), ('transportation', 'Transportation'), ('energy', 'Energy'), ('agriculture', 'Agriculture'), ('other', 'Other')], max_length=50)),
+                ('location', models.CharField(max_length=255)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('completion_date', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('created', 'Created'), ('in_progress', 'In Progress'), ('completed', 'Completed')], default='created', max_length=20)),
+                ('prompt_version', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuditResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuditResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('overall_score', models.FloatField()),
+                ('category_scores', models.JSONField()),
+                ('recommendations', models.TextField(blank=True)),
+                ('recommendations_status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('generated_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChecklistCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('order', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ChecklistQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_text', models.TextField()),
+                ('order', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+    ]
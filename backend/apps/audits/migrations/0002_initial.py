@@ -0,0 +1,64 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('audits', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audit',
+            name='created_by',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audits', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='auditresponse',
+            name='audit',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='audits.audit'),
+        ),
+        migrations.AddField(
+            model_name='auditresult',
+            name='audit',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='result', to='audits.audit'),
+        ),
+        migrations.AddField(
+            model_name='checklistcategory',
+            name='audit',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='categories', to='audits.audit'),
+        ),
+        migrations.AddField(
+            model_name='checklistquestion',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='audits.checklistcategory'),
+        ),
+        migrations.AddField(
+            model_name='auditresponse',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='audits.checklistquestion'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['created_by', '-created_at'], name='audits_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistcategory',
+            index=models.Index(fields=['audit', 'order'], name='category_audit_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistquestion',
+            index=models.Index(fields=['category', 'order'], name='question_category_order_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='auditresponse',
+            unique_together={('audit', 'question')},
+        ),
+    ]
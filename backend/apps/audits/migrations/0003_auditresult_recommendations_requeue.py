@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditresult',
+            name='recommendations_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='auditresult',
+            name='recommendations_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0003_auditresult_recommendations_requeue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditresult',
+            name='recommendations_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+    ]
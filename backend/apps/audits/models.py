@@ -52,9 +52,17 @@ class Audit(models.Model):
     is_completed = models.BooleanField(default=False)
     completion_date = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='created')
+    # Tag (name@version, see prompts.py) of the prompt the checklist was generated with
+    prompt_version = models.CharField(max_length=64, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Non-staff audit list: WHERE created_by ORDER BY -created_at
+            models.Index(fields=['created_by', '-created_at'], name='audits_owner_created_idx'),
+        ]
+    
     def __str__(self):
         return f"Audit for {self.company_name}"
 
@@ -66,6 +74,9 @@ class ChecklistCategory(models.Model):
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['audit', 'order'], name='category_audit_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.audit.company_name} - {self.name}"
@@ -77,6 +88,9 @@ class ChecklistQuestion(models.Model):
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['category', 'order'], name='question_category_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.category.name} - Q{self.order}"
@@ -91,8 +105,24 @@ class AuditResponse(models.Model):
         unique_together = ['audit', 'question']
 
 class AuditResult(models.Model):
+    RECOMMENDATIONS_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
     audit = models.OneToOneField(Audit, on_delete=models.CASCADE, related_name='result')
     overall_score = models.FloatField()
     category_scores = models.JSONField()  # Store category-wise scores
-    recommendations = models.TextField()
+    recommendations = models.TextField(blank=True)
+    recommendations_status = models.CharField(
+        max_length=20,
+        choices=RECOMMENDATIONS_STATUS_CHOICES,
+        default='pending'
+    )
+    # When generation was last queued, and how often it started; see tasks.sweep_recommendations
+    recommendations_requested_at = models.DateTimeField(null=True, blank=True)
+    recommendations_attempts = models.PositiveIntegerField(default=0)
+    # Changes on every submission and claim; a worker only saves results while its token is current
+    recommendations_token = models.CharField(max_length=32, blank=True)
     generated_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,65 @@
+"""
+Printable audit report: the checklist with each question's score, the
+AuditResult category scores and the recommendations. The context holds only
+plain values, so reports.py can hash it to find an already rendered copy on disk.
+"""
+
+from typing import Any, Dict
+
+from django.db.models import Prefetch
+
+from .models import Audit, AuditResponse, AuditResult, ChecklistQuestion
+
+REPORT_TEMPLATE = 'reports/audit_report.html'
+
+
+def _timestamp(value) -> str:
+    return value.strftime('%Y-%m-%d %H:%M UTC') if value else ''
+
+
+def report_context(audit: Audit) -> Dict[str, Any]:
+    scores = dict(AuditResponse.objects.filter(audit=audit).values_list('question_id', 'score'))
+    result = AuditResult.objects.filter(audit=audit).first()
+    category_scores = result.category_scores if result else {}
+
+    categories = audit.categories.order_by('order').prefetch_related(
+        Prefetch('questions', queryset=ChecklistQuestion.objects.order_by('order'))
+    )
+    sections = [
+        {
+            'name': category.name,
+            'score': category_scores.get(category.name),
+            'items': [
+                {'text': question.question_text, 'done': question.id in scores,
+                 'notes': '', 'score': scores.get(question.id)}
+                for question in category.questions.all()
+            ],
+        }
+        for category in categories
+    ]
+
+    summary = [('Status', audit.get_status_display())]
+    recommendations = ''
+    if result:
+        summary.append(('Overall score', f'{result.overall_score:.1f} / 10'))
+        if result.recommendations_status == 'ready':
+            recommendations = result.recommendations
+        else:
+            summary.append(('Recommendations', result.get_recommendations_status_display()))
+
+    return {
+        'title': audit.title,
+        'subtitle': audit.company_name,
+        'details': [
+            ('Description', audit.description),
+            ('Industry', audit.get_industry_display()),
+            ('Location', audit.location),
+            ('Created', _timestamp(audit.created_at)),
+            ('Completed', _timestamp(audit.completion_date)),
+        ],
+        'summary': summary,
+        'category_scores': [(section['name'], section['score']) for section in sections if section['score'] is not None],
+        'sections': sections,
+        'recommendations': recommendations,
+        'as_of': _timestamp(audit.updated_at),
+    }
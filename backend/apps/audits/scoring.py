@@ -0,0 +1,82 @@
+import uuid
+from typing import Dict, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import Audit, AuditResponse, AuditResult
+from .tasks import enqueue_recommendations
+
+
+def upsert_responses(audit: Audit, responses_data: Dict, batch_size: Optional[int] = None) -> int:
+    """Insert or update every submitted score with batched upserts"""
+    responses = [
+        AuditResponse(audit=audit, question_id=int(question_id), score=score)
+        for question_id, score in responses_data.items()
+    ]
+    AuditResponse.objects.bulk_create(
+        responses,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['audit', 'question'],
+        update_fields=['score'],
+    )
+    return len(responses)
+
+
+def compute_scores(audit: Audit) -> Tuple[float, Dict[str, float]]:
+    """
+    Average the audit's responses per category and overall with one GROUP BY query.
+    Only responses to questions that belong to this audit's checklist are counted.
+    """
+    rows = (
+        AuditResponse.objects
+        .filter(audit=audit, question__category__audit=audit)
+        .values('question__category_id', 'question__category__name')
+        .annotate(total=Sum('score'), count=Count('id'))
+        .order_by('question__category__order')
+    )
+
+    category_scores = {}
+    total_score = 0
+    total_questions = 0
+    for row in rows:
+        category_scores[row['question__category__name']] = row['total'] / row['count']
+        total_score += row['total']
+        total_questions += row['count']
+
+    overall_score = total_score / total_questions if total_questions > 0 else 0
+    return overall_score, category_scores
+
+
+def complete_audit(audit: Audit, responses_data: Dict) -> Tuple[float, Dict[str, float], AuditResult]:
+    """
+    Save the responses, score the audit and mark it completed.
+    Recommendations are generated by a background task once the transaction commits.
+    """
+    with transaction.atomic():
+        upsert_responses(audit, responses_data)
+        overall_score, category_scores = compute_scores(audit)
+
+        result, _ = AuditResult.objects.update_or_create(
+            audit=audit,
+            defaults={
+                'overall_score': overall_score,
+                'category_scores': category_scores,
+                'recommendations': '',
+                'recommendations_status': 'pending',
+                'recommendations_requested_at': timezone.now(),
+                'recommendations_attempts': 0,
+                'recommendations_token': uuid.uuid4().hex
+            }
+        )
+
+        audit.is_completed = True
+        audit.status = 'completed'
+        # Resubmitting keeps the date the audit was first completed
+        audit.completion_date = audit.completion_date or timezone.now()
+        audit.save()
+
+        transaction.on_commit(lambda: enqueue_recommendations(audit.id))
+    return overall_score, category_scores, result
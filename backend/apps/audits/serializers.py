@@ -5,7 +5,7 @@ class AuditSerializer(serializers.ModelSerializer):
     class Meta:
         model = Audit
         fields = '__all__'
-        read_only_fields = ['user', 'status', 'created_at', 'updated_at']
+        read_only_fields = ['user', 'status', 'prompt_version', 'created_at', 'updated_at']
 
 class ChecklistQuestionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,105 @@
+"""
+Dashboard statistics for the audit_project API, one aggregate query per section.
+
+The audit_checklist API computes the same dashboard in audit/stats.py. The
+shared sections (audits with in_progress/not_started, by_industry, timeline,
+recent) use the same field names in both. Each side also has fields the other
+cannot offer:
+
+- only this project stores AuditResult rows, hence ``scores``; its audits have
+  a workflow ``status``, hence ``audits.by_status``
+- only audit_checklist audits have a complexity level and checklist item
+  counters, hence its ``by_complexity`` and ``items`` sections
+"""
+
+from datetime import timedelta
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, DateField, Max, Min, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import Audit, AuditResult
+
+TIMELINE_DAYS = 30
+RECENT_AUDITS = 10
+
+
+def _rate(part, whole) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+def timeline(audits, days: int = TIMELINE_DAYS):
+    """Audits created and completed per day over the last `days` days, as in audit/stats.py"""
+    since = timezone.now() - timedelta(days=days)
+
+    def per_day(field):
+        return (
+            audits.filter(**{f'{field}__gte': since})
+            .annotate(day=Cast(field, DateField())).values('day')
+            .annotate(count=Count('id')).order_by()
+        )
+
+    by_day = {}
+    for key, field in (('created', 'created_at'), ('completed', 'completion_date')):
+        for row in per_day(field):
+            by_day.setdefault(row['day'], {'created': 0, 'completed': 0})[key] = row['count']
+    return [{'date': day.isoformat(), **counts} for day, counts in sorted(by_day.items())]
+
+
+def compute_stats(audits) -> Dict[str, Any]:
+    """Dashboard statistics for a queryset of audits, one aggregate query per section"""
+    by_status = {
+        row['status']: row['count']
+        for row in audits.values('status').annotate(count=Count('id')).order_by()
+    }
+    by_industry = list(
+        audits.values('industry')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(is_completed=True)))
+        .order_by('-total', 'industry')
+    )
+    total = sum(by_status.values())
+    completed = sum(row['completed'] for row in by_industry)
+
+    scores = AuditResult.objects.filter(audit__in=audits).aggregate(
+        count=Count('id'),
+        average=Avg('overall_score'),
+        minimum=Min('overall_score'),
+        maximum=Max('overall_score'),
+    )
+
+    recent = list(
+        audits.order_by('-updated_at')
+        .values('id', 'title', 'company_name', 'status', 'is_completed', 'updated_at')[:RECENT_AUDITS]
+    )
+
+    return {
+        'audits': {
+            'total': total,
+            'completed': completed,
+            'in_progress': by_status.get('in_progress', 0),
+            'not_started': by_status.get('created', 0),
+            'completion_rate': _rate(completed, total),
+            'by_status': by_status,
+        },
+        'by_industry': [
+            {**row, 'completion_rate': _rate(row['completed'], row['total'])}
+            for row in by_industry
+        ],
+        'scores': scores,
+        'timeline': timeline(audits),
+        'recent': recent,
+        'generated_at': timezone.now(),
+    }
+
+
+def get_stats(user, audits, refresh: bool = False) -> Dict[str, Any]:
+    """compute_stats cached per user for AUDIT_STATS_CACHE_TTL seconds"""
+    key = f'audits-stats:{user.pk}:{int(user.is_staff)}'
+    stats = None if refresh else cache.get(key)
+    if stats is None:
+        stats = compute_stats(audits)
+        cache.set(key, stats, getattr(settings, 'AUDIT_STATS_CACHE_TTL', 30))
+    return stats
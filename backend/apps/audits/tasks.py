@@ -0,0 +1,147 @@
+"""
+Audit recommendations, generated off the request thread.
+
+complete_audit queues the audit once its scoring transaction commits. The
+queue is an in-process thread pool, so work queued by a process that has
+since stopped is lost; a sweeper thread (started from the WSGI/ASGI entry
+points) re-queues results still pending RECOMMENDATION_TIMEOUT seconds after
+they were requested, and marks them failed after RECOMMENDATION_MAX_ATTEMPTS.
+
+Each submission stores a fresh recommendations_token, and a worker claims a
+result by swapping in its own token. Results are only saved while that token
+is current, so a worker overtaken by resubmitted responses or by a re-queued
+run drops its output instead of overwriting newer recommendations. Failed LLM
+calls are retried RECOMMENDATION_RETRIES times with exponential backoff.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .ai_service import AuditAIService, audit_prompt_data
+from .models import AuditResult
+
+logger = logging.getLogger(__name__)
+
+# Recommendations are slow LLM calls, so they run off the request thread
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'RECOMMENDATION_WORKERS', 2),
+    thread_name_prefix='recommendations'
+)
+
+
+def enqueue_recommendations(audit_id: int) -> None:
+    executor.submit(generate_recommendations, audit_id)
+
+
+def claim_recommendations(audit_id: int) -> Optional[AuditResult]:
+    """
+    Take a pending result for this worker by swapping in a new generation
+    token; None if it is no longer pending or another worker claimed it first.
+    """
+    result = AuditResult.objects.select_related('audit').filter(
+        audit_id=audit_id, recommendations_status='pending'
+    ).first()
+    if result is None:
+        return None
+    token = uuid.uuid4().hex
+    claimed = AuditResult.objects.filter(
+        pk=result.pk, recommendations_status='pending', recommendations_token=result.recommendations_token
+    ).update(recommendations_token=token, recommendations_attempts=F('recommendations_attempts') + 1)
+    if not claimed:
+        return None
+    result.recommendations_token = token
+    return result
+
+
+def generate_recommendations(audit_id: int) -> None:
+    """Fill AuditResult.recommendations for an audit whose scores are already saved"""
+    close_old_connections()
+    try:
+        result = claim_recommendations(audit_id)
+        if result is None:
+            return
+        # Writes only land while the claim is ours; resubmitted responses or a re-queue replace the token
+        claimed = AuditResult.objects.filter(
+            pk=result.pk, recommendations_status='pending', recommendations_token=result.recommendations_token
+        )
+        retries = getattr(settings, 'RECOMMENDATION_RETRIES', 2)
+        backoff = getattr(settings, 'RECOMMENDATION_RETRY_BACKOFF', 2)
+        for attempt in range(retries + 1):
+            try:
+                recommendations = AuditAIService.generate_recommendations(
+                    audit_prompt_data(result.audit), result.category_scores
+                )
+                break
+            except Exception:
+                logger.exception("Generating recommendations for audit %s failed (attempt %d of %d)",
+                                 audit_id, attempt + 1, retries + 1)
+                if attempt == retries or not claimed.exists():
+                    claimed.update(recommendations_status='failed')
+                    return
+                time.sleep(backoff * 2 ** attempt)
+
+        if not claimed.update(recommendations=recommendations, recommendations_status='ready'):
+            logger.info("Discarding stale recommendations for audit %s", audit_id)
+    finally:
+        close_old_connections()
+
+
+def sweep_recommendations() -> int:
+    """Re-queue or fail stale pending recommendations; returns how many were re-queued"""
+    now = timezone.now()
+    timeout = timedelta(seconds=getattr(settings, 'RECOMMENDATION_TIMEOUT', 600))
+    max_attempts = getattr(settings, 'RECOMMENDATION_MAX_ATTEMPTS', 3)
+    stale = AuditResult.objects.filter(
+        Q(recommendations_requested_at__lt=now - timeout) | Q(recommendations_requested_at__isnull=True),
+        recommendations_status='pending',
+    )
+    stale.filter(recommendations_attempts__gte=max_attempts).update(recommendations_status='failed')
+
+    requeued = 0
+    for pk, audit_id, requested_at in stale.values_list('pk', 'audit_id', 'recommendations_requested_at'):
+        # Only the process whose update wins re-queues the row
+        claimed = AuditResult.objects.filter(
+            pk=pk, recommendations_status='pending', recommendations_requested_at=requested_at
+        ).update(recommendations_requested_at=now)
+        if claimed:
+            enqueue_recommendations(audit_id)
+            requeued += 1
+    return requeued
+
+
+def sweep_forever(interval: float) -> None:
+    while True:
+        try:
+            requeued = sweep_recommendations()
+            if requeued:
+                logger.info("Re-queued recommendations for %d audits", requeued)
+        except Exception:
+            logger.exception("Recommendations sweep failed")
+        finally:
+            close_old_connections()
+        time.sleep(interval)
+
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def start_sweeper() -> None:
+    global _sweeper
+    interval = getattr(settings, 'RECOMMENDATION_SWEEP_INTERVAL', 60)
+    with _sweeper_lock:
+        if _sweeper is None and interval:
+            _sweeper = threading.Thread(
+                target=sweep_forever, args=(interval,), name='recommendations-sweeper', daemon=True
+            )
+            _sweeper.start()
@@ -1,3 +1,335 @@
-from django.test import TestCase
+import asyncio
+import json
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+
+from query_plans import index_friendly_planner
+from token_auth import ClaimsRefreshToken
+
+from . import async_views
+from .management.commands.check_query_plans import Command as CheckQueryPlans
+
+from .models import Audit, AuditResponse, AuditResult, ChecklistCategory, ChecklistQuestion
+from .scoring import complete_audit, compute_scores, upsert_responses
+from .tasks import claim_recommendations, generate_recommendations, sweep_recommendations
+
+User = get_user_model()
+
+
+def create_audit(user, categories=(('Documentation', 3), ('Operations', 2))):
+    audit = Audit.objects.create(
+        title='Audit', description='d', company_name='Co', industry='other', location='Here', created_by=user
+    )
+    for order, (name, questions) in enumerate(categories, start=1):
+        category = ChecklistCategory.objects.create(audit=audit, name=name, order=order)
+        for q_order in range(1, questions + 1):
+            ChecklistQuestion.objects.create(category=category, question_text=f'{name} {q_order}', order=q_order)
+    return audit
+
+
+def question_ids(audit):
+    return list(ChecklistQuestion.objects.filter(category__audit=audit).order_by('category__order', 'order')
+                .values_list('id', flat=True))
+
+
+class ScoringTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        self.audit = create_audit(self.user)
+        self.questions = question_ids(self.audit)
+
+    def test_upsert_inserts_then_updates(self):
+        self.assertEqual(upsert_responses(self.audit, {str(q): 4 for q in self.questions}), 5)
+        self.assertEqual(upsert_responses(self.audit, {str(self.questions[0]): 9}), 1)
+
+        scores = dict(AuditResponse.objects.filter(audit=self.audit).values_list('question_id', 'score'))
+        self.assertEqual(len(scores), 5)
+        self.assertEqual(scores[self.questions[0]], 9)
+        self.assertEqual(scores[self.questions[1]], 4)
+
+    def test_upsert_query_count_does_not_grow_with_responses(self):
+        audit = create_audit(self.user, categories=(('Large', 200),))
+        responses = {str(q): 5 for q in question_ids(audit)}
+        with self.assertNumQueries(1):
+            upsert_responses(audit, responses)
+
+    def test_scores_per_category_in_checklist_order(self):
+        upsert_responses(self.audit, dict(zip(map(str, self.questions), [6, 8, 10, 3, 5])))
+        # A response to another audit's question is not counted
+        other = create_audit(self.user, categories=(('Documentation', 1),))
+        AuditResponse.objects.create(audit=self.audit, question_id=question_ids(other)[0], score=1)
+
+        with self.assertNumQueries(1):
+            overall, categories = compute_scores(self.audit)
+
+        self.assertEqual(list(categories.items()), [('Documentation', 8.0), ('Operations', 4.0)])
+        self.assertAlmostEqual(overall, 32 / 5)
+
+    @mock.patch('apps.audits.scoring.enqueue_recommendations')
+    def test_complete_audit_queues_recommendations_after_commit(self, enqueue):
+        with self.captureOnCommitCallbacks(execute=True):
+            overall, _, result = complete_audit(self.audit, {str(q): 7 for q in self.questions})
+            enqueue.assert_not_called()
+
+        enqueue.assert_called_once_with(self.audit.id)
+        self.assertEqual(overall, 7)
+        self.assertEqual(AuditResult.objects.get(audit=self.audit).recommendations_status, 'pending')
+        self.assertTrue(Audit.objects.get(pk=self.audit.pk).is_completed)
+
+
+# The task closes connections itself, so these tests run outside a test transaction
+class RecommendationTaskTests(TransactionTestCase):
+    def setUp(self):
+        self.audit = create_audit(User.objects.create_user('auditor', password='x'))
+        self.result = AuditResult.objects.create(
+            audit=self.audit, overall_score=5, category_scores={'Documentation': 5.0},
+            recommendations_requested_at=timezone.now()
+        )
+
+    def test_ready(self):
+        with mock.patch('apps.audits.ai_service.get_openai_client') as client:
+            client.return_value.generate.return_value = '1. Review the policies.'
+            generate_recommendations(self.audit.id)
+
+        self.result.refresh_from_db()
+        self.assertEqual(self.result.recommendations_status, 'ready')
+        self.assertEqual(self.result.recommendations, '1. Review the policies.')
+        self.assertEqual(self.result.recommendations_attempts, 1)
+
+    @override_settings(RECOMMENDATION_RETRIES=2, RECOMMENDATION_RETRY_BACKOFF=1)
+    @mock.patch('apps.audits.tasks.time.sleep')
+    def test_llm_failure_is_recorded_as_failed_after_retries(self, sleep):
+        with mock.patch('apps.audits.ai_service.get_openai_client') as client:
+            client.return_value.generate.side_effect = TimeoutError('LLM timed out')
+            generate_recommendations(self.audit.id)
+
+        self.assertEqual(client.return_value.generate.call_count, 3)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [1, 2])
+        self.result.refresh_from_db()
+        self.assertEqual(self.result.recommendations_status, 'failed')
+        self.assertEqual(self.result.recommendations, '')
+        self.assertEqual(self.result.recommendations_attempts, 1)
+
+    @override_settings(RECOMMENDATION_RETRIES=2, RECOMMENDATION_RETRY_BACKOFF=1)
+    @mock.patch('apps.audits.tasks.time.sleep')
+    def test_retry_succeeds(self, sleep):
+        with mock.patch('apps.audits.ai_service.get_openai_client') as client:
+            client.return_value.generate.side_effect = [TimeoutError('LLM timed out'), '1. Review the policies.']
+            generate_recommendations(self.audit.id)
+
+        sleep.assert_called_once_with(1)
+        self.result.refresh_from_db()
+        self.assertEqual(self.result.recommendations_status, 'ready')
+        self.assertEqual(self.result.recommendations, '1. Review the policies.')
+
+    def test_results_for_resubmitted_responses_are_discarded(self):
+        def resubmit(*args, **kwargs):
+            # The auditor resubmits while the LLM call is in flight
+            AuditResult.objects.filter(pk=self.result.pk).update(overall_score=9, recommendations_token='resubmitted')
+            return '1. Stale advice.'
+
+        with mock.patch('apps.audits.ai_service.get_openai_client') as client:
+            client.return_value.generate.side_effect = resubmit
+            generate_recommendations(self.audit.id)
+
+        self.result.refresh_from_db()
+        self.assertEqual(self.result.recommendations_status, 'pending')
+        self.assertEqual(self.result.recommendations, '')
+
+    def test_overtaken_worker_does_not_overwrite(self):
+        calls = []
+
+        def generate(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                # A re-queued run claims the row and finishes first
+                generate_recommendations(self.audit.id)
+                return '1. Slow advice.'
+            return '1. Fresh advice.'
+
+        with mock.patch('apps.audits.ai_service.get_openai_client') as client:
+            client.return_value.generate.side_effect = generate
+            generate_recommendations(self.audit.id)
+
+        self.result.refresh_from_db()
+        self.assertEqual(self.result.recommendations, '1. Fresh advice.')
+        self.assertEqual(self.result.recommendations_attempts, 2)
+
+    def test_finished_results_are_not_claimed(self):
+        AuditResult.objects.filter(pk=self.result.pk).update(recommendations_status='ready')
+        self.assertIsNone(claim_recommendations(self.audit.id))
+
+    @override_settings(RECOMMENDATION_TIMEOUT=600, RECOMMENDATION_MAX_ATTEMPTS=3)
+    @mock.patch('apps.audits.tasks.enqueue_recommendations')
+    def test_sweep_requeues_stale_pending_results(self, enqueue):
+        self.assertEqual(sweep_recommendations(), 0)
+
+        stale = timezone.now() - timedelta(seconds=601)
+        AuditResult.objects.filter(pk=self.result.pk).update(recommendations_requested_at=stale)
+        self.assertEqual(sweep_recommendations(), 1)
+        enqueue.assert_called_once_with(self.audit.id)
+        # Re-queued rows are fresh again, so the next sweep leaves them alone
+        self.assertEqual(sweep_recommendations(), 0)
+
+        AuditResult.objects.filter(pk=self.result.pk).update(
+            recommendations_requested_at=stale, recommendations_attempts=3
+        )
+        self.assertEqual(sweep_recommendations(), 0)
+        self.result.refresh_from_db()
+        self.assertEqual(self.result.recommendations_status, 'failed')
+
+
+class AsyncRecommendationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        self.audit = create_audit(self.user)
+        AuditResult.objects.create(audit=self.audit, overall_score=5, category_scores={})
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        self.request = AsyncRequestFactory().get(
+            f'/api/audits/create/{self.audit.pk}/recommendations/', {'wait': 5},
+            headers={'Authorization': f'Bearer {token}'}
+        )
+
+    @mock.patch.object(async_views, 'RECOMMENDATIONS_POLL_INTERVAL', 1.0)
+    async def test_long_poll_does_not_block_the_event_loop(self):
+        async def finish_later():
+            started = time.monotonic()
+            await asyncio.sleep(0.1)
+            # A view that slept in a blocking call would delay this until its poll interval ends
+            lateness = time.monotonic() - started - 0.1
+            await sync_to_async(AuditResult.objects.filter(audit=self.audit).update)(
+                recommendations='1. Review the policies.', recommendations_status='ready'
+            )
+            return lateness
+
+        response, lateness = await asyncio.gather(
+            async_views.recommendations(self.request, pk=self.audit.pk), finish_later()
+        )
+
+        self.assertLess(lateness, 0.5)
+        self.assertEqual(response.status_code, 200)
+        self.assertJSONEqual(response.content, {
+            'recommendations_status': 'ready', 'recommendations': '1. Review the policies.'
+        })
+
+
+class AsyncViewChecksTests(TestCase):
+    """The async views apply the same DRF checks and validation as the viewset actions"""
+
+    def setUp(self):
+        self.owner = User.objects.create_user('auditor', password='x')
+        self.audit = create_audit(self.owner)
+        AuditResult.objects.create(
+            audit=self.audit, overall_score=5, category_scores={}, recommendations_status='ready'
+        )
+        self.factory = AsyncRequestFactory()
+
+    def headers(self, user):
+        return {'Authorization': f'Bearer {ClaimsRefreshToken.for_user(user).access_token}'}
+
+    async def get_recommendations(self, user=None):
+        request = self.factory.get(
+            f'/api/audits/create/{self.audit.pk}/recommendations/', headers=self.headers(user) if user else {}
+        )
+        return await async_views.recommendations(request, pk=self.audit.pk)
+
+    async def submit(self, body, user=None):
+        request = self.factory.post(
+            f'/api/audits/create/{self.audit.pk}/submit_responses/', body, content_type='application/json',
+            headers=self.headers(user or self.owner)
+        )
+        return await async_views.submit_responses(request, pk=self.audit.pk)
+
+    async def test_anonymous(self):
+        self.assertEqual((await self.get_recommendations()).status_code, 401)
+
+    async def test_other_users_audits_are_hidden_but_staff_see_them(self):
+        other = await sync_to_async(User.objects.create_user)('other', password='x')
+        self.assertEqual((await self.get_recommendations(other)).status_code, 404)
+        staff = await sync_to_async(User.objects.create_user)('staff', password='x', is_staff=True)
+        self.assertEqual((await self.get_recommendations(staff)).status_code, 200)
+
+    async def test_viewset_permissions_apply(self):
+        class Deny(IsAuthenticated):
+            def has_permission(self, request, view):
+                return view.action != 'recommendations'
+
+        with mock.patch.object(async_views.AuditViewSet, 'permission_classes', [Deny]):
+            response = await self.get_recommendations(self.owner)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('detail', json.loads(response.content))
+
+    async def test_viewset_throttles_apply(self):
+        class Throttle(UserRateThrottle):
+            rate = '1/min'
+            cache = LocMemCache('async-throttle-test', {})
+
+        with mock.patch.object(async_views.AuditViewSet, 'throttle_classes', [Throttle]):
+            self.assertEqual((await self.get_recommendations(self.owner)).status_code, 200)
+            response = await self.get_recommendations(self.owner)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    async def test_body_must_be_an_object(self):
+        for body in ([1, 2], {'responses': [1, 2]}, '"scores"'):
+            with self.subTest(body=body):
+                response = await self.submit(body)
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(await Audit.objects.filter(pk=self.audit.pk, is_completed=True).aexists())
+
+    def test_sync_endpoint_rejects_a_list_body(self):
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post(f'/api/audits/create/{self.audit.pk}/submit_responses/', [1, 2], format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class StatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+
+    @mock.patch('apps.audits.scoring.enqueue_recommendations')
+    def test_sections_match_the_checklist_api(self, enqueue):
+        from .checklists import save_checklist
+        from .stats import compute_stats
+
+        done = create_audit(self.user, categories=(('Documentation', 2),))
+        complete_audit(done, {str(q): 8 for q in question_ids(done)})
+        started = create_audit(self.user, categories=())
+        Audit.objects.filter(pk=started.pk).update(industry='finance')
+        started.refresh_from_db()
+        save_checklist(started, {'categories': [{'name': 'Operations', 'questions': ['Q1?']}]})
+        create_audit(self.user, categories=())
+
+        stats = compute_stats(Audit.objects.filter(created_by=self.user))
+
+        self.assertEqual(
+            {key: stats['audits'][key] for key in ('total', 'completed', 'in_progress', 'not_started')},
+            {'total': 3, 'completed': 1, 'in_progress': 1, 'not_started': 1}
+        )
+        self.assertEqual(stats['scores']['count'], 1)
+        self.assertEqual(stats['scores']['average'], 8)
+        today = timezone.now().date().isoformat()
+        self.assertEqual(stats['timeline'], [{'date': today, 'created': 3, 'completed': 1}])
+        self.assertEqual({row['industry'] for row in stats['by_industry']}, {'other', 'finance'})
+
+
+class QueryPlanTests(TestCase):
+    def test_queries_use_indexes(self):
+        with index_friendly_planner():
+            checks = CheckQueryPlans().run_checks()
+
+        self.assertTrue(checks)
+        for check in checks:
+            with self.subTest(check.name):
+                self.assertEqual(check.problems, [], check.plan)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import AuditViewSet
@@ -5,6 +6,19 @@ from .views import AuditViewSet
 router = DefaultRouter()
 router.register(r'create', AuditViewSet, basename='audit')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.AUDIT_ASYNC_VIEWS:
+    from . import async_views
+
+    # The async views take precedence over the matching viewset routes
+    urlpatterns += [
+        path('create/', async_views.audit_list_create, name='audit-list'),
+        path('create/<int:pk>/generate_checklist/', async_views.generate_checklist, name='audit-generate-checklist'),
+        path('create/<int:pk>/submit_responses/', async_views.submit_responses, name='audit-submit-responses'),
+        path('create/<int:pk>/recommendations/', async_views.recommendations, name='audit-recommendations'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
-] 
\ No newline at end of file
+]
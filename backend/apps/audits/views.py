@@ -1,13 +1,22 @@
+import time
+from django.http import FileResponse
 from django.shortcuts import render
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import transaction
-from .models import Audit, ChecklistCategory, ChecklistQuestion, AuditResponse, AuditResult
+from .models import Audit, AuditResult
 from .serializers import AuditSerializer, ChecklistCategorySerializer, AuditResponseSerializer, AuditResultSerializer
-from .ai_service import AuditAIService
+from .ai_service import AuditAIService, audit_prompt_data
+from .checklists import save_checklist
+from .scoring import complete_audit
+from .stats import get_stats
+from .report import REPORT_TEMPLATE, report_context
 from apps.authentication.permissions import IsAdminOrOwner
+from reports import REPORT_FORMATS, REPORT_RETRY_AFTER, ReportError, render_report
+
+MAX_RECOMMENDATIONS_WAIT = 30
+RECOMMENDATIONS_POLL_INTERVAL = 0.5
 
 class AuditViewSet(viewsets.ModelViewSet):
     serializer_class = AuditSerializer
@@ -28,42 +37,27 @@ class AuditViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Dashboard statistics for the user's audits, cached briefly; ?refresh=true recomputes"""
+        refresh = request.query_params.get('refresh', '').lower() in ('1', 'true', 'yes')
+        return Response(get_stats(request.user, self.get_queryset(), refresh=refresh))
+    
     @action(detail=True, methods=['post'])
     def generate_checklist(self, request, pk=None):
         audit = self.get_object()
         
-        if audit.checklists.exists():
+        if audit.categories.exists():
             return Response(
                 {'error': 'Checklist already exists for this audit'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Prepare data for AI service
-        audit_data = {
-            'company_name': audit.company_name,
-            'industry': audit.industry,
-            'location': audit.location
-        }
-        
         # Generate checklist using AI
-        checklist_data = AuditAIService.generate_checklist(audit_data)
+        checklist_data = AuditAIService.generate_checklist(audit_prompt_data(audit))
         
         # Save to database
-        with transaction.atomic():
-            for idx, category_data in enumerate(checklist_data['categories']):
-                category = ChecklistCategory.objects.create(
-                    audit=audit,
-                    name=category_data['name'],
-                    description=category_data.get('description', ''),
-                    order=idx + 1
-                )
-                
-                for q_idx, question_text in enumerate(category_data['questions']):
-                    ChecklistQuestion.objects.create(
-                        category=category,
-                        question_text=question_text,
-                        order=q_idx + 1
-                    )
+        save_checklist(audit, checklist_data)
         
         return Response({'message': 'Checklist generated successfully'})
     
@@ -77,64 +71,74 @@ class AuditViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def submit_responses(self, request, pk=None):
         audit = self.get_object()
-        responses_data = request.data.get('responses', {})
+        responses_data = request.data.get('responses', {}) if isinstance(request.data, dict) else None
+        if not isinstance(responses_data, dict):
+            return Response(
+                {'error': 'responses must be an object of question ids to scores'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        with transaction.atomic():
-            # Save responses
-            for question_id, score in responses_data.items():
-                AuditResponse.objects.update_or_create(
-                    audit=audit,
-                    question_id=question_id,
-                    defaults={'score': score}
+        overall_score, category_scores, result = complete_audit(audit, responses_data)
+        
+        return Response({
+            'message': 'Audit completed successfully',
+            'overall_score': overall_score,
+            'category_scores': category_scores,
+            'recommendations_status': result.recommendations_status
+        })
+    
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request, pk=None):
+        """
+        Return the recommendations for a completed audit. Pass ?wait=<seconds>
+        (up to 30) to long-poll until they are no longer pending. Under ASGI the
+        async version in async_views.py is routed instead, since this one holds a thread.
+        """
+        audit = self.get_object()
+        try:
+            wait = min(float(request.query_params.get('wait', 0)), MAX_RECOMMENDATIONS_WAIT)
+        except ValueError:
+            return Response({'error': 'wait must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        deadline = time.monotonic() + wait
+        while True:
+            result = AuditResult.objects.filter(audit=audit).only(
+                'recommendations', 'recommendations_status'
+            ).first()
+            if result is None:
+                return Response(
+                    {'error': 'Results not available'},
+                    status=status.HTTP_404_NOT_FOUND
                 )
-            
-            # Calculate results
-            category_scores = {}
-            total_score = 0
-            total_questions = 0
-            
-            for category in audit.categories.all():
-                category_total = 0
-                category_count = 0
-                
-                for question in category.questions.all():
-                    try:
-                        response = AuditResponse.objects.get(audit=audit, question=question)
-                        category_total += response.score
-                        category_count += 1
-                        total_score += response.score
-                        total_questions += 1
-                    except AuditResponse.DoesNotExist:
-                        pass
-                
-                if category_count > 0:
-                    category_scores[category.name] = category_total / category_count
-            
-            overall_score = total_score / total_questions if total_questions > 0 else 0
-            
-            # Generate AI recommendations
-            audit_data = {
-                'company_name': audit.company_name,
-                'industry': audit.industry,
-                'location': audit.location
-            }
-            
-            recommendations = AuditAIService.generate_recommendations(audit_data, category_scores)
-            
-            # Save results
-            AuditResult.objects.update_or_create(
-                audit=audit,
-                defaults={
-                    'overall_score': overall_score,
-                    'category_scores': category_scores,
-                    'recommendations': recommendations
-                }
-            )
-            
-            audit.is_completed = True
-            audit.save()
+            if result.recommendations_status != 'pending' or time.monotonic() >= deadline:
+                break
+            time.sleep(RECOMMENDATIONS_POLL_INTERVAL)
         
-        return Response({'message': 'Audit completed successfully'})
+        return Response({
+            'recommendations_status': result.recommendations_status,
+            'recommendations': result.recommendations
+        })
+    
+    @action(detail=True, methods=['get'], url_path=r'report/(?P<report_format>[a-z]+)')
+    def report(self, request, pk=None, report_format='pdf'):
+        """Printable report as HTML or PDF from the disk cache; 202 with a Location to poll while it renders"""
+        audit = self.get_object()
+        try:
+            report = render_report(REPORT_TEMPLATE, report_context(audit), report_format)
+        except ReportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if report is None:
+            # Rendering on the pool; the client polls this same URL until it gets the file
+            response = Response({'status': 'rendering'}, status=status.HTTP_202_ACCEPTED)
+            response['Location'] = request.build_absolute_uri()
+            response['Retry-After'] = str(REPORT_RETRY_AFTER)
+            return response
+        return FileResponse(
+            report,
+            as_attachment=report_format == 'pdf',
+            filename=f'audit-{audit.pk}-report.{report_format}',
+            content_type=REPORT_FORMATS[report_format]
+        )
     
     @action(detail=True, methods=['get'])
     def results(self, request, pk=None):
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.authentication'
+
+    def ready(self):
+        # Tokens carry user claims, so changing or deleting a user revokes them (when JWT_REVOCATION is on)
+        from django.db.models.signals import post_delete, post_save
+        from token_auth import revoke_on_user_delete, revoke_on_user_save
+        from .models import User
+        post_save.connect(revoke_on_user_save, sender=User)
+        post_delete.connect(revoke_on_user_delete, sender=User)
@@ -1,3 +1,30 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from token_auth import ClaimsRefreshToken
+
+User = get_user_model()
+
+
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x', role='admin')
+        self.refresh = str(ClaimsRefreshToken.for_user(self.user))
+        self.client = APIClient()
+
+    def refresh_token(self):
+        return self.client.post('/api/token/refresh/', {'refresh': self.refresh}, format='json')
+
+    def test_demoted_user_gets_the_new_role(self):
+        User.objects.filter(pk=self.user.pk).update(role='user')
+
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'user')
+
+    def test_deactivated_user_is_refused(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.refresh_token().status_code, 401)
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+
+
+class AuditConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'audit'
+
+    def ready(self):
+        # Cached audit responses and user tokens are invalidated by model signals
+        from . import signals  # noqa: F401
+
+
+def start_background_workers():
+    """
+    Start this process's background workers so they pick up rows left by a previous process.
+    Called from the WSGI/ASGI entry points, so management commands and tests start no threads.
+    """
+    from .jobs import get_broker
+    from .outbox import get_sender
+    get_broker()
+    get_sender()
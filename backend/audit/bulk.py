@@ -0,0 +1,156 @@
+"""
+Bulk checklist generation for importing many audits at once.
+
+The API endpoint uses queue_bulk: the audits and one ChecklistJob each are
+inserted in batches and generation runs on the job broker, so the request
+returns at once. Jobs with identical prompts share one LLM call through the
+checklist cache and single-flight.
+
+The bulk_generate_checklists command uses generate_bulk, which works
+synchronously: specs that would produce the same prompt are generated once,
+unique prompts are fanned out over a bounded thread pool, and the audits and
+their checklist rows are written with batched inserts.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from django.db import transaction
+
+from .generation import checklist_cache_key, generate_checklist_text, get_checklist_generator, prompt_params
+from .jobs import enqueue_checklist_job
+from .materialize import DEFAULT_BATCH_SIZE, build_checklist_rows, parse_checklist
+from .models import Audit, Checklist, ChecklistJob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkItemResult:
+    index: int
+    status: str
+    audit_id: Optional[int] = None
+    rows: int = 0
+    deduplicated: bool = False
+    error: str = ''
+
+
+@dataclass
+class BulkReport:
+    items: List[BulkItemResult] = field(default_factory=list)
+    unique_prompts: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for item in self.items if item.status == 'created')
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for item in self.items if item.status == 'failed')
+
+    @property
+    def audits_per_minute(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.succeeded / self.elapsed_seconds * 60
+
+    def as_dict(self) -> Dict:
+        return {
+            'total': len(self.items),
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'unique_prompts': self.unique_prompts,
+            'elapsed_seconds': round(self.elapsed_seconds, 3),
+            'audits_per_minute': round(self.audits_per_minute, 1),
+            'items': [asdict(item) for item in self.items],
+        }
+
+
+def queue_bulk(specs: List[Dict], user, force_refresh: bool = False,
+               batch_size: int = DEFAULT_BATCH_SIZE) -> List[ChecklistJob]:
+    """Create an audit and a pending checklist job for every validated spec"""
+    with transaction.atomic():
+        audits = Audit.objects.bulk_create([Audit(created_by=user, **spec) for spec in specs], batch_size=batch_size)
+        jobs = ChecklistJob.objects.bulk_create(
+            [ChecklistJob(audit=audit, force_refresh=force_refresh) for audit in audits], batch_size=batch_size
+        )
+
+        def enqueue_all():
+            for job in jobs:
+                enqueue_checklist_job(job.id)
+
+        # Only hand the jobs to workers once the audit rows are visible to them
+        transaction.on_commit(enqueue_all)
+    return jobs
+
+
+def generate_bulk(specs: List[Dict], user, max_workers: int = 4,
+                  force_refresh: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> BulkReport:
+    """
+    Create an audit with a generated checklist for every validated spec.
+    Specs whose generation fails are reported and not saved.
+    """
+    started = time.perf_counter()
+    report = BulkReport()
+    generator = get_checklist_generator()
+
+    audits = [Audit(created_by=user, prompt_version=generator.prompt.tag, **spec) for spec in specs]
+
+    # Group identical prompts so each one is generated only once
+    groups: Dict[str, List[int]] = {}
+    for index, audit in enumerate(audits):
+        key = checklist_cache_key(generator, prompt_params(audit))
+        groups.setdefault(key, []).append(index)
+    report.unique_prompts = len(groups)
+
+    def generate(key):
+        representative = audits[groups[key][0]]
+        try:
+            return key, generate_checklist_text(representative, force_refresh=force_refresh), None
+        except Exception as e:
+            logger.exception("Bulk generation failed for prompt %s", key)
+            return key, None, str(e)
+
+    entries_by_key = {}
+    errors_by_key = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='checklist-bulk') as executor:
+        for key, checklist_text, error in executor.map(generate, groups):
+            if error is None:
+                entries_by_key[key] = parse_checklist(checklist_text)
+            else:
+                errors_by_key[key] = error
+
+    results = [None] * len(audits)
+    to_create = []
+    for key, indexes in groups.items():
+        for position, index in enumerate(indexes):
+            if key in errors_by_key:
+                results[index] = BulkItemResult(index=index, status='failed', error=errors_by_key[key])
+            else:
+                to_create.append((index, key, position > 0))
+    to_create.sort()
+    for index, key, _ in to_create:
+        audits[index].total_items = sum(1 for entry in entries_by_key[key] if not entry.is_category)
+
+    with transaction.atomic():
+        created = Audit.objects.bulk_create([audits[index] for index, _, _ in to_create], batch_size=batch_size)
+        rows = []
+        for audit, (index, key, deduplicated) in zip(created, to_create):
+            audit_rows = build_checklist_rows(audit, entries_by_key[key])
+            rows.extend(audit_rows)
+            results[index] = BulkItemResult(
+                index=index,
+                status='created',
+                audit_id=audit.id,
+                rows=len(audit_rows),
+                deduplicated=deduplicated
+            )
+        Checklist.objects.bulk_create(rows, batch_size=batch_size)
+
+    report.items = results
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
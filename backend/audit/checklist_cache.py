@@ -0,0 +1,195 @@
+"""
+Content-addressed cache for generated checklist text.
+
+Entries are keyed on a hash of the normalized prompt inputs, the prompt
+template version (see prompts.py) and the model name, so audits that ask for the same checklist share one LLM call. The
+backend is chosen by the CHECKLIST_CACHE setting:
+
+- ``locmem``: per-process LRU dict (default)
+- ``django``: any configured Django cache alias
+- ``sqlite``: a SQLite file shared by every process on the host
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def normalize_param(value: Optional[str]) -> str:
+    return ' '.join((value or '').split()).casefold()
+
+
+def make_cache_key(model_name: str, prompt: str = '', **prompt_params) -> str:
+    """Hash the prompt parameters, prompt template key and model name into a stable cache key"""
+    payload = {name: normalize_param(value) for name, value in prompt_params.items()}
+    payload['model'] = model_name
+    payload['prompt'] = prompt
+    encoded = json.dumps(payload, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ChecklistCache:
+    """Base class: subclasses implement _get/_set, this tracks hit/miss counters"""
+    # Whether other processes see this cache's entries
+    shared = False
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                'backend': type(self).__name__,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class LocMemChecklistCache(ChecklistCache):
+    def __init__(self, ttl: int, max_entries: int):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DjangoChecklistCache(ChecklistCache):
+    """Delegates storage, expiry and eviction to a Django cache alias"""
+
+    def __init__(self, ttl: int, alias: str = 'default'):
+        super().__init__(ttl)
+        self.alias = alias
+
+    @property
+    def shared(self):
+        return not isinstance(caches[self.alias], (LocMemCache, DummyCache))
+
+    def _get(self, key):
+        return caches[self.alias].get(f'checklist:{key}')
+
+    def _set(self, key, value):
+        caches[self.alias].set(f'checklist:{key}', value, self.ttl)
+
+
+class SQLiteChecklistCache(ChecklistCache):
+    shared = True
+
+    def __init__(self, ttl: int, max_entries: int, path: str):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS checklist_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS checklist_cache_accessed '
+                'ON checklist_cache (accessed_at)'
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _get(self, key):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                'SELECT value, expires_at FROM checklist_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute('DELETE FROM checklist_cache WHERE key = ?', (key,))
+                return None
+            conn.execute('UPDATE checklist_cache SET accessed_at = ? WHERE key = ?', (now, key))
+            return row[0]
+
+    def _set(self, key, value):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO checklist_cache (key, value, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, value, now + self.ttl, now)
+            )
+            # Evict the least recently used rows beyond max_entries
+            conn.execute(
+                'DELETE FROM checklist_cache WHERE key IN ('
+                'SELECT key FROM checklist_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_checklist_cache() -> ChecklistCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            options = getattr(settings, 'CHECKLIST_CACHE', {})
+            backend = options.get('BACKEND', 'locmem')
+            ttl = options.get('TTL', 60 * 60 * 24)
+            max_entries = options.get('MAX_ENTRIES', 1000)
+            if backend == 'locmem':
+                _cache = LocMemChecklistCache(ttl, max_entries)
+            elif backend == 'django':
+                _cache = DjangoChecklistCache(ttl, options.get('ALIAS', 'default'))
+            elif backend == 'sqlite':
+                _cache = SQLiteChecklistCache(ttl, max_entries, options['LOCATION'])
+            else:
+                raise ValueError(f"Unknown CHECKLIST_CACHE backend: {backend}")
+        return _cache
@@ -0,0 +1,151 @@
+"""
+Streaming export of audits with their checklists as CSV, JSONL or XLSX.
+
+Rows come from one LEFT JOIN of audits and checklist rows ordered by
+(audit, order, id), read with iterator(chunk_size=...) so only one chunk is
+held in memory (a server-side cursor on PostgreSQL). CSV has one line per
+checklist row with the audit columns repeated; JSONL has one line per audit
+with its checklist nested. XLSX uses openpyxl's write-only mode, which spools
+rows to a temporary file, and needs the openpyxl package (lxml makes it faster).
+
+In CSV and XLSX, text that a spreadsheet would read as a formula is prefixed
+with an apostrophe; JSONL keeps values as they are.
+"""
+
+import csv
+import json
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from typing import IO, Iterable, Iterator
+
+from django.conf import settings
+
+AUDIT_FIELDS = (
+    'id', 'title', 'audit_type', 'organization', 'industry', 'complexity_level',
+    'created_at', 'updated_at', 'is_completed', 'completion_date', 'total_items', 'completed_items',
+)
+CHECKLIST_FIELDS = ('id', 'order', 'item', 'is_completed', 'completed_at', 'notes')
+
+CSV_HEADER = [f'audit_{name}' for name in AUDIT_FIELDS] + [f'checklist_{name}' for name in CHECKLIST_FIELDS]
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+
+# Spreadsheets evaluate cells starting with these as formulas (CSV injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Rows per worksheet, the header included; longer exports continue on a new sheet
+XLSX_MAX_ROWS = 1048576
+
+
+class ExportError(Exception):
+    """Raised when an export format is unknown or cannot be produced here"""
+
+
+def chunk_size() -> int:
+    return getattr(settings, 'AUDIT_EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_rows(audits, size: int = None) -> Iterator[tuple]:
+    """
+    Flat (audit fields..., checklist fields...) tuples for the given audit queryset.
+    Audits without checklist rows yield one row with the checklist fields set to None.
+    """
+    columns = list(AUDIT_FIELDS) + [f'checklists__{name}' for name in CHECKLIST_FIELDS]
+    rows = (
+        audits.values_list(*columns)
+        .order_by('id', 'checklists__order', 'checklists__id')
+    )
+    return rows.iterator(chunk_size=size or chunk_size())
+
+
+def _text(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _cell(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else _text(value)
+
+
+class _Echo:
+    """File-like object whose write() returns the line, so csv.writer can feed a generator"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for row in rows:
+        yield writer.writerow([_cell(value) for value in row])
+
+
+def jsonl_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    """One JSON object per audit; rows arrive grouped by audit, so one audit is held at a time"""
+    audit_width = len(AUDIT_FIELDS)
+    for _, audit_rows in groupby(rows, key=itemgetter(0)):
+        checklist = []
+        for row in audit_rows:
+            audit = row[:audit_width]
+            if row[audit_width] is not None:
+                checklist.append(dict(zip(CHECKLIST_FIELDS, row[audit_width:])))
+        yield json.dumps({**dict(zip(AUDIT_FIELDS, audit)), 'checklist': checklist}, default=str) + '\n'
+
+
+def write_xlsx(rows: Iterable[tuple], output: IO[bytes]) -> None:
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportError("XLSX export needs the openpyxl package")
+
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows = None, XLSX_MAX_ROWS
+    for row in rows:
+        if sheet_rows == XLSX_MAX_ROWS:
+            sheet = workbook.create_sheet(f'Checklists {len(workbook.worksheets) + 1}' if sheet else 'Checklists')
+            sheet.append(CSV_HEADER)
+            sheet_rows = 1
+        # openpyxl rejects timezone-aware datetimes; the values are UTC
+        sheet.append([value.replace(tzinfo=None) if getattr(value, 'tzinfo', None) else _text(value) for value in row])
+        sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet('Checklists').append(CSV_HEADER)
+    workbook.save(output)
+
+
+def xlsx_file(rows: Iterable[tuple]) -> IO[bytes]:
+    """Build the workbook in a temporary file and return it rewound"""
+    output = tempfile.TemporaryFile()
+    try:
+        write_xlsx(rows, output)
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+def check_format(export_format: str) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format '{export_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+
+
+def write_export(audits, export_format: str, output: IO[bytes], size: int = None) -> None:
+    """Write an export to a binary file object"""
+    check_format(export_format)
+    rows = export_rows(audits, size)
+    if export_format == 'xlsx':
+        write_xlsx(rows, output)
+        return
+    lines = csv_lines(rows) if export_format == 'csv' else jsonl_lines(rows)
+    for line in lines:
+        output.write(line.encode('utf-8'))
+
@@ -0,0 +1,126 @@
+import os
+import sys
+from typing import Iterator, Optional
+from django.conf import settings
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from chat import AuditChecklistGenerator
+from prompts import PromptTemplate, get_prompt
+from checklist_schema import ChecklistParseError, ChecklistParser, parse_checklist, require_questions
+from .checklist_cache import get_checklist_cache, make_cache_key
+from .models import Audit
+from .singleflight import get_single_flight
+
+# Load environment variables
+load_dotenv()
+
+
+class ChecklistGenerationError(Exception):
+    """Raised when the checklist generator returns an error instead of a checklist"""
+
+
+def validated_checklist(parsed) -> str:
+    """
+    The checklist as canonical JSON, the form that is cached. Output without any
+    questions raises instead, so it is never cached or written.
+    """
+    try:
+        return require_questions(parsed).to_json()
+    except ChecklistParseError as e:
+        raise ChecklistGenerationError(str(e))
+
+
+def checklist_prompt() -> PromptTemplate:
+    """The prompt template checklists are generated with; its tag is recorded on the audit"""
+    return get_prompt('checklist')
+
+
+def get_checklist_generator() -> AuditChecklistGenerator:
+    """Build a checklist generator from the GEMINI_API_KEY environment variable"""
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise ChecklistGenerationError("GEMINI_API_KEY not found in environment variables")
+    return AuditChecklistGenerator(api_key, prompt=checklist_prompt())
+
+
+def checklist_cache_key(generator: AuditChecklistGenerator, params: dict) -> str:
+    return make_cache_key(generator.model_name, prompt=generator.prompt.cache_key, **params)
+
+
+def prompt_params(audit: Audit) -> dict:
+    """The audit fields that go into the checklist prompt"""
+    return {
+        'audit_type': audit.audit_type,
+        'organization': audit.organization,
+        'industry': audit.industry,
+        'specific_requirements': audit.specific_requirements,
+        'complexity_level': audit.complexity_level,
+    }
+
+
+def generation_deadline(deadline: Optional[float]) -> Optional[float]:
+    """Seconds an LLM call may take in total, retries included"""
+    if deadline is None:
+        deadline = getattr(settings, 'CHECKLIST_GENERATION_DEADLINE', None)
+    return deadline or None
+
+
+def generate_checklist_text(audit: Audit, force_refresh: bool = False, deadline: Optional[float] = None) -> str:
+    """
+    Return the validated checklist for an audit as JSON, from the cache when possible.
+    deadline bounds the LLM call in seconds and defaults to CHECKLIST_GENERATION_DEADLINE.
+    """
+    generator = get_checklist_generator()
+    params = prompt_params(audit)
+    deadline = generation_deadline(deadline)
+
+    def generate():
+        checklist_text = generator.generate_checklist(**params, deadline=deadline)
+        # chat.py reports failures in-band rather than raising
+        if checklist_text.startswith('Error generating checklist'):
+            raise ChecklistGenerationError(checklist_text)
+        return validated_checklist(parse_checklist(checklist_text))
+
+    cache = get_checklist_cache()
+    cache_key = checklist_cache_key(generator, params)
+    if not force_refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    def generate_and_store():
+        checklist_text = generate()
+        cache.set(cache_key, checklist_text)
+        return checklist_text
+
+    # Identical prompts already being generated elsewhere are waited on instead of sent again
+    return get_single_flight().do(cache_key, generate_and_store, recheck=lambda: cache.get(cache_key))
+
+
+def stream_checklist_text(audit: Audit, force_refresh: bool = False,
+                          deadline: Optional[float] = None) -> Iterator[str]:
+    """
+    Stream the raw checklist text for an audit as the LLM produces it.
+    It is validated as it arrives and cached once complete, if it holds a checklist.
+    """
+    generator = get_checklist_generator()
+    params = prompt_params(audit)
+    cache = get_checklist_cache()
+    cache_key = checklist_cache_key(generator, params)
+
+    if not force_refresh:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+    parser = ChecklistParser()
+    for chunk in generator.generate_checklist_stream(**params, deadline=generation_deadline(deadline)):
+        parser.feed(chunk)
+        yield chunk
+    parser.close()
+    try:
+        cache.set(cache_key, validated_checklist(parser.result))
+    except ChecklistGenerationError:
+        pass  # The materializer reports what it could not parse
@@ -0,0 +1,195 @@
+"""
+Background checklist generation jobs.
+
+Creating an audit only records a ChecklistJob row. The LLM call and the
+checklist inserts happen later on a broker selected by CHECKLIST_JOB_BROKER:
+
+- ``local``: a thread pool inside the web process (default, works offline).
+  It also sweeps the table every CHECKLIST_JOB_SWEEP_INTERVAL seconds, so
+  jobs that were queued in memory by a process that has since stopped still run
+- ``database``: pending rows stay in the database until the
+  ``run_checklist_worker`` management command claims them
+
+A claim lasts CHECKLIST_JOB_CLAIM_TIMEOUT seconds. After that a job still
+marked running is assumed to belong to a crashed worker and may be claimed
+again; the old worker can then no longer record a result for it.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .generation import checklist_prompt, generate_checklist_text
+from .materialize import materialize_checklist
+from .models import ChecklistJob
+
+logger = logging.getLogger(__name__)
+
+# Jobs queued per sweep of the local broker; the rest wait for the next sweep
+SWEEP_BATCH_SIZE = 100
+
+
+class LocalBroker:
+    """Runs jobs on a thread pool owned by the current process"""
+
+    def __init__(self, max_workers: int, sweep_interval: float = 0):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='checklist-job'
+        )
+        # Jobs submitted and not finished yet, so sweeps don't queue them twice
+        self.queued = set()
+        self.lock = threading.Lock()
+        if sweep_interval:
+            threading.Thread(
+                target=self.sweep_forever, args=(sweep_interval,), name='checklist-job-sweeper', daemon=True
+            ).start()
+
+    def enqueue(self, job_id: int) -> None:
+        with self.lock:
+            if job_id in self.queued:
+                return
+            self.queued.add(job_id)
+        self.executor.submit(self.run, job_id)
+
+    def run(self, job_id: int) -> None:
+        try:
+            run_checklist_job(job_id)
+        finally:
+            with self.lock:
+                self.queued.discard(job_id)
+
+    def sweep(self) -> None:
+        """Queue due jobs: pending ones nobody has queued and running ones whose claim expired"""
+        for job_id in due_job_ids(limit=SWEEP_BATCH_SIZE):
+            self.enqueue(job_id)
+
+    def sweep_forever(self, interval: float) -> None:
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception("Checklist job sweep failed")
+            finally:
+                close_old_connections()
+            time.sleep(interval)
+
+
+class DatabaseBroker:
+    """Leaves pending jobs in the database for run_checklist_worker to pick up"""
+
+    def enqueue(self, job_id: int) -> None:
+        pass
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            broker_name = getattr(settings, 'CHECKLIST_JOB_BROKER', 'local')
+            if broker_name == 'local':
+                _broker = LocalBroker(
+                    getattr(settings, 'CHECKLIST_JOB_WORKERS', 4),
+                    getattr(settings, 'CHECKLIST_JOB_SWEEP_INTERVAL', 60)
+                )
+            elif broker_name == 'database':
+                _broker = DatabaseBroker()
+            else:
+                raise ValueError(f"Unknown CHECKLIST_JOB_BROKER: {broker_name}")
+        return _broker
+
+
+def enqueue_checklist_job(job_id: int) -> None:
+    get_broker().enqueue(job_id)
+
+
+def claim_timeout() -> timedelta:
+    return timedelta(seconds=getattr(settings, 'CHECKLIST_JOB_CLAIM_TIMEOUT', 600))
+
+
+def expired_claims(now: datetime) -> Q:
+    """Running jobs matching this are reclaimable"""
+    return Q(claimed_at__lt=now - claim_timeout()) | Q(claimed_at__isnull=True)  # Null: claimed before claims expired
+
+
+def due_jobs(now: datetime) -> Q:
+    """Pending jobs and running jobs whose claim has expired"""
+    return Q(status='pending') | (Q(status='running') & expired_claims(now))
+
+
+def claim_job(job_id: int) -> Optional[datetime]:
+    """Move a due job to running; the claim time, or None if another worker holds the job"""
+    now = timezone.now()
+    claimed = ChecklistJob.objects.filter(due_jobs(now), pk=job_id).update(
+        status='running',
+        started_at=now,
+        claimed_at=now
+    )
+    return now if claimed else None
+
+
+def due_job_ids(limit: int) -> List[int]:
+    """The oldest due jobs, reclaimable ones first"""
+    # One query per status, so each is served by its partial index instead of scanning finished jobs
+    now = timezone.now()
+    job_ids = list(
+        ChecklistJob.objects.filter(expired_claims(now), status='running')
+        .order_by('created_at')
+        .values_list('id', flat=True)[:limit]
+    )
+    if len(job_ids) < limit:
+        job_ids += ChecklistJob.objects.filter(status='pending').order_by('created_at').values_list(
+            'id', flat=True
+        )[:limit - len(job_ids)]
+    return job_ids
+
+
+def run_checklist_job(job_id: int) -> Optional[ChecklistJob]:
+    """Generate and store the checklist for one job, recording the outcome on the job row"""
+    close_old_connections()
+    try:
+        claimed_at = claim_job(job_id)
+        if claimed_at is None:
+            return None
+
+        job = ChecklistJob.objects.select_related('audit').get(pk=job_id)
+        # Results are only recorded while the claim is still ours
+        claimed = ChecklistJob.objects.filter(pk=job_id, status='running', claimed_at=claimed_at)
+        try:
+            # The LLM call runs outside any transaction so no locks are held while waiting
+            checklist_text = generate_checklist_text(job.audit, force_refresh=job.force_refresh)
+            with transaction.atomic():
+                if not claimed.select_for_update().exists():
+                    logger.warning("Checklist job %s was reclaimed before it finished", job_id)
+                    return None
+                result = materialize_checklist(job.audit, checklist_text, prompt_version=checklist_prompt().tag)
+                job.status = 'succeeded'
+                job.rows_written = result.rows
+                job.materialize_ms = result.duration_ms
+                job.finished_at = timezone.now()
+                job.save(update_fields=['status', 'rows_written', 'materialize_ms', 'finished_at'])
+            logger.info("Checklist job %s wrote %d rows in %.1f ms",
+                        job_id, result.rows, result.duration_ms)
+        except Exception as e:
+            logger.exception("Checklist job %s failed", job_id)
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = timezone.now()
+            if not claimed.update(status=job.status, error=job.error, finished_at=job.finished_at):
+                logger.warning("Checklist job %s was reclaimed before it failed", job_id)
+                return None
+        return job
+    finally:
+        close_old_connections()
@@ -0,0 +1,69 @@
+import io
+import time
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from audit.export import EXPORT_FORMATS, write_export
+from audit.models import Audit, Checklist
+
+
+class _CountingSink(io.RawIOBase):
+    """Discards what is written and counts the bytes"""
+
+    def __init__(self):
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+class Command(BaseCommand):
+    help = 'Time an export over generated checklist rows and report peak Python memory (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Number of checklist rows to generate')
+        parser.add_argument('--items-per-audit', type=int, default=50)
+        parser.add_argument('--format', dest='export_format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per query (default AUDIT_EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(options['rows'], options['items_per_audit'])
+
+            sink = _CountingSink()
+            tracemalloc.start()
+            started = time.perf_counter()
+            write_export(Audit.objects.all(), options['export_format'], sink, options['chunk_size'])
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"rows:        {options['rows']}")
+        self.stdout.write(f"format:      {options['export_format']}")
+        self.stdout.write(f"bytes:       {sink.size}")
+        self.stdout.write(f"seconds:     {elapsed:.1f}")
+        self.stdout.write(f"peak memory: {peak / 1024 / 1024:.1f} MiB")
+
+    def populate(self, rows, per_audit):
+        user = User.objects.create_user(username=f'export-benchmark-{time.time_ns()}')
+        remaining = rows
+        while remaining:
+            batch = min(remaining, per_audit * 200)
+            audits = Audit.objects.bulk_create([
+                Audit(title=f'Export benchmark {i}', created_by=user, total_items=per_audit)
+                for i in range(-(-batch // per_audit))
+            ])
+            Checklist.objects.bulk_create([
+                Checklist(audit=audit, item=f'Check control {order} is documented and reviewed', order=order)
+                for audit in audits for order in range(1, per_audit + 1)
+            ][:batch], batch_size=5000)
+            remaining -= batch
@@ -0,0 +1,81 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from audit.models import Audit
+from audit.stats import compute_stats, get_stats
+
+INDUSTRIES = ['Technology', 'Healthcare', 'Finance', 'Manufacturing', 'Retail', 'General']
+COMPLEXITY = ['basic', 'intermediate', 'advanced']
+
+
+class Command(BaseCommand):
+    help = 'Time the dashboard statistics over generated audits (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--audits', type=int, default=100000, help='Number of audits to generate')
+        parser.add_argument('--days', type=int, default=730, help='Spread creation dates over this many days')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs; the best one is reported')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            staff = self.populate(options['audits'], options['days'])
+
+            with CaptureQueriesContext(connection) as ctx:
+                compute_stats(staff)
+            queries = len(ctx.captured_queries)
+
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                compute_stats(staff)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            get_stats(staff, refresh=True)
+            started = time.perf_counter()
+            get_stats(staff)
+            cached_ms = (time.perf_counter() - started) * 1000
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"audits:          {options['audits']}")
+        self.stdout.write(f"queries:         {queries}")
+        self.stdout.write(f"uncached (best): {min(timings):.1f} ms")
+        self.stdout.write(f"cached:          {cached_ms:.2f} ms")
+
+    def populate(self, count, days=730):
+        suffix = time.time_ns()
+        staff = User.objects.create_user(username=f'stats-staff-{suffix}', password=None, is_staff=True)
+        owner = User.objects.create_user(username=f'stats-owner-{suffix}', password=None)
+        now = timezone.now()
+        audits = []
+        for i in range(count):
+            total = random.choice([0, 20, 30, 40])
+            completed = random.randint(0, total)
+            audits.append(Audit(
+                title=f'Benchmark audit {i}',
+                industry=random.choice(INDUSTRIES),
+                complexity_level=random.choice(COMPLEXITY),
+                created_by=owner,
+                total_items=total,
+                completed_items=completed,
+                is_completed=total > 0 and completed == total,
+                completion_date=now if total > 0 and completed == total else None,
+            ))
+        created = Audit.objects.bulk_create(audits, batch_size=2000)
+
+        # auto_now_add stamps every row with now; spread them over --days instead
+        ids = sorted(audit.pk for audit in created)
+        per_day = max(1, len(ids) // days)
+        for day, start in enumerate(range(0, len(ids), per_day)):
+            stamp = now - timedelta(days=day % days, hours=random.randint(0, 23))
+            chunk = Audit.objects.filter(pk__gte=ids[start], pk__lte=ids[min(start + per_day, len(ids)) - 1])
+            chunk.update(created_at=stamp, updated_at=stamp)
+            chunk.filter(is_completed=True).update(completion_date=stamp + timedelta(hours=1))
+        return staff
@@ -0,0 +1,87 @@
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from audit.serializers import LoginSerializer
+from password_hashers import HASHERS, password_hashers
+
+PASSWORD = 'correct horse battery staple'
+
+
+class Command(BaseCommand):
+    help = 'Time logins through LoginSerializer for each password hasher (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hashers', default='pbkdf2,scrypt',
+                            help=f"Comma-separated hashers to compare ({', '.join(HASHERS)})")
+        parser.add_argument('--logins', type=int, default=50, help='Timed logins per hasher')
+        parser.add_argument('--users', type=int, default=10000, help='Accounts in auth_user during the run')
+        parser.add_argument('--by', choices=['email', 'username'], default='email', help='Log in by email or username')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['hashers'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in HASHERS]
+        if unknown:
+            raise CommandError(f"Unknown hashers: {', '.join(unknown)}")
+
+        self.stdout.write(f"users: {options['users']}, logins per hasher: {options['logins']}, by {options['by']}")
+        self.stdout.write(f"{'hasher':<8} {'p50 ms':>8} {'p99 ms':>8} {'logins/s/core':>14} {'rehash ms':>10}  stored as")
+        for name in names:
+            with override_settings(PASSWORD_HASHER=name, PASSWORD_HASHERS=password_hashers(name)):
+                if settings.PASSWORD_HASHERS[0] != HASHERS[name]:
+                    self.stdout.write(f"{name:<8} skipped, its package is not installed")
+                    continue
+                with transaction.atomic():
+                    self.run(name, options)
+                    transaction.set_rollback(True)
+
+    def run(self, name, options):
+        users = self.populate(options['users'])
+        field = options['by']
+
+        # An account still stored as PBKDF2 with 600k iterations is rehashed by its first login
+        legacy = users[0]
+        pbkdf2 = PBKDF2PasswordHasher()
+        legacy.password = pbkdf2.encode(PASSWORD, pbkdf2.salt(), iterations=600000)
+        legacy.save(update_fields=['password'])
+        started = time.perf_counter()
+        self.login(legacy, field)
+        rehash_ms = (time.perf_counter() - started) * 1000
+        legacy.refresh_from_db(fields=['password'])
+        stored = identify_hasher(legacy.password).safe_summary(legacy.password)
+
+        timings = []
+        cpu_started = time.process_time()
+        for user in random.sample(users[1:], min(options['logins'], len(users) - 1)):
+            started = time.perf_counter()
+            self.login(user, field)
+            timings.append((time.perf_counter() - started) * 1000)
+        cpu = time.process_time() - cpu_started
+
+        p50 = statistics.median(timings)
+        p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+        stored_as = ' '.join(f'{key}={value}' for key, value in stored.items() if key in (
+            'algorithm', 'iterations', 'work factor', 'block size', 'time cost', 'memory cost'))
+        self.stdout.write(f"{name:<8} {p50:>8.1f} {p99:>8.1f} {len(timings) / cpu:>14.1f} {rehash_ms:>10.1f}  {stored_as}")
+
+    def login(self, user, field):
+        credentials = {'username': user.username} if field == 'username' else {'email': user.email.lower()}
+        serializer = LoginSerializer(data={**credentials, 'password': PASSWORD})
+        if not serializer.is_valid():
+            raise CommandError(f"Login failed for {user.username}: {serializer.errors}")
+
+    def populate(self, count):
+        # One hash shared by every account; logins verify it with the hasher under test
+        password = make_password(PASSWORD)
+        suffix = time.time_ns()
+        return User.objects.bulk_create([
+            User(username=f'login-{suffix}-{i}', email=f'Login.{suffix}.{i}@Example.com', password=password)
+            for i in range(count)
+        ], batch_size=2000)
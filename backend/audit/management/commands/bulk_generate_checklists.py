@@ -0,0 +1,49 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.bulk import generate_bulk
+from audit.serializers import AuditSerializer
+
+
+class Command(BaseCommand):
+    help = 'Create audits with generated checklists from a JSON file containing a list of audit specs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON file with a list of audits (title, audit_type, industry, ...)')
+        parser.add_argument('--user', required=True, help='Username that will own the audits')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent LLM generations')
+        parser.add_argument('--refresh', action='store_true', help='Ignore cached checklists')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        with open(options['path'], encoding='utf-8') as f:
+            specs = json.load(f)
+
+        serializer = AuditSerializer(data=specs, many=True)
+        if not serializer.is_valid():
+            raise CommandError(f"Invalid audit specs: {serializer.errors}")
+
+        report = generate_bulk(
+            serializer.validated_data,
+            user=user,
+            max_workers=options['workers'],
+            force_refresh=options['refresh']
+        )
+
+        for item in report.items:
+            if item.status == 'created':
+                note = ' (deduplicated)' if item.deduplicated else ''
+                self.stdout.write(f"#{item.index}: audit {item.audit_id}, {item.rows} items{note}")
+            else:
+                self.stdout.write(self.style.ERROR(f"#{item.index}: failed: {item.error}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.succeeded}/{len(report.items)} audits from {report.unique_prompts} unique prompts "
+            f"in {report.elapsed_seconds:.1f}s ({report.audits_per_minute:.1f} audits/min)"
+        ))
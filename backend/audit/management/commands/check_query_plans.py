@@ -0,0 +1,89 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from audit.jobs import expired_claims
+from audit.models import Audit, Checklist, ChecklistJob
+from audit.pagination import AuditCursorPagination, ChecklistCursorPagination
+from audit.serializers import LoginSerializer
+from query_plans import check_plan, index_friendly_planner
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the audit list/retrieve/checklist queries and fail if they do not use indexes (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failing ones')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            with index_friendly_planner():
+                checks = self.run_checks()
+            transaction.set_rollback(True)
+
+        failed = [check for check in checks if not check.ok]
+        for check in checks:
+            status = self.style.SUCCESS('ok') if check.ok else self.style.ERROR('FAIL')
+            self.stdout.write(f"{status:>4} {check.name}: {'; '.join(check.problems) or 'index used'}")
+            if options['verbose_plans'] or not check.ok:
+                self.stdout.write(f"     {check.plan}".replace('\n', '\n     '))
+        if failed:
+            raise CommandError(f"{len(failed)} of {len(checks)} queries do not use an index")
+
+    def run_checks(self):
+        user = User.objects.create_user(username=f'plans-{time.time_ns()}', email='Plans@Example.com', password=None)
+        audit = Audit.objects.create(title='Query plan check', created_by=user)
+        Checklist.objects.bulk_create([
+            Checklist(audit=audit, item=f'Item {order}', order=order) for order in range(1, 6)
+        ])
+        page_size = AuditCursorPagination.page_size + 1
+
+        return [
+            check_plan(
+                'audit list (owner)',
+                Audit.objects.select_related('created_by').filter(created_by=user)
+                .order_by(*AuditCursorPagination.ordering)[:page_size],
+                sorted_by_index=True
+            ),
+            check_plan(
+                'audit list (owner, next page)',
+                Audit.objects.filter(created_by=user, created_at__lt=audit.created_at)
+                .order_by(*AuditCursorPagination.ordering)[:page_size],
+                sorted_by_index=True
+            ),
+            check_plan(
+                'audit retrieve',
+                Audit.objects.select_related('created_by').filter(created_by=user, pk=audit.pk)
+            ),
+            check_plan(
+                'checklist prefetch',
+                Checklist.objects.filter(audit_id__in=[audit.pk]).order_by('order', 'id'),
+                sorted_by_index=True
+            ),
+            check_plan(
+                'checklist list (owner)',
+                Checklist.objects.filter(audit=audit)
+                .order_by(*ChecklistCursorPagination.ordering)[:ChecklistCursorPagination.page_size + 1]
+            ),
+            check_plan(
+                'open checklist items',
+                Checklist.objects.filter(audit=audit, is_completed=False).order_by('order'),
+                sorted_by_index=True
+            ),
+            check_plan('login (username)', LoginSerializer.lookup_users(username=user.username)),
+            check_plan('login (email)', LoginSerializer.lookup_users(email='plans@example.com')),
+            check_plan(
+                'pending jobs',
+                ChecklistJob.objects.filter(status='pending').order_by('created_at')[:10],
+                sorted_by_index=True
+            ),
+            check_plan(
+                'reclaimable jobs',
+                ChecklistJob.objects.filter(expired_claims(timezone.now()), status='running')
+                .order_by('created_at')[:10],
+                sorted_by_index=True
+            ),
+        ]
@@ -0,0 +1,46 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from audit.export import EXPORT_FORMATS, ExportError, write_export
+from audit.models import Audit
+
+
+class Command(BaseCommand):
+    help = 'Export audits with their checklists as CSV, JSONL or XLSX, streaming the rows in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help="File to write, '-' for stdout (not for xlsx)")
+        parser.add_argument('--user', help='Only export audits created by this username')
+        parser.add_argument('--audit', type=int, action='append', dest='audit_ids', help='Only export this audit (repeatable)')
+        parser.add_argument('--completed', choices=['true', 'false'], help='Only export completed or open audits')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched per query (default AUDIT_EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        audits = Audit.objects.all()
+        if options['user']:
+            try:
+                audits = audits.filter(created_by=User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f"No user named '{options['user']}'")
+        if options['audit_ids']:
+            audits = audits.filter(pk__in=options['audit_ids'])
+        if options['completed']:
+            audits = audits.filter(is_completed=options['completed'] == 'true')
+
+        export_format = options['export_format']
+        if options['output'] == '-' and export_format == 'xlsx':
+            raise CommandError("XLSX exports need --output")
+
+        try:
+            if options['output'] == '-':
+                write_export(audits, export_format, sys.stdout.buffer, options['chunk_size'])
+                sys.stdout.buffer.flush()
+            else:
+                with open(options['output'], 'wb') as output:
+                    write_export(audits, export_format, output, options['chunk_size'])
+                self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        except ExportError as e:
+            raise CommandError(str(e))
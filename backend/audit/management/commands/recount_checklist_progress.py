@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from audit.progress import recount_progress
+
+
+class Command(BaseCommand):
+    help = 'Recompute Audit.total_items/completed_items from the checklist rows with one GROUP BY'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many audits have drifted')
+
+    def handle(self, *args, **options):
+        drifted = recount_progress(dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{drifted} audits have drifted counters")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Fixed counters of {drifted} audits"))
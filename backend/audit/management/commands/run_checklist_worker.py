@@ -0,0 +1,32 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from audit.jobs import due_job_ids, run_checklist_job
+
+
+class Command(BaseCommand):
+    help = 'Process pending checklist generation jobs and reclaim expired ones (used with CHECKLIST_JOB_BROKER=database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Number of concurrent generations')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        self.stdout.write(f"Checklist worker started with {workers} workers")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='checklist-worker') as executor:
+            while True:
+                job_ids = due_job_ids(limit=workers)
+                if not job_ids:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                for job in executor.map(run_checklist_job, job_ids):
+                    if job is not None:
+                        self.stdout.write(f"Job {job.id} for audit {job.audit_id}: {job.status}")
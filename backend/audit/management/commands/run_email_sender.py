@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from audit.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox (used with EMAIL_OUTBOX_BROKER=database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Emails sent per SMTP connection (default EMAIL_OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when nothing is due')
+        parser.add_argument('--once', action='store_true', help='Send what is due once and exit')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Email sender started")
+        while True:
+            result = send_pending(options['batch_size'])
+            if result.sent or result.retried or result.failed:
+                self.stdout.write(f"sent {result.sent}, retrying {result.retried}, failed {result.failed}")
+            if options['once']:
+                break
+            time.sleep(options['poll_interval'])
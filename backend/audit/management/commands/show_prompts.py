@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from prompts import estimate_tokens, registered_prompts
+
+
+class Command(BaseCommand):
+    help = 'List the registered prompt templates with their fingerprints and estimated token counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show', metavar='TAG', help='Also print the system and template text of one prompt (name@version)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'prompt':<28} {'fingerprint':<13} {'system':>7} {'template':>9}")
+        for template in registered_prompts():
+            # The system part is the static prefix providers can cache; the template is sent per call
+            self.stdout.write(
+                f"{template.tag:<28} {template.fingerprint:<13} "
+                f"{estimate_tokens(template.system):>7} {estimate_tokens(template.template):>9}"
+            )
+            if options['show'] == template.tag:
+                self.stdout.write(f"\n[system]\n{template.system}\n\n[template]\n{template.template}")
+        self.stdout.write("(estimated tokens)")
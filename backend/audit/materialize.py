@@ -0,0 +1,133 @@
+"""
+Checklist materialization: turn generator output into Checklist rows.
+
+Parsing happens in memory first, then the rows are written with batched
+INSERTs instead of one round trip per line. Streamed output is written one
+category at a time. Output is read with the shared parser in
+checklist_schema.py, which accepts the JSON the generator asks for as well
+as the older text format.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Tuple
+
+from django.db.models import F
+
+from checklist_schema import ChecklistParser
+
+from .models import CATEGORY_PREFIX, Audit, Checklist
+from .response_cache import touch_audit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class ChecklistEntry:
+    item: str
+    is_category: bool = False
+
+
+@dataclass
+class MaterializeResult:
+    rows: int
+    duration_ms: float
+
+
+class ChecklistStreamParser:
+    """
+    Turns generator output, complete or in streamed chunks, into checklist entries.
+    Category headings become "Category N: Name" rows. Diagnostics for skipped or
+    repaired output are logged when the stream ends.
+    """
+
+    def __init__(self):
+        self.parser = ChecklistParser()
+        self.categories = 0
+
+    def _entries(self, parsed) -> List[ChecklistEntry]:
+        entries = []
+        for entry in parsed:
+            if entry.is_category:
+                self.categories += 1
+                entries.append(ChecklistEntry(item=f"{CATEGORY_PREFIX} {self.categories}: {entry.text}", is_category=True))
+            else:
+                entries.append(ChecklistEntry(item=entry.text))
+        return entries
+
+    def feed(self, chunk: str) -> List[ChecklistEntry]:
+        return self._entries(self.parser.feed(chunk))
+
+    def close(self) -> List[ChecklistEntry]:
+        entries = self._entries(self.parser.close())
+        for diagnostic in self.parser.result.diagnostics:
+            logger.warning("Checklist output: %s", diagnostic)
+        return entries
+
+
+def parse_checklist(checklist_text: str) -> List[ChecklistEntry]:
+    """Parse generated checklist text (JSON or the "Category N:" / "- question" format) into ordered entries"""
+    parser = ChecklistStreamParser()
+    return parser.feed(checklist_text) + parser.close()
+
+
+def build_checklist_rows(audit: Audit, entries: List[ChecklistEntry], start_order: int = 1) -> List[Checklist]:
+    return [
+        Checklist(audit=audit, item=entry.item, order=order, is_completed=False)
+        for order, entry in enumerate(entries, start=start_order)
+    ]
+
+
+def count_items(rows: Iterable[Checklist]) -> int:
+    """Number of rows that are checklist items rather than category headings"""
+    return sum(1 for row in rows if not row.item.startswith(CATEGORY_PREFIX))
+
+
+def materialize_checklist(audit: Audit, checklist_text: str, prompt_version: str = '',
+                          batch_size: int = DEFAULT_BATCH_SIZE) -> MaterializeResult:
+    """Parse checklist text and bulk insert it for the audit, recording the prompt it came from"""
+    started = time.perf_counter()
+    rows = build_checklist_rows(audit, parse_checklist(checklist_text))
+    Checklist.objects.bulk_create(rows, batch_size=batch_size)
+    # bulk_create sends no signals, so count the items and invalidate cached responses here
+    touch_audit(audit.pk, total_items=F('total_items') + count_items(rows), prompt_version=prompt_version)
+    return MaterializeResult(
+        rows=len(rows),
+        duration_ms=(time.perf_counter() - started) * 1000
+    )
+
+
+def stream_materialize_checklist(audit: Audit, chunks: Iterable[str], prompt_version: str = '',
+                                 batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[ChecklistEntry, Checklist]]:
+    """
+    Parse streamed checklist text, yielding each entry and its row as soon as its line is complete.
+    Rows are written one category at a time, when the next category starts or the stream ends.
+    """
+    parser = ChecklistStreamParser()
+    pending = []
+    order = 1
+
+    def flush():
+        Checklist.objects.bulk_create(pending, batch_size=batch_size)
+        touch_audit(audit.pk, total_items=F('total_items') + count_items(pending), prompt_version=prompt_version)
+        pending.clear()
+
+    def handle(entries):
+        nonlocal order
+        for entry in entries:
+            if entry.is_category and pending:
+                flush()
+            row = Checklist(audit=audit, item=entry.item, order=order, is_completed=False)
+            order += 1
+            pending.append(row)
+            yield entry, row
+
+    for chunk in chunks:
+        yield from handle(parser.feed(chunk))
+    yield from handle(parser.close())
+
+    if pending:
+        flush()
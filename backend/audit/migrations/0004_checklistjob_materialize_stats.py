@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 01:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0003_checklistjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checklistjob',
+            name='materialize_ms',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='checklistjob',
+            name='rows_written',
+            field=models.IntegerField(default=0),
+        ),
+    ]
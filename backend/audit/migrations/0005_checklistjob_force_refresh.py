@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 01:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_checklistjob_materialize_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checklistjob',
+            name='force_refresh',
+            field=models.BooleanField(default=False),
+        ),
+    ]
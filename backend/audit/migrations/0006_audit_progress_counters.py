@@ -0,0 +1,41 @@
+# Generated by Django 5.0.2 on 2026-10-18 01:24
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_items(apps, schema_editor):
+    Audit = apps.get_model('audit', 'Audit')
+    Checklist = apps.get_model('audit', 'Checklist')
+    counts = (
+        Checklist.objects.exclude(item__startswith='Category')
+        .values('audit_id')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(is_completed=True)))
+        .order_by()
+    )
+    audits = [
+        Audit(pk=row['audit_id'], total_items=row['total'], completed_items=row['completed'])
+        for row in counts
+    ]
+    Audit.objects.bulk_update(audits, ['total_items', 'completed_items'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0005_checklistjob_force_refresh'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audit',
+            name='completed_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='audit',
+            name='total_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_items, migrations.RunPython.noop),
+    ]
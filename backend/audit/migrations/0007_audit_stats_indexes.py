@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 01:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0006_audit_progress_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['-updated_at'], name='audit_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['created_at'], name='audit_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['completion_date'], name='audit_completion_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['industry', 'complexity_level', 'is_completed', 'total_items', 'completed_items'], name='audit_stats_cover_idx'),
+        ),
+    ]
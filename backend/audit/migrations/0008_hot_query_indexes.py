@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 01:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0007_audit_stats_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='audit_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=models.Index(fields=['audit', 'order', 'id'], name='checklist_audit_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklist',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['audit', 'order'], name='checklist_open_items_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistjob',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['created_at'], name='checklistjob_pending_idx'),
+        ),
+    ]
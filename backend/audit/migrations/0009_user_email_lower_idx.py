@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0008_hot_query_indexes'),
+        # After the last auth_user change, since SQLite drops the index when it rebuilds the table
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    # auth_user belongs to django.contrib.auth, so its case-insensitive email index is added here
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_lower_idx',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0010_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audit',
+            name='prompt_version',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0011_audit_prompt_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checklistjob',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.2 on 2026-10-18 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0012_checklistjob_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checklistjob',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['created_at'], name='checklistjob_running_idx'),
+        ),
+    ]
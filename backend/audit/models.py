@@ -4,6 +4,9 @@ from django.utils.crypto import get_random_string
 from django.utils import timezone
 from datetime import timedelta
 
+# Category headings are stored as checklist rows whose text starts with this
+CATEGORY_PREFIX = 'Category'
+
 class Audit(models.Model):
     COMPLEXITY_CHOICES = [
         ('basic', 'Basic'),
@@ -26,10 +29,37 @@ class Audit(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_completed = models.BooleanField(default=False)
     completion_date = models.DateTimeField(null=True, blank=True)
+    # Denormalized progress over non-category checklist rows, see audit/progress.py
+    total_items = models.PositiveIntegerField(default=0)
+    completed_items = models.PositiveIntegerField(default=0)
+    # Tag (name@version, see prompts.py) of the prompt the checklist was generated with
+    prompt_version = models.CharField(max_length=64, blank=True)
+
+    class Meta:
+        indexes = [
+            # Non-staff audit list: WHERE created_by ORDER BY -created_at, -id (cursor pagination)
+            models.Index(fields=['created_by', '-created_at', '-id'], name='audit_owner_created_idx'),
+            # Dashboard statistics: recent activity and the created/completed timeline
+            models.Index(fields=['-updated_at'], name='audit_updated_at_idx'),
+            models.Index(fields=['created_at'], name='audit_created_at_idx'),
+            models.Index(fields=['completion_date'], name='audit_completion_date_idx'),
+            # Covers the status/industry/complexity GROUP BY so it never reads the table
+            models.Index(
+                fields=['industry', 'complexity_level', 'is_completed', 'total_items', 'completed_items'],
+                name='audit_stats_cover_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+class ChecklistQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the rows and take them off their audits' progress counters"""
+        from .progress import delete_checklist_rows  # progress imports this module
+        return delete_checklist_rows(self, super().delete)
+
+
 class Checklist(models.Model):
     audit = models.ForeignKey(Audit, on_delete=models.CASCADE, related_name='checklists')
     item = models.TextField()
@@ -38,12 +68,75 @@ class Checklist(models.Model):
     completed_at = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
 
+    objects = ChecklistQuerySet.as_manager()
+
     class Meta:
         ordering = ['order']
+        indexes = [
+            # Checklist prefetch and pagination: WHERE audit ORDER BY order, id
+            models.Index(fields=['audit', 'order', 'id'], name='checklist_audit_order_idx'),
+            # Open items of an audit; ticked rows, usually the majority, are left out
+            models.Index(
+                fields=['audit', 'order'],
+                condition=models.Q(is_completed=False),
+                name='checklist_open_items_idx'
+            ),
+        ]
+
+    def delete(self, using=None, keep_parents=False):
+        from .progress import delete_checklist_rows  # progress imports this module
+        rows = Checklist.objects.filter(pk=self.pk)
+        return delete_checklist_rows(rows, lambda: super(Checklist, self).delete(using, keep_parents))
+
+    def progress_contribution(self):
+        """(audit_id, completed) for item rows, None for category headings"""
+        if {'item', 'is_completed'} & self.get_deferred_fields() or self.item.startswith(CATEGORY_PREFIX):
+            return None
+        return self.audit_id, int(self.is_completed)
 
     def __str__(self):
         return f"{self.audit.title} - Item {self.order}"
 
+class ChecklistJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    audit = models.ForeignKey(Audit, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    force_refresh = models.BooleanField(default=False)
+    error = models.TextField(blank=True)
+    rows_written = models.IntegerField(default=0)
+    materialize_ms = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # When the current worker claimed the job; running jobs with an expired claim are reclaimed
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Workers poll the oldest pending jobs
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='pending'),
+                name='checklistjob_pending_idx'
+            ),
+            # ... and running jobs, to reclaim those whose claim has expired
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(status='running'),
+                name='checklistjob_running_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Checklist job {self.pk} for {self.audit.title} ({self.status})"
+
 class AdminInvitation(models.Model):
     email = models.EmailField(unique=True)
     token = models.CharField(max_length=64, unique=True)
@@ -63,4 +156,42 @@ class AdminInvitation(models.Model):
         return not self.is_used and timezone.now() <= self.expires_at
 
     def __str__(self):
-        return f"Invitation for {self.email}" 
\ No newline at end of file
+        return f"Invitation for {self.email}" 
+
+class EmailOutbox(models.Model):
+    """An email waiting to be sent by the outbox sender (see audit/outbox.py)"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    invitation = models.ForeignKey(
+        AdminInvitation, on_delete=models.CASCADE, null=True, blank=True, related_name='emails'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Earliest time of the next attempt; for 'sending' rows, when the claim lapses
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # The sender polls due rows, including claims abandoned by a crashed sender
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=models.Q(status__in=['pending', 'sending']),
+                name='emailoutbox_due_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Email to {self.to}: {self.subject} ({self.status})"
@@ -0,0 +1,227 @@
+"""
+Outgoing email through an outbox table.
+
+Requests only insert EmailOutbox rows, in the same transaction as the data
+the email is about, so a slow or failing SMTP server neither stalls the
+request nor loses the email. A sender then claims due rows in batches and
+delivers each batch over a single SMTP connection. Failed sends are retried
+with exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+
+Where the sender runs is selected by EMAIL_OUTBOX_BROKER:
+
+- ``local``: a background thread in the web process. It drains the outbox when
+  it starts, so email queued by a previous process is not left waiting, then
+  runs after each commit that queues email and every EMAIL_OUTBOX_POLL_INTERVAL
+  seconds for retries
+- ``database``: rows wait for the ``run_email_sender`` management command
+"""
+
+import logging
+import smtplib
+import threading
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.html import strip_tags
+
+from .models import AdminInvitation, EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+INVITATION_SUBJECT = 'Admin Invitation - Audit Checklist System'
+INVITATION_TEMPLATE = 'email/admin_invitation.html'
+
+# Errors about one message; anything else may have broken the connection
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError, ValueError)
+
+# How long a claimed batch may take before other senders may pick its rows up again
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def invitation_email(invitation: AdminInvitation) -> EmailOutbox:
+    """The (unsaved) outbox row for an admin invitation"""
+    context = {
+        'invitation': invitation,
+        'registration_url': f"{settings.FRONTEND_URL}/register?token={invitation.token}"
+    }
+    html_message = render_to_string(INVITATION_TEMPLATE, context)
+    return EmailOutbox(
+        to=invitation.email,
+        subject=INVITATION_SUBJECT,
+        body=strip_tags(html_message),
+        html_body=html_message,
+        invitation=invitation,
+    )
+
+
+def queue_emails(emails: List[EmailOutbox]) -> List[EmailOutbox]:
+    """Insert outbox rows; the sender is woken once the surrounding transaction commits"""
+    emails = EmailOutbox.objects.bulk_create(emails)
+    transaction.on_commit(wake_sender)
+    return emails
+
+
+def create_invitations(emails: Iterable[str], invited_by) -> List[AdminInvitation]:
+    """Create invitations and queue their emails in one transaction"""
+    now = timezone.now()
+    with transaction.atomic():
+        # bulk_create skips AdminInvitation.save, so fill in what it would
+        invitations = AdminInvitation.objects.bulk_create([
+            AdminInvitation(
+                email=email,
+                token=get_random_string(64),
+                expires_at=now + timedelta(days=7),
+                invited_by=invited_by,
+            )
+            for email in emails
+        ])
+        queue_emails([invitation_email(invitation) for invitation in invitations])
+    return invitations
+
+
+def claim_batch(limit: int) -> List[EmailOutbox]:
+    """
+    Claim up to limit due rows for this sender. Rows stay claimed for CLAIM_TIMEOUT,
+    after which a crashed sender's rows are due again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # skip_locked lets concurrent senders claim different rows on PostgreSQL
+        emails = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at')[:limit]
+        )
+        EmailOutbox.objects.filter(pk__in=[email.pk for email in emails]).update(
+            status='sending', next_attempt_at=now + CLAIM_TIMEOUT
+        )
+    return emails
+
+
+@dataclass
+class SendResult:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60) * 2 ** (attempts - 1))
+
+
+def send_batch(emails: List[EmailOutbox]) -> SendResult:
+    """Send claimed rows over one SMTP connection, recording each outcome as it happens"""
+    result = SendResult()
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    connection = get_connection(fail_silently=False)
+    try:
+        for email in emails:
+            email.attempts += 1
+            message = EmailMultiAlternatives(
+                email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to], connection=connection
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+            try:
+                # Opened on first use and kept open for the rest of the batch
+                connection.open()
+                message.send()
+            except Exception as e:
+                logger.warning("Email %s to %s failed (attempt %d): %s", email.pk, email.to, email.attempts, e)
+                if not isinstance(e, MESSAGE_ERRORS):
+                    # The next message opens a new connection
+                    connection.close()
+                email.error = str(e)
+                if email.attempts >= max_attempts:
+                    email.status = 'failed'
+                    result.failed += 1
+                else:
+                    email.status = 'pending'
+                    email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+                    result.retried += 1
+                email.save(update_fields=['attempts', 'error', 'status', 'next_attempt_at'])
+                continue
+            email.status = 'sent'
+            email.error = ''
+            email.sent_at = timezone.now()
+            email.save(update_fields=['attempts', 'error', 'status', 'sent_at'])
+            result.sent += 1
+    finally:
+        connection.close()
+    return result
+
+
+def send_pending(batch_size: int = None) -> SendResult:
+    """Send due emails batch by batch until none are left"""
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    total = SendResult()
+    close_old_connections()
+    try:
+        while True:
+            emails = claim_batch(batch_size)
+            if not emails:
+                return total
+            result = send_batch(emails)
+            total.sent += result.sent
+            total.retried += result.retried
+            total.failed += result.failed
+    finally:
+        close_old_connections()
+
+
+class LocalSender:
+    """A background thread in the current process that drains the outbox"""
+
+    def __init__(self, poll_interval: float):
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='email-outbox', daemon=True)
+        self.thread.start()
+
+    def wake(self) -> None:
+        self.wakeup.set()
+
+    def run(self) -> None:
+        while True:
+            try:
+                send_pending()
+            except Exception:
+                logger.exception("Email outbox sender failed")
+            self.wakeup.wait(self.poll_interval)
+            self.wakeup.clear()
+
+
+class DatabaseSender:
+    """Leaves the outbox to run_email_sender"""
+
+    def wake(self) -> None:
+        pass
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender():
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            broker_name = getattr(settings, 'EMAIL_OUTBOX_BROKER', 'local')
+            if broker_name == 'local':
+                _sender = LocalSender(getattr(settings, 'EMAIL_OUTBOX_POLL_INTERVAL', 30))
+            elif broker_name == 'database':
+                _sender = DatabaseSender()
+            else:
+                raise ValueError(f"Unknown EMAIL_OUTBOX_BROKER: {broker_name}")
+        return _sender
+
+
+def wake_sender() -> None:
+    get_sender().wake()
@@ -0,0 +1,17 @@
+from rest_framework.pagination import CursorPagination
+
+
+class AuditCursorPagination(CursorPagination):
+    """Keyset pagination over audits, newest first"""
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class ChecklistCursorPagination(CursorPagination):
+    """Keyset pagination over checklist items; ids are unique and increase with insertion order"""
+    ordering = ('id',)
+    page_size = 200
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
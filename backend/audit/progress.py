@@ -0,0 +1,212 @@
+"""
+Checklist progress: batched item updates and audit completion state.
+
+Audit.total_items and Audit.completed_items count the non-category checklist
+rows of each audit. They are adjusted with F() expressions wherever rows are
+written (materialization, batch updates, the Checklist post_save signal and
+Checklist deletes), so lists can show progress without reading the checklist
+table. recount_progress() repairs them from the rows.
+
+Deletes adjust the counters in Checklist.delete() and ChecklistQuerySet.delete()
+rather than a post_delete receiver: a receiver would stop Django from
+fast-deleting the checklist rows of a deleted audit or user.
+"""
+
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import CATEGORY_PREFIX, Audit, Checklist
+from .response_cache import forget_audit
+
+
+class ChecklistUpdateError(Exception):
+    """Raised when a batch refers to checklist rows the user cannot update"""
+
+    def __init__(self, missing_ids):
+        super().__init__(f"Checklist items not found: {sorted(missing_ids)}")
+        self.missing_ids = sorted(missing_ids)
+
+
+def item_rows(queryset):
+    """Leave out the category heading rows, which are never ticked"""
+    return queryset.exclude(item__startswith=CATEGORY_PREFIX)
+
+
+def apply_checklist_updates(queryset, deltas: List[Dict]) -> List[Checklist]:
+    """
+    Apply {id, is_completed, notes} deltas to the rows of queryset with one bulk_update.
+    completed_at is set when an item is ticked and cleared when it is unticked.
+    Raises ChecklistUpdateError if any id is not in queryset.
+    """
+    deltas_by_id = {delta['id']: delta for delta in deltas}
+
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().filter(pk__in=deltas_by_id))
+        missing = set(deltas_by_id) - {row.pk for row in rows}
+        if missing:
+            raise ChecklistUpdateError(missing)
+
+        now = timezone.now()
+        completed_delta = Counter()
+        for row in rows:
+            delta = deltas_by_id[row.pk]
+            if 'is_completed' in delta and delta['is_completed'] != row.is_completed:
+                row.is_completed = delta['is_completed']
+                row.completed_at = now if row.is_completed else None
+                if row.progress_contribution() is not None:
+                    completed_delta[row.audit_id] += 1 if row.is_completed else -1
+            if 'notes' in delta:
+                row.notes = delta['notes']
+
+        Checklist.objects.bulk_update(rows, ['is_completed', 'completed_at', 'notes'])
+        audit_ids = {row.audit_id for row in rows}
+        # Response ETags and list stamps are built from updated_at, so any change (e.g. notes only) moves it
+        Audit.objects.filter(pk__in=audit_ids).update(updated_at=now)
+        adjust_progress({audit_id: (0, change) for audit_id, change in completed_delta.items()})
+        refresh_completion(audit_ids)
+
+    return sorted(rows, key=lambda row: (row.audit_id, row.order, row.pk))
+
+
+def adjust_progress(changes: Dict[int, Tuple[int, int]], touch_unchanged: bool = False) -> None:
+    """
+    Add (total, completed) deltas to the counters of several audits in one UPDATE.
+    Audits with (0, 0) deltas are left alone unless touch_unchanged is set, which bumps their updated_at.
+    """
+    if not touch_unchanged:
+        changes = {audit_id: change for audit_id, change in changes.items() if any(change)}
+    if not changes:
+        return
+
+    def increments(position):
+        return Case(
+            *[When(pk=audit_id, then=Value(change[position])) for audit_id, change in changes.items()],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+
+    Audit.objects.filter(pk__in=changes).update(
+        total_items=F('total_items') + increments(0),
+        completed_items=F('completed_items') + increments(1),
+        updated_at=timezone.now()
+    )
+
+
+def apply_contribution_change(old: Optional[Tuple[int, int]], new: Optional[Tuple[int, int]]) -> Set[int]:
+    """
+    Move one row's contribution from old to new, both (audit_id, completed) or None.
+    Returns the audits whose counters changed.
+    """
+    if old == new:
+        return set()
+    changes = Counter()
+    if old is not None:
+        changes[(old[0], 'total')] -= 1
+        changes[(old[0], 'completed')] -= old[1]
+    if new is not None:
+        changes[(new[0], 'total')] += 1
+        changes[(new[0], 'completed')] += new[1]
+    audit_ids = {audit_id for audit_id, _ in changes}
+    adjust_progress({
+        audit_id: (changes[(audit_id, 'total')], changes[(audit_id, 'completed')])
+        for audit_id in audit_ids
+    })
+    return audit_ids
+
+
+def item_counts(queryset) -> Dict[int, Tuple[int, int]]:
+    """(total, completed) item rows per audit for the rows of queryset, with one GROUP BY"""
+    return {
+        row['audit_id']: (row['total'], row['completed'])
+        for row in item_rows(queryset)
+        .values('audit_id')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(is_completed=True)))
+        .order_by()
+    }
+
+
+def recount_audits(audit_ids: Iterable[int]) -> None:
+    """Set the counters of a few audits from their rows, e.g. after a row was edited in place"""
+    audit_ids = set(audit_ids)
+    counts = item_counts(Checklist.objects.filter(audit_id__in=audit_ids))
+
+    def counter(position):
+        return Case(
+            *[When(pk=audit_id, then=Value(count[position])) for audit_id, count in counts.items()],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+
+    Audit.objects.filter(pk__in=audit_ids).update(
+        total_items=counter(0), completed_items=counter(1), updated_at=timezone.now()
+    )
+    refresh_completion(audit_ids)
+
+
+def delete_checklist_rows(queryset, delete: Callable[[], Tuple[int, Dict[str, int]]]):
+    """
+    Run delete(), which removes the rows of queryset, after taking them off their
+    audits' counters: one GROUP BY and one UPDATE however many rows go.
+    """
+    items = ~Q(item__startswith=CATEGORY_PREFIX)
+    with transaction.atomic(using=queryset.db):
+        # Every audit losing rows, including those that only lose headings, whose ETags must move too
+        counts = queryset.values('audit_id').annotate(
+            total=Count('id', filter=items), completed=Count('id', filter=items & Q(is_completed=True))
+        ).order_by()
+        changes = {row['audit_id']: (-row['total'], -row['completed']) for row in counts}
+        adjust_progress(changes, touch_unchanged=True)
+        result = delete()
+        refresh_completion(changes)
+    return result
+
+
+def refresh_completion(audit_ids: Iterable[int]) -> None:
+    """
+    Recompute is_completed for the given audits from their counters: an audit is
+    complete once all of its items are. completion_date keeps the first time it was.
+    """
+    audit_ids = set(audit_ids)
+    if not audit_ids:
+        return
+
+    now = timezone.now()
+    audits = Audit.objects.filter(pk__in=audit_ids)
+    audits.filter(total_items__gt=0, completed_items__gte=F('total_items')).update(
+        is_completed=True,
+        completion_date=Coalesce('completion_date', Value(now)),
+        updated_at=now
+    )
+    audits.filter(Q(total_items=0) | Q(completed_items__lt=F('total_items'))).filter(is_completed=True).update(
+        is_completed=False, completion_date=None, updated_at=now
+    )
+
+    # update() sends no signals
+    for audit_id in audit_ids:
+        forget_audit(audit_id)
+
+
+def recount_progress(dry_run: bool = False) -> int:
+    """
+    Recompute every audit's counters from its checklist rows with one GROUP BY.
+    Returns how many audits had drifted (and were fixed unless dry_run).
+    """
+    counts = item_counts(Checklist.objects.all())
+
+    drifted = []
+    for audit in Audit.objects.only('id', 'total_items', 'completed_items').iterator():
+        total, completed = counts.get(audit.pk, (0, 0))
+        if (audit.total_items, audit.completed_items) != (total, completed):
+            audit.total_items, audit.completed_items = total, completed
+            drifted.append(audit)
+
+    if drifted and not dry_run:
+        with transaction.atomic():
+            Audit.objects.bulk_update(drifted, ['total_items', 'completed_items'], batch_size=500)
+            refresh_completion(audit.pk for audit in drifted)
+    return len(drifted)
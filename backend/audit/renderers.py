@@ -0,0 +1,36 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def format_event(event: str, data) -> str:
+    """Format a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views negotiate text/event-stream. Streaming views return their own
+    StreamingHttpResponse; this only renders non-streamed responses such as
+    validation errors as a single error event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data).encode(self.charset)
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Lets export views accept any media type (text/csv, application/x-ndjson, ...).
+    The views return their own streaming or file responses; this only renders
+    errors, as JSON.
+    """
+    media_type = '*/*'
+    format = 'export'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, default=str).encode(self.charset)
@@ -0,0 +1,49 @@
+"""
+Printable audit report: checklist grouped under its category headings, with
+notes and completion. The context holds only plain values, so reports.py can
+hash it to find an already rendered copy on disk.
+"""
+
+from typing import Any, Dict
+
+from .models import CATEGORY_PREFIX, Audit
+
+REPORT_TEMPLATE = 'reports/audit_report.html'
+
+
+def _timestamp(value) -> str:
+    return value.strftime('%Y-%m-%d %H:%M UTC') if value else ''
+
+
+def report_context(audit: Audit) -> Dict[str, Any]:
+    sections = []
+    for row in audit.checklists.order_by('order', 'id').values_list('item', 'is_completed', 'notes'):
+        item, is_completed, notes = row
+        if item.startswith(CATEGORY_PREFIX):
+            sections.append({'name': item, 'score': None, 'items': []})
+            continue
+        if not sections:
+            sections.append({'name': 'Checklist', 'score': None, 'items': []})
+        sections[-1]['items'].append({'text': item, 'done': is_completed, 'notes': notes, 'score': None})
+
+    progress = f'{audit.completed_items} of {audit.total_items} items completed'
+    return {
+        'title': audit.title,
+        'subtitle': audit.organization,
+        'details': [
+            ('Audit type', audit.audit_type),
+            ('Industry', audit.industry),
+            ('Complexity', audit.get_complexity_level_display()),
+            ('Specific requirements', audit.specific_requirements),
+            ('Created', _timestamp(audit.created_at)),
+            ('Completed', _timestamp(audit.completion_date)),
+        ],
+        'summary': [
+            ('Status', 'Completed' if audit.is_completed else 'In progress'),
+            ('Progress', progress),
+        ],
+        'category_scores': [],
+        'sections': sections,
+        'recommendations': '',
+        'as_of': _timestamp(audit.updated_at),
+    }
@@ -0,0 +1,112 @@
+"""
+Cache of serialized audit responses with ETag support.
+
+Retrieve responses are stored per audit under one key holding every
+?fields/?omit variant, stamped with the audit's updated_at and its
+creator's username, which the response embeds. Saving or deleting a
+Checklist bumps the parent audit's updated_at and drops its entry, and
+saving a user bumps the updated_at of their audits (see signals.py), so a
+stale stamp is never served. List pages are cached per user and query
+string, stamped with the newest updated_at and the row count of the audits
+the user can see.
+"""
+
+import hashlib
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, quote_etag
+from django.utils.http import parse_etags
+
+from .models import Audit
+
+
+def get_response_cache():
+    return caches[getattr(settings, 'AUDIT_RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def response_ttl() -> int:
+    return getattr(settings, 'AUDIT_RESPONSE_CACHE_TTL', 60 * 60)
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()[:32]
+
+
+def variant_of(request) -> str:
+    """Query parameters that change the serialized output, e.g. ?fields= and ?omit="""
+    return '&'.join(f'{name}={value}' for name, value in sorted(request.query_params.items()))
+
+
+def audit_key(audit_id: int) -> str:
+    return f'audit-response:{audit_id}'
+
+
+def list_key(user_id: int, variant: str) -> str:
+    return f'audit-list:{user_id}:{_digest(variant)}'
+
+
+def audit_stamp(audit: Audit) -> str:
+    """Version of one audit's response; audit needs updated_at and created_by loaded"""
+    return f'{audit.updated_at.isoformat()}:{audit.created_by.username}'
+
+
+def make_etag(*parts) -> str:
+    return quote_etag(_digest(*parts))
+
+
+def not_modified(request, etag: str) -> bool:
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags
+
+
+def get_audit_data(audit_id: int, stamp: str, variant: str) -> Optional[Any]:
+    entry = get_response_cache().get(audit_key(audit_id))
+    if not entry or entry.get('stamp') != stamp:
+        return None
+    return entry['variants'].get(variant)
+
+
+def set_audit_data(audit_id: int, stamp: str, variant: str, data: Any) -> None:
+    cache = get_response_cache()
+    entry = cache.get(audit_key(audit_id))
+    if not entry or entry.get('stamp') != stamp:
+        entry = {'stamp': stamp, 'variants': {}}
+    entry['variants'][variant] = data
+    cache.set(audit_key(audit_id), entry, response_ttl())
+
+
+def get_list_data(key: str, stamp: str) -> Optional[Any]:
+    entry = get_response_cache().get(key)
+    if not entry or entry.get('stamp') != stamp:
+        return None
+    return entry['data']
+
+
+def set_list_data(key: str, stamp: str, data: Any) -> None:
+    get_response_cache().set(key, {'stamp': stamp, 'data': data}, response_ttl())
+
+
+def forget_audit(audit_id: int) -> None:
+    get_response_cache().delete(audit_key(audit_id))
+
+
+def touch_audit(audit_id: int, **updates) -> None:
+    """
+    Mark an audit as changed after its checklist rows were written without saving the audit.
+    Extra field updates (e.g. F() counter increments) are applied in the same UPDATE.
+    """
+    Audit.objects.filter(pk=audit_id).update(updated_at=timezone.now(), **updates)
+    forget_audit(audit_id)
+
+
+def with_etag(response, etag: str):
+    response['ETag'] = etag
+    # Clients may keep the response but must revalidate it with If-None-Match
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Audit, Checklist, AdminInvitation
-from rest_framework_simplejwt.tokens import RefreshToken
+from .models import Audit, Checklist, ChecklistJob, AdminInvitation
+from token_auth import ClaimsRefreshToken
 from typing import List, Dict, Any, Optional
 from django.utils import timezone
+from django.conf import settings
+from django.db.models.functions import Lower
 from drf_spectacular.utils import extend_schema_field
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -22,6 +24,16 @@ class UserCreateSerializer(serializers.ModelSerializer):
         )
         return user
 
+class RegisterSerializer(UserCreateSerializer):
+    """Self-registration; the username is allocated from the email by the view"""
+
+    class Meta(UserCreateSerializer.Meta):
+        read_only_fields = ('username', 'is_staff')
+        extra_kwargs = {
+            'password': {'write_only': True},
+            'email': {'required': True, 'allow_blank': False},
+        }
+
 class UserResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -35,6 +47,14 @@ class LoginSerializer(serializers.Serializer):
     refresh = serializers.CharField(read_only=True)
     user = UserResponseSerializer(read_only=True)
 
+    @staticmethod
+    def lookup_users(username=None, email=None):
+        """The account(s) a login names; emails match case-insensitively"""
+        if username:
+            return User.objects.filter(username=username)
+        # Served by the LOWER(email) index from migration 0009
+        return User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).order_by('pk')
+
     def validate(self, data):
         username = data.get('username')
         email = data.get('email')
@@ -46,29 +66,52 @@ class LoginSerializer(serializers.Serializer):
         if not username and not email:
             raise serializers.ValidationError('Either username or email is required.')
 
-        try:
-            if username:
-                user = User.objects.get(username=username)
-            else:
-                user = User.objects.get(email=email)
-            
-            if not user.check_password(password):
-                raise serializers.ValidationError('Invalid credentials.')
-        except User.DoesNotExist:
+        user = self.lookup_users(username, email).first()
+
+        if user is None:
+            # Hash anyway so unknown accounts take as long as wrong passwords, like ModelBackend
+            User().set_password(password)
+            raise serializers.ValidationError('Invalid credentials.')
+        # Rehashes and saves the password when it was stored with an older hasher or cost
+        if not user.check_password(password):
             raise serializers.ValidationError('Invalid credentials.')
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
         data['token'] = str(refresh.access_token)
         data['refresh'] = str(refresh)
         data['user'] = user
         return data
 
-class ChecklistSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Lets clients trim the response with ?fields=id,title to keep only the
+    listed fields, or ?omit=checklists to drop fields.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+
+        fields = request.query_params.get('fields')
+        if fields:
+            keep = {name.strip() for name in fields.split(',')}
+            for name in set(self.fields) - keep:
+                self.fields.pop(name)
+
+        omit = request.query_params.get('omit')
+        if omit:
+            for name in omit.split(','):
+                self.fields.pop(name.strip(), None)
+
+class ChecklistSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Checklist
-        fields = ('id', 'audit', 'item', 'is_completed', 'notes', 'order')
+        fields = ('id', 'audit', 'item', 'is_completed', 'completed_at', 'notes', 'order')
+        read_only_fields = ('completed_at',)
 
-class AuditSerializer(serializers.ModelSerializer):
+class AuditSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     checklists = serializers.SerializerMethodField()
     created_by = UserResponseSerializer(read_only=True)
 
@@ -77,15 +120,76 @@ class AuditSerializer(serializers.ModelSerializer):
         fields = ('id', 'title', 'audit_type', 'organization', 'industry', 
                  'specific_requirements', 'complexity_level', 'created_at', 
                  'updated_at', 'created_by', 'is_completed', 'completion_date', 
-                 'checklists')
+                 'total_items', 'completed_items', 'prompt_version', 'checklists')
         read_only_fields = ['created_by', 'created_at', 'updated_at', 
-                           'is_completed', 'completion_date']
+                           'is_completed', 'completion_date', 'total_items', 'completed_items',
+                           'prompt_version']
 
     @extend_schema_field(List[ChecklistSerializer])
     def get_checklists(self, obj: Audit) -> List[Dict[str, Any]]:
-        checklists = obj.checklists.all().order_by('order')
+        # Plain .all() so the ordered prefetch from AuditViewSet.get_queryset is reused
+        checklists = obj.checklists.all()
         return ChecklistSerializer(checklists, many=True).data
 
+class BulkAuditCreateSerializer(serializers.Serializer):
+    audits = AuditSerializer(many=True)
+
+    def validate_audits(self, value):
+        max_items = getattr(settings, 'CHECKLIST_BULK_MAX_ITEMS', 500)
+        if not value:
+            raise serializers.ValidationError('At least one audit is required.')
+        if len(value) > max_items:
+            raise serializers.ValidationError(f'At most {max_items} audits can be created per request.')
+        return value
+
+class ChecklistDeltaSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    is_completed = serializers.BooleanField(required=False)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+class ChecklistBatchUpdateSerializer(serializers.Serializer):
+    items = ChecklistDeltaSerializer(many=True)
+
+    def validate_items(self, value):
+        max_items = getattr(settings, 'CHECKLIST_BATCH_MAX_ITEMS', 1000)
+        if not value:
+            raise serializers.ValidationError('At least one item is required.')
+        if len(value) > max_items:
+            raise serializers.ValidationError(f'At most {max_items} items can be updated per request.')
+        ids = [item['id'] for item in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError('Each item may appear only once.')
+        return value
+
+class AuditCompletionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Audit
+        fields = ('id', 'is_completed', 'completion_date', 'total_items', 'completed_items')
+        read_only_fields = fields
+
+class ChecklistBatchResultSerializer(serializers.Serializer):
+    items = ChecklistSerializer(many=True)
+    audits = AuditCompletionSerializer(many=True)
+
+class ChecklistJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChecklistJob
+        fields = ('id', 'audit', 'status', 'force_refresh', 'error', 'rows_written',
+                 'materialize_ms', 'created_at', 'started_at', 'finished_at')
+        read_only_fields = fields
+
+class AdminInvitationBulkCreateSerializer(serializers.Serializer):
+    emails = serializers.ListField(child=serializers.EmailField())
+
+    def validate_emails(self, value):
+        max_items = getattr(settings, 'ADMIN_INVITATION_BULK_MAX_ITEMS', 500)
+        if not value:
+            raise serializers.ValidationError('At least one email is required.')
+        if len(value) > max_items:
+            raise serializers.ValidationError(f'At most {max_items} invitations can be sent per request.')
+        # Duplicates within the request are invited once
+        return list(dict.fromkeys(value))
+
 class AdminInvitationSerializer(serializers.ModelSerializer):
     status = serializers.SerializerMethodField()
     invited_by = UserResponseSerializer(read_only=True)
@@ -0,0 +1,40 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from token_auth import revoke_on_user_delete, revoke_on_user_save
+
+from .models import Audit, Checklist
+from .progress import apply_contribution_change, recount_audits, refresh_completion
+from .response_cache import forget_audit, touch_audit
+
+# Tokens carry user claims, so changing or deleting a user revokes them (when JWT_REVOCATION is on)
+post_save.connect(revoke_on_user_save, sender=User)
+post_delete.connect(revoke_on_user_delete, sender=User)
+
+
+@receiver(post_save, sender=User)
+def touch_audits_of_saved_user(sender, instance, created, update_fields=None, **kwargs):
+    """Audit responses embed their creator, so a changed user must move the stamps of their audits"""
+    if created or (update_fields is not None and not {'username', 'email', 'is_staff'} & set(update_fields)):
+        return
+    Audit.objects.filter(created_by=instance).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Audit)
+def invalidate_audit_response(sender, instance, **kwargs):
+    forget_audit(instance.pk)
+
+
+@receiver(post_save, sender=Checklist)
+def update_progress_on_checklist_save(sender, instance, created, **kwargs):
+    if not created:
+        # The row may have been ticked, unticked or turned into a heading; recount its audit
+        recount_audits({instance.audit_id})
+        return
+    changed = apply_contribution_change(None, instance.progress_contribution())
+    if changed:
+        # adjust_progress bumped updated_at, which also changes the ETag
+        refresh_completion(changed)
+    else:
+        touch_audit(instance.audit_id)
@@ -0,0 +1,142 @@
+"""
+Single-flight coalescing for checklist generation.
+
+Concurrent callers asking for the same key share one in-flight call:
+
+- within a process, followers wait on the leader thread's result
+- across processes, leaders take an exclusive file lock per key; a process
+  that had to wait for the lock re-checks the shared cache before calling
+  the LLM itself. Waiting only pays off when the other process's result is
+  visible, so file locks are only taken with a shared CHECKLIST_CACHE backend
+
+The leader removes its lock file before releasing it. A process that was
+waiting on the removed file notices, and locks the current file instead.
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+from .checklist_cache import get_checklist_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process coalescing only
+    fcntl = None
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, lock_dir: Optional[str] = None):
+        self.lock_dir = lock_dir
+        if lock_dir and fcntl is not None:
+            os.makedirs(lock_dir, exist_ok=True)
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.lock_waits = 0
+        self.coalesced_across_processes = 0
+
+    def do(self, key: str, fn: Callable[[], Any], recheck: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Run fn() once for all concurrent callers with the same key and return its result.
+        recheck() is called after waiting on another process and should return its result, or None.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_locked(key, fn, recheck)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _acquire(self, path):
+        """Lock the file at path; returns it and whether another process held it first"""
+        waited = False
+        while True:
+            lock_file = open(path, 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                waited = True
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    return lock_file, waited
+            except FileNotFoundError:
+                pass
+            # The holder removed the file while we waited on it
+            lock_file.close()
+
+    def _run_locked(self, key, fn, recheck):
+        if not self.lock_dir or fcntl is None:
+            return fn()
+
+        path = os.path.join(self.lock_dir, f'{key}.lock')
+        lock_file, waited = self._acquire(path)
+        try:
+            if waited:
+                # Another process generated the same key; reuse its result
+                with self._lock:
+                    self.lock_waits += 1
+                if recheck is not None:
+                    result = recheck()
+                    if result is not None:
+                        with self._lock:
+                            self.coalesced_across_processes += 1
+                        return result
+            return fn()
+        finally:
+            os.unlink(path)
+            lock_file.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'lock_waits': self.lock_waits,
+                'coalesced_across_processes': self.coalesced_across_processes,
+                'in_flight': len(self._calls),
+            }
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    global _single_flight
+    with _single_flight_lock:
+        if _single_flight is None:
+            lock_dir = getattr(settings, 'CHECKLIST_LOCK_DIR', None) if get_checklist_cache().shared else None
+            _single_flight = SingleFlight(lock_dir)
+        return _single_flight
@@ -0,0 +1,148 @@
+"""
+Dashboard statistics computed with database aggregates.
+
+Each section is one aggregate or GROUP BY query over the audits the user
+can see, and progress comes from the Audit.total_items/completed_items counters,
+so the checklist table is never scanned. Results are cached per user for
+AUDIT_STATS_CACHE_TTL seconds.
+
+apps/audits/stats.py serves the same dashboard for the audit_project API with
+the same names for the shared sections. It adds average ``scores`` from
+AuditResult rows, which this project does not store, and lacks ``items`` and
+``by_complexity``, since its audits have no checklist counters or complexity.
+"""
+
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict
+
+from django.conf import settings
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import Audit
+from .response_cache import get_response_cache
+
+TIMELINE_DAYS = 30
+RECENT_AUDITS = 10
+
+
+def _rate(part, whole) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+
+def visible_audits(user):
+    if user.is_staff:
+        return Audit.objects.all()
+    return Audit.objects.filter(created_by=user)
+
+
+def _summarize(total, completed, items, completed_items) -> Dict[str, Any]:
+    return {
+        'total': total,
+        'completed': completed,
+        'completion_rate': _rate(completed, total),
+        'item_completion_rate': _rate(completed_items, items),
+    }
+
+
+def summaries(audits) -> Dict[str, Any]:
+    """
+    Status counts, item totals and the industry and complexity breakdowns, folded
+    from a single GROUP BY over (industry, complexity_level).
+    """
+    rows = (
+        audits.values('industry', 'complexity_level')
+        .annotate(
+            total=Count('id'),
+            completed=Count('id', filter=Q(is_completed=True)),
+            not_started=Count('id', filter=Q(is_completed=False, total_items=0)),
+            items=Sum('total_items', default=0),
+            completed_items=Sum('completed_items', default=0),
+        )
+        .order_by()
+    )
+
+    fields = ('total', 'completed', 'not_started', 'items', 'completed_items')
+    overall = Counter()
+    by_field = {'industry': {}, 'complexity_level': {}}
+    for row in rows:
+        counts = Counter({name: row[name] for name in fields})
+        overall.update(counts)
+        for field, groups in by_field.items():
+            groups.setdefault(row[field], Counter()).update(counts)
+
+    def breakdown(field):
+        groups = sorted(by_field[field].items(), key=lambda group: (-group[1]['total'], group[0]))
+        return [
+            {field: value, **_summarize(c['total'], c['completed'], c['items'], c['completed_items'])}
+            for value, c in groups
+        ]
+
+    return {
+        'audits': {
+            'total': overall['total'],
+            'completed': overall['completed'],
+            'in_progress': overall['total'] - overall['completed'] - overall['not_started'],
+            'not_started': overall['not_started'],
+            'completion_rate': _rate(overall['completed'], overall['total']),
+        },
+        'items': {
+            'total': overall['items'],
+            'completed': overall['completed_items'],
+            'completion_rate': _rate(overall['completed_items'], overall['items']),
+        },
+        'by_industry': breakdown('industry'),
+        'by_complexity': breakdown('complexity_level'),
+    }
+
+
+def timeline(audits, days: int = TIMELINE_DAYS):
+    """
+    Audits created and completed per day over the last `days` days.
+    Days are CAST from the stored UTC timestamps, which stays a native SQL function
+    on every backend (TruncDate falls back to a Python function on SQLite).
+    """
+    since = timezone.now() - timedelta(days=days)
+
+    def per_day(field):
+        return (
+            audits.filter(**{f'{field}__gte': since})
+            .annotate(day=Cast(field, DateField())).values('day')
+            .annotate(count=Count('id')).order_by()
+        )
+
+    by_day = {}
+    for key, field in (('created', 'created_at'), ('completed', 'completion_date')):
+        for row in per_day(field):
+            by_day.setdefault(row['day'], {'created': 0, 'completed': 0})[key] = row['count']
+    return [{'date': day.isoformat(), **counts} for day, counts in sorted(by_day.items())]
+
+
+def recent_activity(audits, limit: int = RECENT_AUDITS):
+    return list(
+        audits.order_by('-updated_at')
+        .values('id', 'title', 'updated_at', 'is_completed', 'total_items', 'completed_items')[:limit]
+    )
+
+
+def compute_stats(user) -> Dict[str, Any]:
+    audits = visible_audits(user)
+    return {
+        **summaries(audits),
+        'timeline': timeline(audits),
+        'recent': recent_activity(audits),
+        'generated_at': timezone.now(),
+    }
+
+
+def get_stats(user, refresh: bool = False) -> Dict[str, Any]:
+    """Dashboard statistics for a user, cached briefly"""
+    cache = get_response_cache()
+    key = f'audit-stats:{user.pk}:{int(user.is_staff)}'
+    stats = None if refresh else cache.get(key)
+    if stats is None:
+        stats = compute_stats(user)
+        cache.set(key, stats, getattr(settings, 'AUDIT_STATS_CACHE_TTL', 30))
+    return stats
@@ -0,0 +1,43 @@
+"""
+Streamed response bodies that stay streamed under ASGI.
+
+Given a sync iterator, Django's ASGI handler consumes the whole
+StreamingHttpResponse body with sync_to_async(list) before sending the first
+byte. streaming_content hands ASGI requests an async iterator instead, which
+fetches each chunk from the sync iterator on the thread-sensitive executor,
+so the iterator's database work keeps running on one thread. WSGI requests
+get the sync iterator unchanged.
+"""
+
+from typing import AsyncIterator, Iterable, Union
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_END = object()
+
+
+def is_asgi(request) -> bool:
+    # DRF wraps the Django request
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiterate(iterable: Iterable) -> AsyncIterator:
+    iterator = iter(iterable)
+    fetch = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await fetch(iterator, _END)
+            if chunk is _END:
+                return
+            yield chunk
+    finally:
+        # Runs the generator's cleanup when the client disconnects mid-stream
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def streaming_content(request, iterable: Iterable) -> Union[Iterable, AsyncIterator]:
+    """The body to give StreamingHttpResponse for this request"""
+    return aiterate(iterable) if is_asgi(request) else iterable
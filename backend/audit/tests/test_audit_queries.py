@@ -0,0 +1,59 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from audit.models import Audit, Checklist
+
+
+class AuditQueryCountTests(TestCase):
+    """List and retrieve run a fixed number of queries however many audits and rows there are"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('auditor', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_audits(self, count, rows=5):
+        for i in range(count):
+            audit = Audit.objects.create(title=f'Audit {i}', created_by=self.user)
+            Checklist.objects.bulk_create(
+                Checklist(audit=audit, item=f'Question {order}', order=order) for order in range(rows)
+            )
+
+    def test_list(self):
+        for count in (3, 15):
+            with self.subTest(audits=count):
+                Audit.objects.all().delete()
+                self.create_audits(count)
+                cache.clear()
+                # Stamp aggregate, audits joined with their creators, prefetched checklists
+                with self.assertNumQueries(3):
+                    response = self.client.get('/api/audits/list/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data['results']), count)
+
+    def test_list_without_checklists(self):
+        self.create_audits(5)
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/audits/list/', {'omit': 'checklists'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_list(self):
+        self.create_audits(5)
+        self.client.get('/api/audits/list/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/audits/list/')
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_retrieve(self):
+        self.create_audits(1, rows=30)
+        audit = Audit.objects.get()
+        # Version stamp, the audit with its creator, its checklist
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/audits/list/{audit.pk}/')
+        self.assertEqual(len(response.data['checklists']), 30)
+
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/audits/list/{audit.pk}/')
@@ -0,0 +1,38 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from audit.models import Audit, ChecklistJob
+
+
+@mock.patch('audit.jobs.generate_checklist_text', side_effect=AssertionError('no LLM call in the request'))
+class BulkCreateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @mock.patch('audit.bulk.enqueue_checklist_job')
+    def test_queues_one_job_per_audit(self, enqueue, generate):
+        specs = [{'title': f'Audit {i}', 'audit_type': 'IT Security'} for i in range(3)]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/audits/create/bulk/', {'audits': specs}, format='json')
+            enqueue.assert_not_called()
+
+        self.assertEqual(response.status_code, 202)
+        job_ids = [job['id'] for job in response.data['jobs']]
+        self.assertEqual([call.args[0] for call in enqueue.call_args_list], job_ids)
+        jobs = ChecklistJob.objects.filter(pk__in=job_ids).select_related('audit')
+        self.assertEqual({job.status for job in jobs}, {'pending'})
+        self.assertEqual(sorted(job.audit.title for job in jobs), ['Audit 0', 'Audit 1', 'Audit 2'])
+        self.assertEqual({job.audit.created_by_id for job in jobs}, {self.user.pk})
+
+    @override_settings(CHECKLIST_BULK_MAX_ITEMS=2)
+    def test_rejects_too_many_audits(self, generate):
+        specs = [{'title': f'Audit {i}'} for i in range(3)]
+        response = self.client.post('/api/audits/create/bulk/', {'audits': specs}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Audit.objects.exists())
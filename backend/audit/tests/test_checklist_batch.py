@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from audit.models import Audit, Checklist
+
+
+class ChecklistBatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('auditor', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.audit = Audit.objects.create(title='Audit', created_by=self.user)
+        self.heading, self.item = Checklist.objects.bulk_create([
+            Checklist(audit=self.audit, item='Category 1: Access', order=1),
+            Checklist(audit=self.audit, item='Is MFA enforced?', order=2),
+        ])
+        Audit.objects.filter(pk=self.audit.pk).update(total_items=1)
+
+    def batch(self, *items):
+        return self.client.patch('/api/audits/checklists/batch/', {'items': list(items)}, format='json')
+
+    def test_notes_only_batch_invalidates_cached_responses(self):
+        detail_url = f'/api/audits/list/{self.audit.pk}/'
+        detail_etag = self.client.get(detail_url)['ETag']
+        list_etag = self.client.get('/api/audits/list/')['ETag']
+
+        self.assertEqual(self.batch({'id': self.item.pk, 'notes': 'Checked with IT'}).status_code, 200)
+
+        response = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['checklists'][1]['notes'], 'Checked with IT')
+
+        response = self.client.get('/api/audits/list/', HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['checklists'][1]['notes'], 'Checked with IT')
+
+    def test_heading_toggle_invalidates_cached_responses(self):
+        detail_url = f'/api/audits/list/{self.audit.pk}/'
+        etag = self.client.get(detail_url)['ETag']
+
+        self.batch({'id': self.heading.pk, 'is_completed': True})
+
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.audit.refresh_from_db()
+        self.assertEqual((self.audit.completed_items, self.audit.is_completed), (0, False))
+
+    def test_ticking_items_completes_the_audit(self):
+        response = self.batch({'id': self.item.pk, 'is_completed': True})
+
+        self.assertEqual(response.status_code, 200)
+        self.audit.refresh_from_db()
+        self.assertEqual((self.audit.completed_items, self.audit.is_completed), (1, True))
+        self.assertIsNotNone(self.audit.completion_date)
+
+    def test_unknown_ids_are_rejected(self):
+        response = self.batch({'id': self.item.pk, 'notes': 'x'}, {'id': 999999, 'notes': 'y'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing_ids'], [999999])
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.notes, '')
@@ -0,0 +1,150 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from audit import checklist_cache
+from audit.checklist_cache import (
+    DjangoChecklistCache, LocMemChecklistCache, SQLiteChecklistCache, get_checklist_cache, make_cache_key
+)
+
+
+class CacheKeyTests(SimpleTestCase):
+    def test_normalized_parameters_share_a_key(self):
+        key = make_cache_key('gemini', prompt='checklist@1:abc', audit_type='IT  Security', industry='Finance')
+        self.assertEqual(
+            key, make_cache_key('gemini', prompt='checklist@1:abc', industry=' finance', audit_type='it security')
+        )
+
+    def test_model_and_prompt_change_the_key(self):
+        key = make_cache_key('gemini', prompt='checklist@1:abc', audit_type='IT')
+        self.assertNotEqual(key, make_cache_key('other-model', prompt='checklist@1:abc', audit_type='IT'))
+        self.assertNotEqual(key, make_cache_key('gemini', prompt='checklist@2:def', audit_type='IT'))
+
+
+class CacheBackendTests:
+    """Behaviour every backend shares; subclasses build the cache under test"""
+
+    def make_cache(self, ttl=60, max_entries=10):
+        raise NotImplementedError
+
+    def test_round_trip_and_stats(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 'checklist A')
+        self.assertEqual(cache.get('a'), 'checklist A')
+        self.assertEqual(cache.get('a'), 'checklist A')
+        self.assertIsNone(cache.get('b'))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+        self.assertEqual(stats['backend'], type(cache).__name__)
+
+    def test_set_replaces(self):
+        cache = self.make_cache()
+        cache.set('a', 'old')
+        cache.set('a', 'new')
+        self.assertEqual(cache.get('a'), 'new')
+
+
+class LocMemChecklistCacheTests(CacheBackendTests, SimpleTestCase):
+    def make_cache(self, ttl=60, max_entries=10):
+        return LocMemChecklistCache(ttl, max_entries)
+
+    def test_ttl_expiry(self):
+        cache = self.make_cache(ttl=60)
+        with mock.patch.object(checklist_cache.time, 'monotonic', return_value=1000.0):
+            cache.set('a', 'checklist A')
+        with mock.patch.object(checklist_cache.time, 'monotonic', return_value=1059.0):
+            self.assertEqual(cache.get('a'), 'checklist A')
+        with mock.patch.object(checklist_cache.time, 'monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_lru_eviction(self):
+        cache = self.make_cache(max_entries=2)
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        cache.get('a')  # a is now more recently used than b
+        cache.set('c', 'C')
+
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), ('A', 'C'))
+
+
+class SQLiteChecklistCacheTests(CacheBackendTests, SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'checklists.sqlite3')
+
+    def make_cache(self, ttl=60, max_entries=10):
+        return SQLiteChecklistCache(ttl, max_entries, self.path)
+
+    def test_ttl_expiry(self):
+        cache = self.make_cache(ttl=60)
+        with mock.patch.object(checklist_cache.time, 'time', return_value=1000.0):
+            cache.set('a', 'checklist A')
+        with mock.patch.object(checklist_cache.time, 'time', return_value=1059.0):
+            self.assertEqual(cache.get('a'), 'checklist A')
+        with mock.patch.object(checklist_cache.time, 'time', return_value=1061.0):
+            self.assertIsNone(cache.get('a'))
+        # The expired row was deleted, not just skipped
+        with mock.patch.object(checklist_cache.time, 'time', return_value=1000.0):
+            self.assertIsNone(cache.get('a'))
+
+    def test_lru_eviction(self):
+        cache = self.make_cache(max_entries=2)
+        steps = ((1.0, cache.set, ('a', 'A')), (2.0, cache.set, ('b', 'B')),
+                 (3.0, cache.get, ('a',)), (4.0, cache.set, ('c', 'C')))
+        for now, call, args in steps:
+            with mock.patch.object(checklist_cache.time, 'time', return_value=now):
+                call(*args)
+
+        with mock.patch.object(checklist_cache.time, 'time', return_value=5.0):
+            self.assertIsNone(cache.get('b'))
+            self.assertEqual((cache.get('a'), cache.get('c')), ('A', 'C'))
+
+    def test_shared_between_instances(self):
+        # Separate processes each open their own cache on the same file
+        self.make_cache().set('a', 'checklist A')
+        self.assertEqual(self.make_cache().get('a'), 'checklist A')
+
+
+@override_settings(CACHES={'checklists': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                          'LOCATION': 'checklist-cache-tests'}})
+class DjangoChecklistCacheTests(CacheBackendTests, SimpleTestCase):
+    def setUp(self):
+        caches['checklists'].clear()
+
+    def make_cache(self, ttl=60, max_entries=10):
+        return DjangoChecklistCache(ttl, alias='checklists')
+
+    def test_entries_are_prefixed_and_expire_after_ttl(self):
+        cache = self.make_cache(ttl=60)
+        with mock.patch.object(caches['checklists'], 'set') as cache_set:
+            cache.set('a', 'checklist A')
+        cache_set.assert_called_once_with('checklist:a', 'checklist A', 60)
+
+
+class GetChecklistCacheTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(checklist_cache, '_cache', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_backend_from_settings(self):
+        for backend, expected in (('locmem', LocMemChecklistCache), ('django', DjangoChecklistCache)):
+            with self.subTest(backend), override_settings(CHECKLIST_CACHE={'BACKEND': backend, 'TTL': 5}):
+                checklist_cache._cache = None
+                cache = get_checklist_cache()
+                self.assertIsInstance(cache, expected)
+                self.assertEqual(cache.ttl, 5)
+                self.assertIs(get_checklist_cache(), cache)
+
+    @override_settings(CHECKLIST_CACHE={'BACKEND': 'memcached'})
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_checklist_cache()
@@ -0,0 +1,286 @@
+import json
+
+from django.test import SimpleTestCase
+
+from checklist_schema import (
+    ChecklistEntry, ChecklistParseError, ChecklistParser, parse_checklist, parse_checklist_stream, require_questions
+)
+
+CHECKLIST = {'categories': [
+    {'name': 'Access control', 'description': 'Who can log in', 'questions': ['Is MFA enforced?', 'Are accounts reviewed?']},
+    {'name': 'Backups', 'questions': [{'question': 'Are restores tested?'}]},
+]}
+
+TEXT = """Category 1: Access control
+- Is MFA enforced?
+- Are accounts reviewed?
+
+Category 2: Backups
+- Are restores tested?
+"""
+
+EXPECTED = [('Access control', ['Is MFA enforced?', 'Are accounts reviewed?']), ('Backups', ['Are restores tested?'])]
+
+
+def outline(parsed):
+    return [(category.name, category.questions) for category in parsed.categories]
+
+
+def messages(parsed):
+    return [diagnostic.message for diagnostic in parsed.diagnostics]
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class JSONFormatTests(SimpleTestCase):
+    def test_document(self):
+        parsed = parse_checklist(json.dumps(CHECKLIST))
+
+        self.assertEqual(parsed.format, 'json')
+        self.assertEqual(outline(parsed), EXPECTED)
+        self.assertEqual(parsed.categories[0].description, 'Who can log in')
+        self.assertEqual(parsed.question_count, 3)
+        self.assertEqual(parsed.diagnostics, [])
+
+    def test_fenced_and_after_prose(self):
+        document = json.dumps(CHECKLIST, indent=2)
+        for text in (f"```json\n{document}\n```\n", f"Here is your checklist:\n{document}"):
+            with self.subTest(text=text[:20]):
+                parsed = parse_checklist(text)
+                self.assertEqual(parsed.format, 'json')
+                self.assertEqual(outline(parsed), EXPECTED)
+
+    def test_bare_array_and_alternative_keys(self):
+        text = json.dumps([{'title': 'Backups', 'checks': [{'text': 'Are restores tested?'}]}])
+
+        self.assertEqual(outline(parse_checklist(text)), [('Backups', ['Are restores tested?'])])
+
+    def test_name_after_questions(self):
+        text = '{"categories": [{"questions": ["Is MFA enforced?"], "name": "Access control"}]}'
+
+        self.assertEqual(outline(parse_checklist(text)), [('Access control', ['Is MFA enforced?'])])
+
+    def test_category_without_questions_is_left_out(self):
+        text = '{"categories": [{"name": "Empty", "questions": []}, {"name": "Backups", "questions": ["Are restores tested?"]}]}'
+        parsed = parse_checklist(text)
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["category without questions was left out"])
+
+    def test_unknown_keys_are_ignored(self):
+        text = '{"version": 2, "meta": {"name": "x", "questions": ["no"]}, "categories": [{"name": "Backups", "tags": ["a"], "questions": ["Are restores tested?"]}]}'
+
+        self.assertEqual(outline(parse_checklist(text)), [('Backups', ['Are restores tested?'])])
+
+
+class MalformedJSONTests(SimpleTestCase):
+    def test_trailing_commas(self):
+        text = '{"categories": [{"name": "Backups", "questions": ["Are restores tested?", "Is the RPO met?",],},]}'
+
+        self.assertEqual(outline(parse_checklist(text)), [('Backups', ['Are restores tested?', 'Is the RPO met?'])])
+
+    def test_stray_characters_are_skipped(self):
+        parsed = parse_checklist('{"categories": [{"name": "Backups", "questions": [; "Are restores tested?"]}]}')
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["unexpected ';' was skipped"])
+
+    def test_extra_closing_bracket(self):
+        parsed = parse_checklist('{"categories": [{"name": "Backups", "questions": ["Are restores tested?"]}]}}')
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["text after the JSON document was ignored"])
+
+    def test_invalid_escape_keeps_the_raw_string(self):
+        parsed = parse_checklist(r'{"categories": [{"name": "Backups", "questions": ["Is C:\data backed up?"]}]}')
+
+        self.assertEqual(outline(parsed), [('Backups', [r'Is C:\data backed up?'])])
+        self.assertEqual(messages(parsed), ["invalid escape in string"])
+
+    def test_text_after_the_document(self):
+        parsed = parse_checklist(json.dumps(CHECKLIST) + '\n```\nLet me know if you need more.')
+
+        self.assertEqual(outline(parsed), EXPECTED)
+        self.assertEqual(messages(parsed), ["text after the JSON document was ignored"])
+        self.assertEqual(parsed.diagnostics[0].text, 'Let me know if you need more.')
+
+    def test_empty_questions_are_left_out(self):
+        parsed = parse_checklist('{"categories": [{"name": "Backups", "questions": ["  ", "Are restores tested?"]}]}')
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["empty question was left out"])
+
+    def test_no_questions(self):
+        for text in ('', '{}', '{"categories": [{"name": "Empty"}]}', 'I cannot help with that.'):
+            with self.subTest(text=text):
+                with self.assertRaises(ChecklistParseError) as ctx:
+                    require_questions(parse_checklist(text))
+                self.assertIn('no checklist questions', str(ctx.exception))
+
+    def test_parse_error_lists_diagnostics(self):
+        with self.assertRaises(ChecklistParseError) as ctx:
+            require_questions(parse_checklist('I cannot help with that.'))
+
+        self.assertEqual([d.message for d in ctx.exception.diagnostics], ["unrecognized line was skipped"])
+        self.assertIn("line 1: unrecognized line was skipped ('I cannot help with that.')", str(ctx.exception))
+
+
+class TruncatedJSONTests(SimpleTestCase):
+    def test_cut_after_a_question(self):
+        document = json.dumps(CHECKLIST)
+        text = document[:document.index('Are accounts reviewed?') + len('Are accounts reviewed?"')]
+        parsed = parse_checklist(text)
+
+        self.assertEqual(outline(parsed), [('Access control', ['Is MFA enforced?', 'Are accounts reviewed?'])])
+        self.assertEqual(messages(parsed), ["JSON ended before the document was complete (truncated output?)"])
+
+    def test_cut_inside_a_string(self):
+        parsed = parse_checklist('{"categories": [{"name": "Backups", "questions": ["Are restores tested?", "Is the R')
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), [
+            "unterminated string was left out",
+            "JSON ended before the document was complete (truncated output?)",
+        ])
+
+    def test_cut_before_the_first_question(self):
+        parsed = parse_checklist('{"categories": [{"name": "Backups", "questions": [')
+
+        self.assertEqual(parsed.categories, [])
+        self.assertIn("category without questions was left out", messages(parsed))
+        with self.assertRaises(ChecklistParseError):
+            require_questions(parsed)
+
+    def test_every_prefix_parses(self):
+        # Whatever point the stream stops at, the parser returns the questions completed so far
+        document = json.dumps(CHECKLIST)
+        for end in range(len(document) + 1):
+            parsed = parse_checklist(document[:end])
+            questions = [question for _, category in outline(parsed) for question in category]
+            self.assertEqual(questions, [q for _, qs in EXPECTED for q in qs][:len(questions)], end)
+
+
+class TextFormatTests(SimpleTestCase):
+    def test_category_format(self):
+        parsed = parse_checklist(TEXT)
+
+        self.assertEqual(parsed.format, 'text')
+        self.assertEqual(outline(parsed), EXPECTED)
+        self.assertEqual(parsed.diagnostics, [])
+
+    def test_heading_variants(self):
+        for heading in ('## Backups', '**Backups**', '__Backups:__', 'Backups:', 'Section 2 - Backups',
+                        'Category B) Backups', '### Category 2: **Backups**'):
+            with self.subTest(heading=heading):
+                parsed = parse_checklist(f"{heading}\n- Are restores tested?\n")
+                self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+
+    def test_question_variants(self):
+        for question in ('- ', '* ', '• ', '1. ', '12) ', 'a) ', '(3) ', 'Q4: ', '- [ ] ', '- [x] ', '1. **'):
+            with self.subTest(question=question):
+                parsed = parse_checklist(f"Category 1: Backups\n{question}Are restores tested?\n")
+                self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+
+    def test_unbulleted_question_and_skipped_lines(self):
+        parsed = parse_checklist("Here is the checklist.\n\nCategory 1: Backups\nAre restores tested?\n---\n")
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["unrecognized line was skipped", "question without a bullet was accepted"])
+        self.assertEqual([d.line for d in parsed.diagnostics], [1, 4])
+
+    def test_question_before_any_category(self):
+        parsed = parse_checklist("- Is MFA enforced?\nCategory 1: Backups\n- Are restores tested?\n")
+
+        self.assertEqual(outline(parsed), [('General', ['Is MFA enforced?']), ('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["question before any category was put under 'General'"])
+
+    def test_category_without_questions_is_left_out(self):
+        parsed = parse_checklist("Category 1: Empty\nCategory 2: Backups\n- Are restores tested?\n")
+
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(messages(parsed), ["category without questions was left out"])
+
+    def test_prose_then_json_switches_format(self):
+        parsed = parse_checklist("Sure, here it is\n" + json.dumps(CHECKLIST))
+
+        self.assertEqual(parsed.format, 'json')
+        self.assertEqual(outline(parsed), EXPECTED)
+
+    def test_to_text_round_trips(self):
+        parsed = parse_checklist(json.dumps(CHECKLIST))
+
+        self.assertEqual(outline(parse_checklist(parsed.to_text())), EXPECTED)
+        self.assertEqual(outline(parse_checklist(parsed.to_json())), EXPECTED)
+
+
+class IncrementalFeedTests(SimpleTestCase):
+    def assertSameInChunks(self, text):
+        whole = parse_checklist(text)
+        for size in (1, 2, 3, 7, 64):
+            with self.subTest(size=size):
+                parsed = parse_checklist_stream(chunked(text, size))
+                self.assertEqual(outline(parsed), outline(whole))
+                self.assertEqual(parsed.format, whole.format)
+                self.assertEqual(parsed.diagnostics, whole.diagnostics)
+
+    def test_chunk_boundaries_do_not_change_the_result(self):
+        samples = [
+            json.dumps(CHECKLIST),
+            json.dumps(CHECKLIST, indent=2),
+            '```json\n' + json.dumps(CHECKLIST) + '\n```',
+            'Here you go:\n' + json.dumps(CHECKLIST),
+            '{"version": 12.5e3, "ok": true, "categories": [{"name": "A\\u00e9", "questions": ["Is \\"MFA\\" on?"]}]}',
+            TEXT,
+            TEXT.replace('\n', '\r\n'),
+            "## Backups\n1. Are restores tested?\nstray line\n- [x] Is the RPO met?",
+        ]
+        for text in samples:
+            with self.subTest(text=text[:30]):
+                self.assertSameInChunks(text)
+
+    def test_entries_are_returned_as_they_complete(self):
+        parser = ChecklistParser()
+
+        self.assertEqual(parser.feed('{"categories": [{"name": "Backups", "questions": ["Are res'), [])
+        # A heading is returned together with its first question
+        self.assertEqual(parser.feed('tores tested?", '), [
+            ChecklistEntry('Backups', is_category=True), ChecklistEntry('Are restores tested?'),
+        ])
+        self.assertEqual(parser.feed('"Is the RPO met?"'), [ChecklistEntry('Is the RPO met?')])
+        self.assertEqual(parser.feed(']}]}'), [])
+        self.assertEqual(parser.close(), [])
+        self.assertEqual(parser.result.diagnostics, [])
+
+    def test_text_lines_wait_for_their_newline(self):
+        parser = ChecklistParser()
+
+        self.assertEqual(parser.feed('Category 1: Backups\n- Are restores'), [])
+        self.assertEqual(parser.feed(' tested?\n- Is the RPO'), [
+            ChecklistEntry('Backups', is_category=True), ChecklistEntry('Are restores tested?'),
+        ])
+        self.assertEqual(parser.close(), [ChecklistEntry('Is the RPO')])
+
+    def test_literal_split_across_chunks(self):
+        parser = ChecklistParser()
+        parser.feed('{"strict": tr')
+        parser.feed('ue, "categories": [{"name": "Backups", "questions": ["Are restores tested?"]}]}')
+        parser.close()
+
+        self.assertEqual(outline(parser.result), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(parser.result.diagnostics, [])
+
+    def test_fence_split_across_chunks(self):
+        parsed = parse_checklist_stream(['`', '``js', 'on\n{"categories": [{"name": "Backups", ',
+                                         '"questions": ["Are restores tested?"]}]}\n`', '``'])
+
+        self.assertEqual(parsed.format, 'json')
+        self.assertEqual(outline(parsed), [('Backups', ['Are restores tested?'])])
+        self.assertEqual(parsed.diagnostics, [])
+
+    def test_whitespace_only_chunks(self):
+        parsed = parse_checklist_stream(['', '\n\n', '  ', TEXT])
+
+        self.assertEqual(outline(parsed), EXPECTED)
+        self.assertEqual(parsed.diagnostics, [])
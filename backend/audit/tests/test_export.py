@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+import unittest
+
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase
+from rest_framework.test import APIClient
+
+from audit.export import write_export
+from audit.models import Audit, Checklist
+from token_auth import ClaimsRefreshToken
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+FORMULA = '=HYPERLINK("http://evil.example","click")'
+
+
+class ExportEscapingTests(TestCase):
+    """Text that spreadsheets would evaluate is neutralised in CSV and XLSX only"""
+
+    def setUp(self):
+        user = User.objects.create_user('auditor', password='x')
+        audit = Audit.objects.create(title=FORMULA, organization='@SUM(A1)', created_by=user)
+        Checklist.objects.create(audit=audit, item='+1 check', notes='-2', order=1)
+        Checklist.objects.create(audit=audit, item='Plain question', notes='a = b', order=2)
+
+    def export(self, export_format):
+        output = io.BytesIO()
+        write_export(Audit.objects.all(), export_format, output)
+        output.seek(0)
+        return output
+
+    def test_csv(self):
+        first, second = csv.DictReader(io.StringIO(self.export('csv').read().decode()))
+
+        self.assertEqual(first['audit_title'], "'" + FORMULA)
+        self.assertEqual(first['audit_organization'], "'@SUM(A1)")
+        self.assertEqual(first['checklist_item'], "'+1 check")
+        self.assertEqual(first['checklist_notes'], "'-2")
+        self.assertEqual(second['checklist_item'], 'Plain question')
+        self.assertEqual(second['checklist_notes'], 'a = b')
+        self.assertEqual(first['checklist_order'], '1')
+
+    @unittest.skipUnless(openpyxl, 'needs openpyxl')
+    def test_xlsx(self):
+        sheet = openpyxl.load_workbook(self.export('xlsx')).active
+        header, first, second = ([cell.value for cell in row] for row in sheet.iter_rows())
+        first, second = dict(zip(header, first)), dict(zip(header, second))
+
+        self.assertEqual(first['audit_title'], "'" + FORMULA)
+        self.assertEqual(first['checklist_item'], "'+1 check")
+        self.assertEqual(second['checklist_item'], 'Plain question')
+        self.assertEqual(first['checklist_order'], 1)
+
+    def test_jsonl_is_raw(self):
+        (line,) = self.export('jsonl').read().decode().splitlines()
+        audit = json.loads(line)
+
+        self.assertEqual(audit['title'], FORMULA)
+        self.assertEqual(audit['organization'], '@SUM(A1)')
+        self.assertEqual([row['item'] for row in audit['checklist']], ['+1 check', 'Plain question'])
+
+
+class ExportStreamingTests(TestCase):
+    """CSV and JSONL exports stay streamed under both WSGI and ASGI"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        for i in range(3):
+            audit = Audit.objects.create(title=f'Audit {i}', created_by=self.user)
+            Checklist.objects.create(audit=audit, item='Question', order=1)
+
+    def test_wsgi(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/audits/export/jsonl/')
+
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+
+    async def test_asgi(self):
+        token = ClaimsRefreshToken.for_user(self.user).access_token
+        response = await AsyncClient().get('/api/audits/export/csv/', headers={'Authorization': f'Bearer {token}'})
+
+        self.assertEqual(response.status_code, 200)
+        # An async body is sent chunk by chunk instead of being collected first
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(list(csv.DictReader(io.StringIO(content.decode())))), 3)
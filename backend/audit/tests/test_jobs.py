@@ -0,0 +1,74 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from audit.jobs import LocalBroker, claim_job, due_job_ids, run_checklist_job
+from audit.models import Audit, Checklist, ChecklistJob
+
+CHECKLIST = json.dumps({'categories': [{'name': 'Access', 'questions': ['Is MFA enforced?', 'Are accounts reviewed?']}]})
+
+
+# run_checklist_job commits and closes connections itself, so these tests run outside a test transaction
+@override_settings(CHECKLIST_JOB_CLAIM_TIMEOUT=600)
+class ChecklistJobClaimTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user('auditor', password='x')
+        self.audit = Audit.objects.create(title='Audit', created_by=user)
+        self.job = ChecklistJob.objects.create(audit=self.audit)
+
+    def test_job_is_claimed_once(self):
+        self.assertIsNotNone(claim_job(self.job.pk))
+        self.assertIsNone(claim_job(self.job.pk))
+
+    def test_expired_claim_is_reclaimed(self):
+        ChecklistJob.objects.filter(pk=self.job.pk).update(
+            status='running', claimed_at=timezone.now() - timedelta(seconds=601)
+        )
+        self.assertEqual(due_job_ids(limit=10), [self.job.pk])
+        self.assertIsNotNone(claim_job(self.job.pk))
+        self.assertEqual(due_job_ids(limit=10), [])
+
+    def test_live_claim_is_not_reclaimed(self):
+        ChecklistJob.objects.filter(pk=self.job.pk).update(status='running', claimed_at=timezone.now())
+        self.assertEqual(due_job_ids(limit=10), [])
+        self.assertIsNone(claim_job(self.job.pk))
+
+    @mock.patch('audit.jobs.generate_checklist_text', return_value=CHECKLIST)
+    def test_run_writes_checklist(self, generate):
+        job = run_checklist_job(self.job.pk)
+
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.rows_written, 3)
+        self.assertEqual(Checklist.objects.filter(audit=self.audit).count(), 3)
+
+    def test_reclaimed_job_keeps_the_new_owners_state(self):
+        def reclaim_while_generating(audit, force_refresh):
+            ChecklistJob.objects.filter(pk=self.job.pk).update(claimed_at=timezone.now() + timedelta(seconds=1))
+            return CHECKLIST
+
+        with mock.patch('audit.jobs.generate_checklist_text', side_effect=reclaim_while_generating):
+            self.assertIsNone(run_checklist_job(self.job.pk))
+
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'running')
+        self.assertFalse(Checklist.objects.filter(audit=self.audit).exists())
+
+
+class LocalBrokerSweepTests(TransactionTestCase):
+    def test_sweep_queues_jobs_nobody_queued(self):
+        user = User.objects.create_user('auditor', password='x')
+        audit = Audit.objects.create(title='Audit', created_by=user)
+        jobs = [ChecklistJob.objects.create(audit=audit) for _ in range(2)]
+        ChecklistJob.objects.create(audit=audit, status='succeeded')
+
+        broker = LocalBroker(max_workers=1)
+        with mock.patch('audit.jobs.run_checklist_job') as run:
+            broker.sweep()
+            broker.executor.shutdown(wait=True)
+
+        self.assertCountEqual([call.args[0] for call in run.call_args_list], [job.pk for job in jobs])
+        self.assertEqual(broker.queued, set())
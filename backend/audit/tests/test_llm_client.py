@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from fake_llm_server import CHECKLIST, FakeLLMHandler, FakeLLMServer
+from llm_client import GeminiProvider, LLMClient, LLMError, LLMRequest, LLMTimeoutError, OpenAIProvider
+
+
+class FakeServerTestCase(SimpleTestCase):
+    """Runs fake_llm_server.py on a free port for the duration of the test class"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.handler = type('Handler', (FakeLLMHandler,), {'delay': 0.0, 'chunk_delay': 0.0})
+        cls.server = FakeLLMServer(('127.0.0.1', 0), cls.handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.handler.delay = 0.0
+        self.handler.fail_next = 0
+        self.handler.requests = 0
+
+    def make_client(self, provider_class=OpenAIProvider, **kwargs):
+        # A provider name of its own keeps stats and the concurrency limit separate per test
+        provider = type('Provider', (provider_class,), {'name': f'{provider_class.name}-{self.id()}'})
+        kwargs.setdefault('backoff_base', 0.01)
+        client = LLMClient(provider('key', 'model', self.base_url + ('/v1' if provider_class is OpenAIProvider
+                                                                     else '/v1beta')), **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+
+class LLMClientTests(FakeServerTestCase):
+    def test_generate(self):
+        for provider_class in (OpenAIProvider, GeminiProvider):
+            with self.subTest(provider_class.name):
+                self.assertEqual(self.make_client(provider_class).generate(LLMRequest('prompt')), CHECKLIST)
+
+    def test_stream(self):
+        for provider_class in (OpenAIProvider, GeminiProvider):
+            with self.subTest(provider_class.name):
+                chunks = list(self.make_client(provider_class).stream(LLMRequest('prompt')))
+                self.assertGreater(len(chunks), 1)
+                self.assertEqual(''.join(chunks), CHECKLIST)
+
+    def test_timeout(self):
+        self.handler.delay = 1.0
+        client = self.make_client(timeout=0.2, max_retries=0)
+        started = time.monotonic()
+        with self.assertRaises(LLMError):
+            client.generate(LLMRequest('prompt'))
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(client.stats.snapshot()['failures'], 1)
+
+    def test_retries_then_succeeds(self):
+        self.handler.fail_next = 2
+        client = self.make_client(max_retries=3)
+        self.assertEqual(client.generate(LLMRequest('prompt')), CHECKLIST)
+        self.assertEqual(self.handler.requests, 3)
+        self.assertEqual(client.stats.snapshot()['retries'], 2)
+
+    def test_retries_are_bounded(self):
+        self.handler.fail_next = 10
+        client = self.make_client(max_retries=2)
+        with self.assertRaisesMessage(LLMError, '503'):
+            client.generate(LLMRequest('prompt'))
+        self.assertEqual(self.handler.requests, 3)
+
+    def test_deadline_cuts_attempts_short(self):
+        self.handler.delay = 1.0
+        client = self.make_client(timeout=10)
+        started = time.monotonic()
+        with self.assertRaises(LLMTimeoutError):
+            client.generate(LLMRequest('prompt'), deadline=0.3)
+        self.assertLess(time.monotonic() - started, 0.9)
+
+    def test_deadline_stops_retries(self):
+        self.handler.fail_next = 10
+        # Backoff (without jitter) would outlast the deadline
+        client = self.make_client(max_retries=5, backoff_base=1, backoff_max=1)
+        with mock.patch('llm_client.random.uniform', side_effect=lambda low, high: high):
+            with self.assertRaises(LLMTimeoutError):
+                client.generate(LLMRequest('prompt'), deadline=0.5)
+        self.assertEqual(self.handler.requests, 1)
+
+    def test_async_generate_retries(self):
+        self.handler.fail_next = 1
+        client = self.make_client()
+        self.assertEqual(asyncio.run(client.agenerate(LLMRequest('prompt'))), CHECKLIST)
+        self.assertEqual(self.handler.requests, 2)
+
+    def test_sync_and_async_callers_share_the_limit(self):
+        self.handler.delay = 0.2
+        client = self.make_client(max_concurrency=2)
+
+        async def calls():
+            await asyncio.gather(*(client.agenerate(LLMRequest('prompt')) for _ in range(3)))
+
+        threads = [threading.Thread(target=client.generate, args=(LLMRequest('prompt'),)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(calls())
+        for thread in threads:
+            thread.join()
+
+        stats = client.stats.snapshot()
+        self.assertEqual(stats['calls'], 6)
+        self.assertEqual(stats['max_in_flight'], 2)
+        self.assertEqual(stats['in_flight'], 0)
+
+
+class UnreadableResponseTests(SimpleTestCase):
+    def make_client(self, handler):
+        client = LLMClient(OpenAIProvider('key', 'model', 'http://llm.test/v1'), max_retries=0)
+        client._http = httpx.Client(transport=httpx.MockTransport(handler))
+        return client
+
+    def test_malformed_json(self):
+        client = self.make_client(lambda request: httpx.Response(200, content=b'{"choices": ['))
+        with self.assertRaisesMessage(LLMError, 'unreadable response'):
+            client.generate(LLMRequest('prompt'))
+
+    def test_unexpected_shape(self):
+        client = self.make_client(lambda request: httpx.Response(200, json={'error': 'quota'}))
+        with self.assertRaisesMessage(LLMError, 'unreadable response'):
+            client.generate(LLMRequest('prompt'))
+
+    def test_malformed_stream_event(self):
+        def handler(request):
+            return httpx.Response(200, content=b'data: {"choices": [{"delta": {"content": "a"}}]}\n\ndata: {oops\n\n')
+
+        with self.assertRaisesMessage(LLMError, 'Unreadable stream event'):
+            list(self.make_client(handler).stream(LLMRequest('prompt')))
+
+
+class GenerationDeadlineTests(SimpleTestCase):
+    def generate(self, **kwargs):
+        from audit.generation import generate_checklist_text
+        from audit.models import Audit
+
+        generator = mock.Mock(model_name='model', prompt=mock.Mock(cache_key='checklist@1'))
+        generator.generate_checklist.return_value = CHECKLIST
+        with mock.patch('audit.generation.get_checklist_generator', return_value=generator):
+            generate_checklist_text(Audit(audit_type='IT'), force_refresh=True, **kwargs)
+        return generator.generate_checklist.call_args.kwargs['deadline']
+
+    @override_settings(CHECKLIST_GENERATION_DEADLINE=120)
+    def test_deadline_defaults_to_setting(self):
+        self.assertEqual(self.generate(), 120)
+
+    @override_settings(CHECKLIST_GENERATION_DEADLINE=120)
+    def test_explicit_deadline(self):
+        self.assertEqual(self.generate(deadline=5), 5)
+
+    @override_settings(CHECKLIST_GENERATION_DEADLINE=0)
+    def test_no_deadline(self):
+        self.assertIsNone(self.generate())
@@ -0,0 +1,64 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from audit.materialize import materialize_checklist
+from audit.models import Audit, Checklist
+
+
+def checklist_json(categories):
+    return json.dumps({'categories': [
+        {'name': name, 'description': '', 'questions': [f'{name} question {i}?' for i in range(1, questions + 1)]}
+        for name, questions in categories
+    ]})
+
+
+class MaterializeChecklistTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('auditor', password='x')
+        self.audit = Audit.objects.create(title='Audit', created_by=user)
+
+    def test_one_insert_per_batch(self):
+        # 2 headings + 8 questions = 10 rows, in batches of 4
+        text = checklist_json([('Access', 5), ('Backups', 3)])
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = materialize_checklist(self.audit, text, prompt_version='checklist@1', batch_size=4)
+
+        statements = [query['sql'].split(' ', 1)[0] for query in ctx.captured_queries]
+        # Three INSERTs and the UPDATE of the audit's counters, nothing per row
+        self.assertEqual(statements, ['INSERT', 'INSERT', 'INSERT', 'UPDATE'])
+        self.assertEqual(result.rows, 10)
+        self.assertGreater(result.duration_ms, 0)
+
+    def test_rows_and_counters(self):
+        before = self.audit.updated_at
+        materialize_checklist(self.audit, checklist_json([('Access', 2), ('Backups', 1)]), prompt_version='checklist@1')
+
+        self.assertEqual(
+            list(Checklist.objects.filter(audit=self.audit).order_by('order').values_list('order', 'item')),
+            [(1, 'Category 1: Access'), (2, 'Access question 1?'), (3, 'Access question 2?'),
+             (4, 'Category 2: Backups'), (5, 'Backups question 1?')]
+        )
+        self.audit.refresh_from_db()
+        # touch_audit counts questions only and bumps updated_at, so cached responses are invalidated
+        self.assertEqual((self.audit.total_items, self.audit.completed_items), (3, 0))
+        self.assertEqual(self.audit.prompt_version, 'checklist@1')
+        self.assertGreater(self.audit.updated_at, before)
+
+    def test_counters_add_up_over_several_calls(self):
+        materialize_checklist(self.audit, checklist_json([('Access', 2)]))
+        materialize_checklist(self.audit, checklist_json([('Backups', 3)]))
+
+        self.audit.refresh_from_db()
+        self.assertEqual(self.audit.total_items, 5)
+
+    def test_text_format(self):
+        result = materialize_checklist(self.audit, 'Category 1: Access\n- Is MFA enforced?\n- Are accounts reviewed?\n')
+
+        self.assertEqual(result.rows, 3)
+        self.audit.refresh_from_db()
+        self.assertEqual(self.audit.total_items, 2)
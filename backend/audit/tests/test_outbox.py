@@ -0,0 +1,145 @@
+import smtplib
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from audit import outbox
+from audit.apps import start_background_workers
+from audit.models import EmailOutbox
+from audit.outbox import CLAIM_TIMEOUT, LocalSender, claim_batch, send_batch, send_pending
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class FlakyBackend(locmem.EmailBackend):
+    """locmem, except that mail to refused.example is refused and to dropped.example drops the connection"""
+
+    def send_messages(self, messages):
+        for message in messages:
+            domain = message.to[0].rsplit('@', 1)[1]
+            if domain == 'refused.example':
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b'No such user')})
+            if domain == 'dropped.example':
+                raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        return super().send_messages(messages)
+
+
+def queue(*addresses):
+    return EmailOutbox.objects.bulk_create([
+        EmailOutbox(to=address, subject='Invitation', body='Hello', html_body='<p>Hello</p>') for address in addresses
+    ])
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM, EMAIL_OUTBOX_BATCH_SIZE=2)
+class OutboxBatchingTests(TransactionTestCase):
+    def test_send_pending_drains_in_batches(self):
+        queue(*(f'user{i}@example.com' for i in range(5)))
+
+        with mock.patch.object(outbox, 'get_connection', wraps=outbox.get_connection) as get_connection:
+            result = send_pending()
+
+        self.assertEqual((result.sent, result.retried, result.failed), (5, 0, 0))
+        # One connection per batch of EMAIL_OUTBOX_BATCH_SIZE
+        self.assertEqual(get_connection.call_count, 3)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'user{i}@example.com' for i in range(5)])
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Hello</p>', 'text/html')])
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+        self.assertEqual(send_pending().sent, 0)
+
+
+@override_settings(EMAIL_BACKEND='audit.tests.test_outbox.FlakyBackend', EMAIL_OUTBOX_RETRY_DELAY=60,
+                   EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class OutboxRetryTests(TestCase):
+    def send_due(self):
+        with self.assertLogs('audit.outbox', 'WARNING'):
+            return send_batch(claim_batch(10))
+
+    def test_backoff_then_failure(self):
+        (email,) = queue('someone@refused.example')
+
+        for attempt, delay in ((1, 60), (2, 120)):
+            started = timezone.now()
+            result = self.send_due()
+            email.refresh_from_db()
+            self.assertEqual((result.retried, email.status, email.attempts), (1, 'pending', attempt))
+            self.assertIn('No such user', email.error)
+            self.assertAlmostEqual(
+                (email.next_attempt_at - started).total_seconds(), delay, delta=5
+            )
+            # Not due until the backoff has passed
+            self.assertEqual(claim_batch(10), [])
+            EmailOutbox.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+
+        result = self.send_due()
+        email.refresh_from_db()
+        self.assertEqual((result.failed, email.status, email.attempts), (1, 'failed', 3))
+        self.assertEqual(claim_batch(10), [])
+
+    def test_failures_do_not_stop_the_batch(self):
+        queue('a@example.com', 'b@refused.example', 'c@dropped.example', 'd@example.com')
+
+        result = self.send_due()
+
+        self.assertEqual((result.sent, result.retried, result.failed), (2, 2, 0))
+        self.assertEqual([message.to[0] for message in mail.outbox], ['a@example.com', 'd@example.com'])
+        self.assertEqual(
+            dict(EmailOutbox.objects.values_list('to', 'status')),
+            {'a@example.com': 'sent', 'b@refused.example': 'pending',
+             'c@dropped.example': 'pending', 'd@example.com': 'sent'}
+        )
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+class OutboxClaimTests(TestCase):
+    def test_claimed_rows_are_reclaimed_after_the_timeout(self):
+        queue('a@example.com', 'b@example.com')
+
+        claimed = claim_batch(10)
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(set(EmailOutbox.objects.values_list('status', flat=True)), {'sending'})
+        # Another sender finds nothing while the claim holds
+        self.assertEqual(claim_batch(10), [])
+
+        # The first sender crashed; once its claim lapses the rows are due again
+        later = timezone.now() + CLAIM_TIMEOUT + timedelta(seconds=1)
+        with mock.patch.object(outbox.timezone, 'now', return_value=later):
+            reclaimed = claim_batch(10)
+        self.assertEqual(sorted(email.pk for email in reclaimed), sorted(email.pk for email in claimed))
+
+        self.assertEqual(send_batch(reclaimed).sent, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class StopSender(Exception):
+    pass
+
+
+@override_settings(EMAIL_BACKEND=LOCMEM)
+class LocalSenderTests(TransactionTestCase):
+    def test_drains_before_waiting(self):
+        queue('left-by-a-previous-process@example.com')
+        with mock.patch.object(outbox.threading, 'Thread'):
+            sender = LocalSender(poll_interval=60)
+
+        sent_before_wait = []
+
+        def wait(timeout):
+            sent_before_wait.append(len(mail.outbox))
+            raise StopSender
+
+        with mock.patch.object(sender.wakeup, 'wait', side_effect=wait), self.assertRaises(StopSender):
+            sender.run()
+
+        self.assertEqual(sent_before_wait, [1])
+
+    def test_started_with_the_background_workers(self):
+        with mock.patch('audit.jobs.get_broker') as get_broker, \
+                mock.patch.object(outbox, 'get_sender') as get_sender:
+            start_background_workers()
+
+        get_broker.assert_called_once_with()
+        get_sender.assert_called_once_with()
@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from audit.models import Audit, Checklist
+
+
+class AuditPaginationTests(TestCase):
+    """Audit and checklist lists page by cursor and honour sparse fieldsets"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('auditor', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_audits(self, count):
+        return Audit.objects.bulk_create(
+            Audit(title=f'Audit {i}', created_by=self.user) for i in range(count)
+        )
+
+    def collect(self, url, params=None):
+        pages, ids = [], []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return pages, ids
+            response = self.client.get(response.data['next'])
+
+    def test_page_boundary(self):
+        for count, sizes in ((50, [50]), (51, [50, 1]), (120, [50, 50, 20])):
+            with self.subTest(audits=count):
+                Audit.objects.all().delete()
+                cache.clear()
+                self.create_audits(count)
+                pages, ids = self.collect('/api/audits/list/', {'omit': 'checklists'})
+                self.assertEqual([len(page['results']) for page in pages], sizes)
+                self.assertIsNone(pages[0]['previous'])
+                self.assertIsNone(pages[-1]['next'])
+
+    def test_next_cursor_walks_every_audit_once_newest_first(self):
+        self.create_audits(75)
+        _, ids = self.collect('/api/audits/list/', {'omit': 'checklists', 'page_size': 20})
+        expected = list(Audit.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_next_cursor_is_stable_under_inserts(self):
+        self.create_audits(60)
+        first = self.client.get('/api/audits/list/', {'omit': 'checklists'}).data
+        # A new audit lands at the head of the list and must not shift the next page
+        Audit.objects.create(title='Newest', created_by=self.user)
+        cache.clear()
+        second = self.client.get(first['next']).data
+        seen = [item['id'] for item in first['results'] + second['results']]
+        self.assertEqual(len(seen), 60)
+        self.assertEqual(len(set(seen)), 60)
+
+    def test_page_size_is_capped(self):
+        self.create_audits(210)
+        response = self.client.get('/api/audits/list/', {'omit': 'checklists', 'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 200)
+
+    def test_fields(self):
+        self.create_audits(2)
+        response = self.client.get('/api/audits/list/', {'fields': 'id, title'})
+        self.assertEqual(response.status_code, 200)
+        for audit in response.data['results']:
+            self.assertEqual(set(audit), {'id', 'title'})
+
+    def test_omit(self):
+        audit = self.create_audits(1)[0]
+        Checklist.objects.create(audit=audit, item='Question', order=0)
+        full = self.client.get('/api/audits/list/').data['results'][0]
+        trimmed = self.client.get('/api/audits/list/', {'omit': 'checklists'}).data['results'][0]
+        self.assertIn('checklists', full)
+        self.assertEqual(set(full) - set(trimmed), {'checklists'})
+
+    def test_checklist_pages(self):
+        audit = self.create_audits(1)[0]
+        Checklist.objects.bulk_create(
+            Checklist(audit=audit, item=f'Question {order}', order=order) for order in range(250)
+        )
+        pages, ids = self.collect('/api/audits/checklists/', {'fields': 'id,item'})
+        self.assertEqual([len(page['results']) for page in pages], [200, 50])
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(set(pages[0]['results'][0]), {'id', 'item'})
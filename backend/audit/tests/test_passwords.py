@@ -0,0 +1,101 @@
+import importlib.util
+import unittest
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+
+from password_hashers import HASHERS, password_hashers
+
+# Cheap costs so the tests stay fast; the cost settings still reach the hashers
+CHEAP = dict(
+    PASSWORD_PBKDF2_ITERATIONS=1000,
+    PASSWORD_SCRYPT_WORK_FACTOR=2 ** 4,
+    PASSWORD_ARGON2_TIME_COST=1,
+    PASSWORD_ARGON2_MEMORY_COST=64,
+    PASSWORD_ARGON2_PARALLELISM=1,
+)
+HAS_ARGON2 = importlib.util.find_spec('argon2') is not None
+
+
+class PasswordHasherTests(TestCase):
+    def test_preferred_hasher_comes_first(self):
+        self.assertEqual(password_hashers('pbkdf2')[:2], [
+            'password_hashers.PBKDF2PasswordHasher', 'password_hashers.ScryptPasswordHasher'
+        ])
+        self.assertEqual(password_hashers('scrypt')[0], 'password_hashers.ScryptPasswordHasher')
+        with self.assertRaises(ValueError):
+            password_hashers('md5')
+
+    def test_argon2_falls_back_to_scrypt(self):
+        with mock.patch('importlib.util.find_spec', return_value=None):
+            hashers = password_hashers('argon2')
+        self.assertEqual(hashers[0], 'password_hashers.ScryptPasswordHasher')
+        self.assertNotIn('password_hashers.Argon2PasswordHasher', hashers)
+
+    def test_round_trip(self):
+        names = ['pbkdf2', 'scrypt'] + (['argon2'] if HAS_ARGON2 else [])
+        for name in names:
+            with self.subTest(name), override_settings(PASSWORD_HASHERS=password_hashers(name), **CHEAP):
+                encoded = make_password('correct horse')
+                self.assertIsInstance(identify_hasher(encoded), import_string(HASHERS[name]))
+                self.assertTrue(check_password('correct horse', encoded))
+                self.assertFalse(check_password('wrong horse', encoded))
+
+    @override_settings(PASSWORD_HASHERS=password_hashers('pbkdf2'), **CHEAP)
+    def test_cost_comes_from_settings(self):
+        for iterations in (1000, 1200):
+            with self.subTest(iterations), self.settings(PASSWORD_PBKDF2_ITERATIONS=iterations):
+                encoded = make_password('x')
+                self.assertEqual(identify_hasher(encoded).decode(encoded)['iterations'], iterations)
+
+
+@override_settings(**CHEAP)
+class PasswordUpgradeOnLoginTests(TestCase):
+    """A successful login rehashes a password stored with another hasher or cost"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_user(self, hasher, **costs):
+        with self.settings(PASSWORD_HASHERS=password_hashers(hasher), **costs):
+            user = User.objects.create_user('auditor', email='auditor@example.com', password='correct horse')
+        return user
+
+    def login(self, password):
+        return self.client.post('/api/auth/login/', {'username': 'auditor', 'password': password}, format='json')
+
+    def stored_hash(self):
+        return User.objects.get(username='auditor').password
+
+    @override_settings(PASSWORD_HASHERS=password_hashers('scrypt'))
+    def test_algorithm_upgrade(self):
+        self.create_user('pbkdf2')
+        old = self.stored_hash()
+        self.assertTrue(old.startswith('pbkdf2_sha256$'))
+
+        self.assertEqual(self.login('wrong horse').status_code, 400)
+        self.assertEqual(self.stored_hash(), old)
+
+        self.assertEqual(self.login('correct horse').status_code, 200)
+        self.assertTrue(self.stored_hash().startswith('scrypt$'))
+        self.assertEqual(self.login('correct horse').status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=password_hashers('pbkdf2'), PASSWORD_PBKDF2_ITERATIONS=1200)
+    def test_cost_upgrade(self):
+        self.create_user('pbkdf2', PASSWORD_PBKDF2_ITERATIONS=1000)
+
+        self.assertEqual(self.login('correct horse').status_code, 200)
+        encoded = self.stored_hash()
+        self.assertEqual(identify_hasher(encoded).decode(encoded)['iterations'], 1200)
+
+    @unittest.skipUnless(HAS_ARGON2, 'needs argon2-cffi')
+    @override_settings(PASSWORD_HASHERS=password_hashers('argon2'))
+    def test_argon2_upgrade(self):
+        self.create_user('scrypt')
+
+        self.assertEqual(self.login('correct horse').status_code, 200)
+        self.assertTrue(self.stored_hash().startswith('argon2$'))
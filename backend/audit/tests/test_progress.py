@@ -0,0 +1,125 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from audit.materialize import materialize_checklist
+from audit.models import Audit, Checklist
+from audit.progress import recount_progress
+
+
+def checklist_json(questions):
+    return json.dumps({'categories': [{'name': 'Access', 'questions': [f'Q{i}?' for i in range(questions)]}]})
+
+
+class ProgressCounterTests(TestCase):
+    """Audit.total_items/completed_items follow every way checklist rows are written"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        self.audit = Audit.objects.create(title='Audit', created_by=self.user)
+
+    def counters(self):
+        self.audit.refresh_from_db()
+        return self.audit.total_items, self.audit.completed_items, self.audit.is_completed
+
+    def assertInSync(self):
+        self.assertEqual(recount_progress(dry_run=True), 0)
+
+    def test_create(self):
+        Checklist.objects.create(audit=self.audit, item='Category 1: Access', order=1)
+        Checklist.objects.create(audit=self.audit, item='Is MFA enforced?', order=2)
+        Checklist.objects.create(audit=self.audit, item='Are accounts reviewed?', order=3, is_completed=True)
+
+        self.assertEqual(self.counters(), (2, 1, False))
+        self.assertInSync()
+
+    def test_materialize(self):
+        materialize_checklist(self.audit, '{"categories": [{"name": "Access", "questions": ["Q1?", "Q2?", "Q3?"]}]}')
+
+        self.assertEqual(self.counters(), (3, 0, False))
+        self.assertEqual(
+            list(Checklist.objects.filter(audit=self.audit).values_list('order', 'item')),
+            [(1, 'Category 1: Access'), (2, 'Q1?'), (3, 'Q2?'), (4, 'Q3?')]
+        )
+        self.assertInSync()
+
+    def test_update(self):
+        row = Checklist.objects.create(audit=self.audit, item='Is MFA enforced?', order=1)
+
+        row.is_completed = True
+        row.save()
+        self.assertEqual(self.counters(), (1, 1, True))
+
+        row = Checklist.objects.get(pk=row.pk)
+        row.item = 'Category 1: Access'
+        row.save()
+        self.assertEqual(self.counters(), (0, 0, False))
+        self.assertInSync()
+
+    def test_delete(self):
+        done = Checklist.objects.create(audit=self.audit, item='Is MFA enforced?', order=1, is_completed=True)
+        Checklist.objects.create(audit=self.audit, item='Are accounts reviewed?', order=2)
+
+        done.delete()
+        self.assertEqual(self.counters(), (1, 0, False))
+        Checklist.objects.filter(audit=self.audit).delete()
+        self.assertEqual(self.counters(), (0, 0, False))
+        self.assertInSync()
+
+    def test_deleting_an_owner_skips_per_row_counter_updates(self):
+        materialize_checklist(self.audit, checklist_json(50))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.user.delete()
+
+        self.assertFalse(Audit.objects.exists())
+        self.assertEqual([query['sql'] for query in ctx.captured_queries if query['sql'].startswith('UPDATE')], [])
+
+    def test_deleting_an_audit_fast_deletes_its_rows(self):
+        materialize_checklist(self.audit, checklist_json(50))
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.audit.delete()
+
+        table = connection.ops.quote_name(Checklist._meta.db_table)
+        # No SELECT of the rows to send signals for: a single DELETE ... WHERE audit_id IN (...)
+        selects = [q['sql'] for q in ctx.captured_queries
+                   if q['sql'].startswith('SELECT') and f'FROM {table}' in q['sql']]
+        deletes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith(f'DELETE FROM {table}')]
+        self.assertEqual(selects, [])
+        self.assertEqual(len(deletes), 1)
+        self.assertFalse(Checklist.objects.exists())
+
+    def test_bulk_delete_adjusts_counters_in_one_update(self):
+        other = Audit.objects.create(title='Other', created_by=self.user)
+        for audit in (self.audit, other):
+            materialize_checklist(audit, checklist_json(20))
+        Checklist.objects.filter(audit=self.audit, item__in=['Q0?', 'Q1?']).update(is_completed=True)
+        Audit.objects.filter(pk=self.audit.pk).update(completed_items=2)
+
+        with CaptureQueriesContext(connection) as ctx:
+            Checklist.objects.filter(item__in=['Q0?', 'Q1?', 'Q2?']).delete()
+
+        counter_updates = [q['sql'] for q in ctx.captured_queries if 'SET "total_items"' in q['sql']]
+        self.assertEqual(len(counter_updates), 1)
+        self.assertEqual(self.counters(), (17, 0, False))
+        other.refresh_from_db()
+        self.assertEqual((other.total_items, other.completed_items), (17, 0))
+        self.assertInSync()
+
+    def test_deleting_a_heading_still_changes_updated_at(self):
+        heading = Checklist.objects.create(audit=self.audit, item='Category 1: Access', order=1)
+        Audit.objects.filter(pk=self.audit.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        self.audit.refresh_from_db()
+        before = self.audit.updated_at
+
+        heading.delete()
+
+        self.audit.refresh_from_db()
+        self.assertGreater(self.audit.updated_at, before)
+        self.assertInSync()
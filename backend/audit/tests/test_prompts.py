@@ -0,0 +1,169 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+import prompts
+from checklist_schema import CHECKLIST_JSON_SCHEMA
+from prompts import (
+    CHECKLIST_PROMPT, PromptError, PromptSize, PromptTemplate, estimate_tokens, get_prompt, register, registered_prompts
+)
+
+
+def make_template(name='greeting', version=1, **overrides):
+    options = {'system': 'You are terse.', 'template': 'Hello {name}, you are {age:>3} years old.', **overrides}
+    return PromptTemplate(name=name, version=version, **options)
+
+
+class PromptTemplateTests(SimpleTestCase):
+    def test_fields_and_render(self):
+        template = make_template()
+
+        self.assertEqual(template.fields, {'name', 'age'})
+        self.assertEqual(template.render(name='Ada', age=36), 'Hello Ada, you are  36 years old.')
+        self.assertEqual(make_template(template='{{literal}} {x}').render(x=1), '{literal} 1')
+
+    def test_render_checks_values(self):
+        template = make_template()
+
+        with self.assertRaisesMessage(PromptError, 'greeting@1: missing values [age], unexpected values [nme]'):
+            template.render(nme='Ada', name='Ada')
+
+    def test_unsupported_placeholders(self):
+        for text in ('{0}', '{}', '{user.name}', '{items[0]}', '{name!r}'):
+            with self.subTest(text=text):
+                with self.assertRaisesMessage(ValueError, 'unsupported placeholder'):
+                    make_template(template=text)
+
+    def test_request(self):
+        template = make_template(max_tokens=100, temperature=0.2, json_schema=CHECKLIST_JSON_SCHEMA)
+        request = template.request(name='Ada', age=36)
+
+        self.assertEqual(request.prompt, 'Hello Ada, you are  36 years old.')
+        self.assertEqual(request.system, 'You are terse.')
+        self.assertEqual((request.max_tokens, request.temperature), (100, 0.2))
+        self.assertIs(request.json_schema, CHECKLIST_JSON_SCHEMA)
+
+    def test_tag_and_cache_key(self):
+        template = make_template(version=3)
+
+        self.assertEqual(template.tag, 'greeting@3')
+        self.assertEqual(template.cache_key, f'greeting@3:{template.fingerprint}')
+        self.assertRegex(template.fingerprint, r'^[0-9a-f]{12}$')
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_stable(self):
+        # A hash of the content only, so it is the same in every process and for every tag
+        self.assertEqual(make_template().fingerprint, make_template().fingerprint)
+        self.assertEqual(make_template().fingerprint, make_template(name='other', version=2).fingerprint)
+        self.assertEqual(make_template(json_schema={'a': 1, 'b': 2}).fingerprint,
+                         make_template(json_schema={'b': 2, 'a': 1}).fingerprint)
+
+    def test_changes_with_the_content(self):
+        base = make_template().fingerprint
+        changes = {
+            'template': {'template': 'Hi {name}, you are {age} years old.'},
+            'system': {'system': 'You are verbose.'},
+            'max_tokens': {'max_tokens': 10},
+            'temperature': {'temperature': 0.5},
+            'json_schema': {'json_schema': CHECKLIST_JSON_SCHEMA},
+        }
+        for part, overrides in changes.items():
+            with self.subTest(part=part):
+                self.assertNotEqual(make_template(**overrides).fingerprint, base)
+
+    def test_builtin_fingerprints_are_pinned(self):
+        # Editing a built-in prompt changes its fingerprint: bump its version and update the value here
+        self.assertEqual({template.tag: template.fingerprint for template in registered_prompts()}, {
+            'audit-checklist@1': '40446e33fca0',
+            'audit-recommendations@1': 'd394fdb52a05',
+            'checklist@1': '50934888a972',
+        })
+
+
+class TokenEstimateTests(SimpleTestCase):
+    def test_estimate_tokens(self):
+        self.assertEqual([estimate_tokens(text) for text in ('', 'a', 'abcd', 'abcde', 'x' * 400)], [0, 1, 1, 2, 100])
+
+    def test_estimate_splits_the_cacheable_prefix(self):
+        template = make_template(system='s' * 40, template='{text}')
+        size = template.estimate(text='t' * 10)
+
+        self.assertEqual(size, PromptSize(system=10, prompt=3))
+        self.assertEqual(size.total, 13)
+
+    def test_estimate_checks_values(self):
+        with self.assertRaises(PromptError):
+            make_template().estimate(name='Ada')
+
+
+class RegistryTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(prompts._registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_prompt(self):
+        first, second = register(make_template(version=1)), register(make_template(version=2))
+
+        self.assertIs(get_prompt('greeting'), second)
+        self.assertIs(get_prompt('greeting', 1), first)
+        with self.assertRaisesMessage(PromptError, "Unknown prompt 'missing'"):
+            get_prompt('missing')
+        with self.assertRaisesMessage(PromptError, 'Unknown prompt version greeting@3'):
+            get_prompt('greeting', 3)
+
+    def test_register_again(self):
+        template = register(make_template())
+
+        # The same content under the same tag is fine, e.g. when a module is imported twice
+        self.assertIs(register(make_template()), get_prompt('greeting'))
+        with self.assertRaisesMessage(ValueError, 'Prompt greeting@1 is already registered with different content'):
+            register(make_template(system='You are verbose.'))
+        self.assertEqual(get_prompt('greeting').fingerprint, template.fingerprint)
+
+    def test_registered_prompts_are_sorted(self):
+        register(make_template(name='zeta'))
+        register(make_template(version=2))
+        register(make_template(version=1))
+
+        self.assertEqual([template.tag for template in registered_prompts()], [
+            'audit-checklist@1', 'audit-recommendations@1', 'checklist@1', 'greeting@1', 'greeting@2', 'zeta@1',
+        ])
+
+    def test_builtin_prompts(self):
+        self.assertEqual(get_prompt('checklist').fields,
+                         {'audit_type', 'organization', 'industry', 'complexity_level', 'specific_requirements'})
+        self.assertEqual(get_prompt('audit-checklist').fields,
+                         {'company_name', 'industry', 'standard', 'company_size', 'country'})
+        self.assertEqual(get_prompt('audit-recommendations').fields, {'company_name', 'industry', 'standard', 'scores'})
+
+
+class ShowPromptsCommandTests(SimpleTestCase):
+    def call(self, *args):
+        out = StringIO()
+        call_command('show_prompts', *args, stdout=out)
+        return out.getvalue()
+
+    def test_lists_every_prompt(self):
+        lines = self.call().splitlines()
+
+        self.assertTrue(lines[0].startswith('prompt'))
+        self.assertEqual(lines[-1], '(estimated tokens)')
+        for template in registered_prompts():
+            with self.subTest(tag=template.tag):
+                row = next(line for line in lines if line.startswith(template.tag + ' '))
+                self.assertEqual(row.split(), [
+                    template.tag, template.fingerprint,
+                    str(estimate_tokens(template.system)), str(estimate_tokens(template.template)),
+                ])
+
+    def test_show_prints_one_prompt(self):
+        output = self.call('--show', 'checklist@1')
+
+        self.assertIn(f"[system]\n{CHECKLIST_PROMPT.system}", output)
+        self.assertIn(f"[template]\n{CHECKLIST_PROMPT.template}", output)
+        self.assertEqual(output.count('[system]'), 1)
+        self.assertNotIn('[system]', self.call('--show', 'missing@1'))
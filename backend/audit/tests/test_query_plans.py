@@ -0,0 +1,17 @@
+from django.test import TestCase
+
+from audit.management.commands.check_query_plans import Command
+from query_plans import index_friendly_planner
+
+
+class QueryPlanTests(TestCase):
+    """The list/retrieve/checklist/login/job queries are served by indexes"""
+
+    def test_queries_use_indexes(self):
+        with index_friendly_planner():
+            checks = Command().run_checks()
+
+        self.assertTrue(checks)
+        for check in checks:
+            with self.subTest(check.name):
+                self.assertEqual(check.problems, [], check.plan)
@@ -0,0 +1,112 @@
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, close_old_connections, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from audit import usernames
+from audit.usernames import create_with_free_username, next_free_username
+from audit.views import AuthViewSet
+
+register = AuthViewSet.as_view({'post': 'register'})
+
+# Registrations stay fast without changing what is being tested
+FAST_HASHING = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+
+def register_email(email):
+    request = APIRequestFactory().post('/api/auth/register/', {
+        'email': email, 'password': 'correct horse battery staple'
+    }, format='json')
+    return register(request)
+
+
+@FAST_HASHING
+class ConcurrentRegistrationTests(TransactionTestCase):
+    """Registrations racing for the same email local part all get distinct usernames"""
+
+    registrations = 8
+
+    def test_racing_registrations(self):
+        # Every registration reads the taken names before any of them inserts, so they collide
+        barrier = threading.Barrier(self.registrations, timeout=10)
+        # SQLite's shared in-memory test database fails rather than waits on a locked table,
+        # so there the registrations take turns once they have all read the taken names
+        turns = threading.Lock() if connection.vendor == 'sqlite' else None
+        state = threading.local()
+        calls = Counter()
+
+        def allocate(base, skip=0):
+            if getattr(state, 'allocated', False):
+                calls['retries'] += 1
+                return next_free_username(base, skip)
+            state.allocated = True
+            with turns or nullcontext():
+                name = next_free_username(base, skip)
+            barrier.wait()
+            if turns:
+                turns.acquire()
+                state.has_turn = True
+            return name
+
+        def attempt(i):
+            try:
+                response = register_email(f'info@example{i}.com')
+                return response.status_code, response.data['user']['username']
+            finally:
+                close_old_connections()
+                if getattr(state, 'has_turn', False):
+                    state.has_turn = False
+                    turns.release()
+
+        with mock.patch.object(usernames, 'next_free_username', side_effect=allocate):
+            with ThreadPoolExecutor(max_workers=self.registrations) as executor:
+                results = list(executor.map(attempt, range(self.registrations)))
+
+        self.assertEqual([status for status, _ in results], [201] * self.registrations)
+        taken = sorted(username for _, username in results)
+        self.assertEqual(len(set(taken)), self.registrations)
+        self.assertEqual(sorted(User.objects.values_list('username', flat=True)), taken)
+        self.assertTrue(all(name == 'info' or name[4:].isdigit() for name in taken))
+        # Losers of the race went through the IntegrityError retry
+        self.assertGreater(calls['retries'], 0)
+
+
+@FAST_HASHING
+class UsernameAllocationTests(TestCase):
+    def test_next_free_username(self):
+        for username in ('info', 'info1', 'info3', 'info03', 'infox', 'Info2'):
+            User.objects.create(username=username)
+
+        self.assertEqual(next_free_username('info'), 'info2')
+        self.assertEqual(next_free_username('info', skip=1), 'info4')
+        self.assertEqual(next_free_username('other'), 'other')
+
+    def test_retries_a_username_taken_in_the_meantime(self):
+        User.objects.create(username='info')
+        # The first allocation misses the concurrent insert of "info"
+        with mock.patch.object(usernames, 'next_free_username', side_effect=['info', 'info1']) as allocate:
+            response = register_email('info@example.com')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user']['username'], 'info1')
+        self.assertEqual(allocate.call_count, 2)
+
+    def test_other_integrity_errors_are_raised(self):
+        def create(username):
+            raise IntegrityError('some other constraint')
+
+        with self.assertRaises(IntegrityError):
+            create_with_free_username('info', create)
+
+    def test_gives_up_after_max_attempts(self):
+        User.objects.create(username='info')
+        with mock.patch.object(usernames, 'next_free_username', return_value='info') as allocate:
+            with self.assertRaises(IntegrityError):
+                create_with_free_username('info', lambda username: User.objects.create(username=username))
+        self.assertEqual(allocate.call_count, usernames.MAX_ATTEMPTS)
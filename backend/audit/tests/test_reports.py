@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+import reports
+from audit.models import Audit, Checklist
+from audit.report import REPORT_TEMPLATE, report_context
+from reports import ReportError, ReportRenderer
+
+
+def drain(renderer):
+    """Wait until queued renders and their done callbacks have run (the pool has one worker)"""
+    renderer.executor.submit(lambda: None).result(timeout=10)
+
+
+class ReportRendererTests(TestCase):
+    """fetch() never waits for a render: None until the report is on disk, then an open file"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.renderer = ReportRenderer(self.cache_dir.name, max_workers=1, max_files=10)
+        self.addCleanup(self.renderer.executor.shutdown)
+        user = User.objects.create_user('auditor', password='x')
+        self.audit = Audit.objects.create(title='Quarterly audit', created_by=user)
+        Checklist.objects.create(audit=self.audit, item='Is MFA enforced?', order=1)
+
+    def fetch(self):
+        return self.renderer.fetch(REPORT_TEMPLATE, report_context(self.audit), 'html')
+
+    def read(self, report):
+        with report:
+            return report.read().decode()
+
+    def cached_files(self):
+        return [name for name in os.listdir(self.cache_dir.name) if name.endswith('.html')]
+
+    def test_render_then_cache_hit(self):
+        self.assertIsNone(self.fetch())
+        drain(self.renderer)
+
+        html = self.read(self.fetch())
+        self.assertIn('Is MFA enforced?', html)
+        self.assertEqual(self.read(self.fetch()), html)
+        stats = self.renderer.stats()
+        self.assertEqual((stats['renders'], stats['cache_hits'], stats['in_flight']), (1, 2, 0))
+
+    def test_polls_during_a_render_share_it(self):
+        release = threading.Event()
+        render = self.renderer._render
+
+        def slow_render(*args):
+            release.wait(10)
+            return render(*args)
+
+        with mock.patch.object(self.renderer, '_render', side_effect=slow_render) as patched:
+            self.assertIsNone(self.fetch())
+            self.assertIsNone(self.fetch())
+            self.assertEqual(self.renderer.stats()['in_flight'], 1)
+            release.set()
+            drain(self.renderer)
+
+        self.assertEqual(patched.call_count, 1)
+        self.assertEqual(self.renderer.stats()['coalesced'], 1)
+        self.assertIn('Is MFA enforced?', self.read(self.fetch()))
+
+    def test_pruned_report_renders_again(self):
+        self.fetch()
+        drain(self.renderer)
+        for name in self.cached_files():
+            os.unlink(os.path.join(self.cache_dir.name, name))
+
+        self.assertIsNone(self.fetch())
+        drain(self.renderer)
+        self.assertIn('Is MFA enforced?', self.read(self.fetch()))
+        self.assertEqual(self.renderer.stats()['renders'], 2)
+
+    def test_failed_render_is_reported_once(self):
+        with mock.patch('reports.render_to_string', side_effect=ValueError('bad template')):
+            with self.assertLogs('reports', 'WARNING'):
+                self.assertIsNone(self.fetch())
+                drain(self.renderer)
+            with self.assertRaisesMessage(ReportError, 'bad template'):
+                self.fetch()
+            self.assertEqual(self.renderer.stats()['failures'], 1)
+
+        # The next poll starts a fresh render
+        self.assertIsNone(self.fetch())
+        drain(self.renderer)
+        self.assertIn('Is MFA enforced?', self.read(self.fetch()))
+        self.assertEqual(os.listdir(self.cache_dir.name), self.cached_files())
+
+    def test_unknown_format(self):
+        with self.assertRaisesMessage(ReportError, "Unknown report format 'docx'"):
+            self.renderer.fetch(REPORT_TEMPLATE, report_context(self.audit), 'docx')
+        self.assertEqual(self.renderer.stats()['in_flight'], 0)
+
+    def test_open_report_survives_pruning(self):
+        self.fetch()
+        drain(self.renderer)
+        report = self.fetch()
+        self.addCleanup(report.close)
+        try:
+            os.unlink(report.name)
+        except PermissionError:
+            self.skipTest('open files cannot be removed on this platform')
+
+        self.assertIn(b'Is MFA enforced?', report.read())
+
+
+class ReportViewTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.renderer = ReportRenderer(self.cache_dir.name, max_workers=1, max_files=10)
+        self.addCleanup(self.renderer.executor.shutdown)
+        patcher = mock.patch.object(reports, '_renderer', self.renderer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user('auditor', password='x')
+        self.audit = Audit.objects.create(title='Quarterly audit', created_by=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_html_report(self):
+        url = f'/api/audits/list/{self.audit.pk}/report/html/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'status': 'rendering'})
+        self.assertEqual(response['Location'], f'http://testserver{url}')
+        self.assertEqual(response['Retry-After'], str(reports.REPORT_RETRY_AFTER))
+
+        drain(self.renderer)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Quarterly audit', b''.join(response.streaming_content))
+        response.close()
+
+    def test_unknown_format(self):
+        response = self.client.get(f'/api/audits/list/{self.audit.pk}/report/docx/')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,102 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from audit.models import Audit, Checklist
+
+
+class AuditETagTests(TestCase):
+    """Audit list and detail responses carry ETags and answer If-None-Match with 304 until they change"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('auditor', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.audit = Audit.objects.create(title='Audit', created_by=self.user)
+        self.item = Checklist.objects.create(audit=self.audit, item='Question', order=0)
+        self.detail = f'/api/audits/list/{self.audit.pk}/'
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_etag_and_not_modified(self):
+        for url in (self.detail, '/api/audits/list/'):
+            with self.subTest(url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertTrue(etag.startswith('"'))
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertIn('private', response['Cache-Control'])
+
+                not_modified = self.revalidate(url, etag)
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.content, b'')
+                self.assertEqual(not_modified['ETag'], etag)
+
+                self.assertEqual(self.revalidate(url, f'"other", {etag}').status_code, 304)
+                self.assertEqual(self.revalidate(url, '"other"').status_code, 200)
+
+    def test_variants_have_their_own_etags(self):
+        full = self.client.get(self.detail)['ETag']
+        trimmed = self.client.get(self.detail, {'omit': 'checklists'})['ETag']
+        self.assertNotEqual(full, trimmed)
+        self.assertEqual(self.client.get(self.detail, {'omit': 'checklists'}, HTTP_IF_NONE_MATCH=full).status_code,
+                         200)
+
+    def test_updated_at_change_invalidates(self):
+        etags = {url: self.client.get(url)['ETag'] for url in (self.detail, '/api/audits/list/')}
+
+        self.item.is_completed = True
+        self.item.save()
+
+        for url, etag in etags.items():
+            with self.subTest(url):
+                response = self.revalidate(url, etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+        detail = self.client.get(self.detail).data
+        self.assertEqual(detail['completed_items'], 1)
+        self.assertTrue(detail['checklists'][0]['is_completed'])
+
+    def test_audit_save_invalidates(self):
+        etag = self.client.get(self.detail)['ETag']
+        self.audit.title = 'Renamed audit'
+        self.audit.save()
+        response = self.revalidate(self.detail, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Renamed audit')
+
+    def test_creator_rename_invalidates(self):
+        etags = {url: self.client.get(url)['ETag'] for url in (self.detail, '/api/audits/list/')}
+
+        self.user.username = 'lead-auditor'
+        self.user.save()
+
+        response = self.revalidate(self.detail, etags[self.detail])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created_by']['username'], 'lead-auditor')
+        response = self.revalidate('/api/audits/list/', etags['/api/audits/list/'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['created_by']['username'], 'lead-auditor')
+
+    def test_creator_rename_without_signals_changes_the_detail_etag(self):
+        etag = self.client.get(self.detail)['ETag']
+        # A queryset update sends no signals, so only the creator's username in the stamp catches it
+        User.objects.filter(pk=self.user.pk).update(username='lead-auditor')
+        response = self.revalidate(self.detail, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created_by']['username'], 'lead-auditor')
+
+    def test_login_does_not_invalidate(self):
+        etag = self.client.get(self.detail)['ETag']
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.revalidate(self.detail, etag).status_code, 304)
+
+    def test_list_etags_are_per_user(self):
+        etag = self.client.get('/api/audits/list/')['ETag']
+        staff = User.objects.create_user('admin', password='x', is_staff=True)
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.revalidate('/api/audits/list/', etag).status_code, 200)
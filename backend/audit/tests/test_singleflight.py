@@ -0,0 +1,164 @@
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from audit import checklist_cache, singleflight
+from audit.checklist_cache import LocMemChecklistCache
+from audit.generation import generate_checklist_text
+from audit.models import Audit
+from audit.singleflight import SingleFlight, get_single_flight
+from fake_llm_server import CHECKLIST
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out waiting')
+        time.sleep(0.005)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def start(self, target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls, results = [], []
+
+        def provider():
+            calls.append(1)
+            release.wait(5)
+            return 'checklist'
+
+        threads = [self.start(lambda: results.append(flight.do('key', provider))) for _ in range(8)]
+        wait_until(lambda: flight.stats()['coalesced'] == 7)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['checklist'] * 8)
+        self.assertEqual(flight.stats()['in_flight'], 0)
+
+    def test_leader_error_reaches_followers(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def provider():
+            release.wait(5)
+            raise ValueError('LLM failed')
+
+        def call():
+            try:
+                flight.do('key', provider)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [self.start(call) for _ in range(3)]
+        wait_until(lambda: flight.stats()['coalesced'] == 2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(errors), 3)
+
+    def test_processes_share_one_call_through_the_lock_file(self):
+        fcntl = singleflight.fcntl
+        if fcntl is None:
+            self.skipTest('File locks need fcntl')
+        lock_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(lock_dir.cleanup)
+        # Two SingleFlight instances lock separate file descriptions, like two processes
+        first, second = SingleFlight(lock_dir.name), SingleFlight(lock_dir.name)
+        cache, calls, results = {}, [], []
+        release, blocked = threading.Event(), threading.Event()
+        real_flock = fcntl.flock
+
+        def flock(lock_file, operation):
+            if operation == fcntl.LOCK_EX:
+                blocked.set()
+            return real_flock(lock_file, operation)
+
+        def provider():
+            calls.append(1)
+            release.wait(5)
+            cache['key'] = 'checklist'
+            return 'checklist'
+
+        def call(flight):
+            results.append(flight.do('key', provider, recheck=lambda: cache.get('key')))
+
+        with mock.patch.object(singleflight.fcntl, 'flock', side_effect=flock):
+            leader = self.start(call, first)
+            wait_until(lambda: calls)
+            follower = self.start(call, second)
+            # The follower is about to wait on the leader's lock
+            self.assertTrue(blocked.wait(5))
+            release.set()
+            leader.join(5)
+            follower.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['checklist', 'checklist'])
+        self.assertEqual(second.stats()['lock_waits'], 1)
+        self.assertEqual(second.stats()['coalesced_across_processes'], 1)
+        # Lock files do not pile up in the lock directory
+        self.assertEqual(os.listdir(lock_dir.name), [])
+
+
+class GenerateChecklistTextTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in ((singleflight, '_single_flight'), (checklist_cache, '_cache')):
+            patcher = mock.patch.object(name, value, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_concurrent_requests_make_one_provider_call(self):
+        release = threading.Event()
+        generator = mock.Mock(model_name='model', prompt=mock.Mock(cache_key='checklist@1'))
+
+        def generate_checklist(**kwargs):
+            release.wait(5)
+            return CHECKLIST
+
+        generator.generate_checklist.side_effect = generate_checklist
+        results = []
+        audit = Audit(audit_type='IT Security', industry='Finance')
+        with mock.patch('audit.generation.get_checklist_generator', return_value=generator):
+            threads = [threading.Thread(target=lambda: results.append(generate_checklist_text(audit)))
+                       for _ in range(6)]
+            for thread in threads:
+                thread.start()
+            wait_until(lambda: get_single_flight().stats()['coalesced'] == 5)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(generator.generate_checklist.call_count, 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertEqual(len(results), 6)
+
+    def test_file_locks_only_with_a_shared_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for backend, locked in (('locmem', False), ('sqlite', True)):
+            with self.subTest(backend), override_settings(
+                CHECKLIST_CACHE={'BACKEND': backend, 'LOCATION': os.path.join(directory.name, 'cache.sqlite3')},
+                CHECKLIST_LOCK_DIR=directory.name
+            ):
+                singleflight._single_flight = checklist_cache._cache = None
+                self.assertEqual(get_single_flight().lock_dir, directory.name if locked else None)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_django_cache_is_not_shared(self):
+        self.assertFalse(checklist_cache.DjangoChecklistCache(60).shared)
+        self.assertFalse(LocMemChecklistCache(60, 10).shared)
@@ -0,0 +1,123 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase
+from rest_framework.test import APIClient
+
+from audit.models import Audit, Checklist
+from token_auth import ClaimsRefreshToken
+
+CHECKLIST = json.dumps({'categories': [
+    {'name': 'Access', 'description': '', 'questions': ['Is MFA enforced?', 'Are accounts reviewed?']},
+    {'name': 'Backups', 'description': '', 'questions': ['Are restores tested?']},
+]})
+AUDIT = {
+    'title': 'Quarterly audit', 'audit_type': 'security', 'organization': 'Acme',
+    'industry': 'Technology', 'complexity_level': 'basic',
+}
+
+
+class FakeStream:
+    """Stands in for stream_checklist_text, handing out the checklist in small chunks"""
+
+    def __init__(self, text=CHECKLIST, size=16):
+        self.chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self.pulled = 0
+
+    def __call__(self, audit, force_refresh=False):
+        for chunk in self.chunks:
+            self.pulled += 1
+            yield chunk
+
+
+def parse_event(raw):
+    lines = (raw.decode() if isinstance(raw, bytes) else raw).strip().split('\n')
+    return lines[0][len('event: '):], json.loads(lines[1][len('data: '):])
+
+
+class ChecklistStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.stream = FakeStream()
+        patcher = mock.patch('audit.views.stream_checklist_text', self.stream)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_events_arrive_incrementally_and_rows_are_saved_per_category(self):
+        response = self.client.post('/api/audits/create/stream/', AUDIT, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+
+        events = []
+        for raw in response.streaming_content:
+            event, data = parse_event(raw)
+            events.append((event, data.get('item')))
+            if event == 'audit':
+                audit = Audit.objects.get(pk=data['id'])
+            if event == 'item' and len(events) == 3:
+                # The first question is sent while most of the output is still to come
+                self.assertLess(self.stream.pulled, len(self.stream.chunks))
+                # Rows are written a category at a time, so nothing is saved yet
+                self.assertFalse(Checklist.objects.exists())
+            if event == 'category' and data['item'].startswith('Category 2'):
+                # The first category was written when the second one started
+                self.assertEqual(
+                    list(Checklist.objects.order_by('order').values_list('item', flat=True)),
+                    ['Category 1: Access', 'Is MFA enforced?', 'Are accounts reviewed?']
+                )
+                audit.refresh_from_db()
+                self.assertEqual(audit.total_items, 2)
+
+        self.assertEqual(events, [
+            ('audit', None),
+            ('category', 'Category 1: Access'),
+            ('item', 'Is MFA enforced?'),
+            ('item', 'Are accounts reviewed?'),
+            ('category', 'Category 2: Backups'),
+            ('item', 'Are restores tested?'),
+            ('done', None),
+        ])
+        audit.refresh_from_db()
+        self.assertEqual((Checklist.objects.count(), audit.total_items), (5, 3))
+
+    def test_unparseable_output_reports_an_error(self):
+        self.stream.chunks = ['nothing useful here']
+
+        response = self.client.post('/api/audits/create/stream/', AUDIT, format='json')
+        with self.assertLogs('audit.materialize', 'WARNING'):
+            events = [parse_event(raw) for raw in response.streaming_content]
+
+        self.assertEqual(events[-1][0], 'error')
+        self.assertFalse(Checklist.objects.exists())
+
+
+class AsgiChecklistStreamTests(TestCase):
+    """Under ASGI the body is an async iterator, so Django sends events as they are produced"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('auditor', password='x')
+        self.token = str(ClaimsRefreshToken.for_user(self.user).access_token)
+        self.stream = FakeStream()
+
+    async def test_streamed_under_asgi(self):
+        with mock.patch('audit.views.stream_checklist_text', self.stream):
+            response = await AsyncClient().post(
+                '/api/audits/create/stream/', AUDIT, content_type='application/json',
+                headers={'Authorization': f'Bearer {self.token}'}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+
+            events = []
+            async for raw in response.streaming_content:
+                event, data = parse_event(raw)
+                if event == 'item' and not any(name == 'item' for name, _ in events):
+                    self.assertLess(self.stream.pulled, len(self.stream.chunks))
+                events.append((event, data.get('item')))
+
+        self.assertEqual([event for event, _ in events],
+                         ['audit', 'category', 'item', 'item', 'category', 'item', 'done'])
+        self.assertEqual(await Checklist.objects.acount(), 5)
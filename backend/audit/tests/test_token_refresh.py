@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from token_auth import ClaimsRefreshToken
+
+
+class TokenRefreshTests(TestCase):
+    """Refresh re-reads the user instead of copying the claims of the login"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('auditor', password='x', is_staff=True)
+        self.refresh = str(ClaimsRefreshToken.for_user(self.user))
+        self.client = APIClient()
+
+    def refresh_token(self):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': self.refresh}, format='json')
+
+    def test_refresh_carries_current_claims(self):
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(AccessToken(response.data['access'])['is_staff'])
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=False, username='demoted')
+        response = self.refresh_token()
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data['access'])
+        self.assertFalse(access['is_staff'])
+        self.assertEqual(access['username'], 'demoted')
+
+    def test_demoted_staff_loses_staff_access(self):
+        self.user.is_staff = False
+        self.user.save()
+
+        access = self.refresh_token().data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/api/users/list/').status_code, 403)
+
+    def test_deactivated_user_is_refused(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        self.assertEqual(self.refresh_token().status_code, 401)
+
+    def test_deleted_user_is_refused(self):
+        User.objects.filter(pk=self.user.pk).delete()
+
+        self.assertEqual(self.refresh_token().status_code, 401)
+
+    @override_settings(JWT_REVOCATION=True)
+    def test_revoked_refresh_token_is_refused(self):
+        # Revocation keeps same-second tokens, so date the login back
+        token = ClaimsRefreshToken(self.refresh)
+        token['auth_time'] -= 5
+        self.refresh = str(token)
+
+        self.user.set_password('changed')
+        self.user.save()
+
+        self.assertEqual(self.refresh_token().status_code, 401)
@@ -0,0 +1,69 @@
+"""
+Username allocation for self-registration.
+
+Usernames are derived from the email's local part: "info", then "info1",
+"info2" and so on. All names already taken with that prefix are read in one
+query and the first free one is picked in memory. Nothing is locked, so a
+concurrent registration can still claim the same name first; the insert
+then fails on auth_user's unique constraint and allocation starts over.
+"""
+
+import random
+import re
+from typing import Callable, TypeVar
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+
+# Room is left for a numeric suffix
+BASE_MAX_LENGTH = User._meta.get_field('username').max_length - 6
+
+# Attempts before a unique-constraint failure is given up on
+MAX_ATTEMPTS = 10
+
+T = TypeVar('T')
+
+
+def username_base(email: str) -> str:
+    """The email's local part, reduced to the characters Django allows in usernames"""
+    return re.sub(r'[^\w.@+-]', '', email.split('@')[0])[:BASE_MAX_LENGTH] or 'user'
+
+
+def next_free_username(base: str, skip: int = 0) -> str:
+    """
+    The first of base, base1, base2, ... that is not taken, found with a single query.
+    skip passes over that many free names first.
+    """
+    taken = set()
+    for username in User.objects.filter(username__startswith=base).values_list('username', flat=True).iterator():
+        if not username.startswith(base):
+            continue  # SQLite's LIKE ignores case
+        suffix = username[len(base):]
+        if suffix == '':
+            taken.add(0)
+        elif suffix.isdigit() and not suffix.startswith('0'):
+            taken.add(int(suffix))
+    counter = 0
+    while counter in taken or skip:
+        if counter not in taken:
+            skip -= 1
+        counter += 1
+    return f'{base}{counter}' if counter else base
+
+
+def create_with_free_username(base: str, create: Callable[[str], T]) -> T:
+    """
+    Call create(username) with the next free username, allocating a new one if a
+    concurrent registration took it first. create should only insert the user;
+    slow work such as hashing the password belongs before this call.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        # Registrations that lost the same race spread over the next few free names
+        username = next_free_username(base, skip=random.randrange(attempt + 1))
+        try:
+            # A savepoint, so a failed insert leaves any surrounding transaction usable
+            with transaction.atomic():
+                return create(username)
+        except IntegrityError:
+            if attempt == MAX_ATTEMPTS - 1 or not User.objects.filter(username=username).exists():
+                raise
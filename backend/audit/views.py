@@ -1,27 +1,43 @@
 from rest_framework import viewsets, permissions, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from .models import Audit, Checklist, AdminInvitation
+from django.http import FileResponse, StreamingHttpResponse
+from .models import Audit, Checklist, ChecklistJob, AdminInvitation
 from .serializers import (
-    UserCreateSerializer, LoginSerializer, AuditSerializer,
-    ChecklistSerializer, AdminInvitationSerializer
+    UserCreateSerializer, RegisterSerializer, LoginSerializer, AuditSerializer,
+    ChecklistSerializer, ChecklistJobSerializer, AdminInvitationSerializer, AdminInvitationBulkCreateSerializer,
+    BulkAuditCreateSerializer, ChecklistBatchUpdateSerializer, ChecklistBatchResultSerializer
 )
+from .jobs import enqueue_checklist_job
+from .generation import checklist_prompt, stream_checklist_text
+from .materialize import stream_materialize_checklist
+from .renderers import EventStreamRenderer, ExportRenderer, format_event
+from .streaming import streaming_content
+from .checklist_cache import get_checklist_cache
+from .singleflight import get_single_flight
+from .pagination import AuditCursorPagination, ChecklistCursorPagination
+from .bulk import queue_bulk
+from .progress import ChecklistUpdateError, apply_checklist_updates
+from .stats import get_stats, visible_audits
+from .usernames import create_with_free_username, username_base
+from .report import REPORT_TEMPLATE, report_context
+from .outbox import create_invitations, invitation_email, queue_emails
+from .export import EXPORT_FORMATS, ExportError, check_format, csv_lines, export_rows, jsonl_lines, xlsx_file
+from . import response_cache
 from rest_framework_simplejwt.views import TokenRefreshView
-from django.core.mail import send_mail
-from django.conf import settings
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
-from drf_spectacular.utils import extend_schema, extend_schema_view
-from rest_framework_simplejwt.tokens import RefreshToken
-import sys
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
+from token_auth import ClaimsRefreshToken
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from chat import AuditChecklistGenerator
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Prefetch
+from django.shortcuts import get_object_or_404
 from dotenv import load_dotenv
-import google.generativeai as genai
+from reports import REPORT_FORMATS, REPORT_RETRY_AFTER, ReportError, render_report
 
 # Load environment variables
 load_dotenv()
@@ -29,13 +45,11 @@ load_dotenv()
 # Debug print to check if the API key is loaded
 print("GEMINI_API_KEY:", os.getenv('GEMINI_API_KEY'))
 
-# Configure the Gemini API
-genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-
 # Authentication Views
 @extend_schema_view(
     register=extend_schema(
         description="Register a new user (always as regular user)",
+        request=RegisterSerializer,
         responses={201: UserCreateSerializer, 400: None}
     ),
     login=extend_schema(
@@ -68,27 +82,19 @@ class AuthViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['post'], url_path='register')
     def register(self, request):
         """Register a new user (always as regular user)"""
-        data = request.data.copy()
-        email = data.get('email', '')
-        
-        # Generate a unique username from email
-        base_username = email.split('@')[0]
-        username = base_username
-        counter = 1
-        
-        # Keep trying until we find a unique username
-        while User.objects.filter(username=username).exists():
-            username = f"{base_username}{counter}"
-            counter += 1
-        
-        data['username'] = username
-        serializer = UserCreateSerializer(data=data)
+        serializer = RegisterSerializer(data=request.data)
         
         if serializer.is_valid():
-            user = serializer.save(is_staff=False)  # Ensure new registrations are not staff
+            email = serializer.validated_data['email']
+            password = make_password(serializer.validated_data['password'])
+            # Username from the email: "info", then "info1", "info2", ...; never staff
+            user = create_with_free_username(
+                username_base(email),
+                lambda username: User.objects.create(username=username, email=email, password=password)
+            )
             
             # Generate tokens for the new user
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             
             return Response({
                 'token': str(refresh.access_token),
@@ -126,84 +132,319 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 # Audit Management Views
+refresh_parameter = OpenApiParameter(
+    'refresh', bool, description="Regenerate the checklist even if a cached one exists"
+)
+
+fields_parameters = [
+    OpenApiParameter('fields', str, description="Comma-separated fields to include, e.g. id,title,is_completed"),
+    OpenApiParameter('omit', str, description="Comma-separated fields to leave out, e.g. checklists"),
+]
+
+@extend_schema_view(
+    list=extend_schema(parameters=fields_parameters),
+    retrieve=extend_schema(parameters=fields_parameters, responses={200: AuditSerializer, 304: None}),
+)
 class AuditViewSet(viewsets.ModelViewSet):
     queryset = Audit.objects.all()
     serializer_class = AuditSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = AuditCursorPagination
+
+    def force_refresh(self):
+        return self.request.query_params.get('refresh', '').lower() in ('1', 'true', 'yes')
+
+    @extend_schema(parameters=[refresh_parameter], responses={202: AuditSerializer})
+    def create(self, request, *args, **kwargs):
+        """Create an audit and queue its checklist generation"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-    def perform_create(self, serializer):
         with transaction.atomic():
-            # Save the audit first
-            audit = serializer.save(created_by=self.request.user)
-            
-            # Initialize the checklist generator
-            api_key = os.getenv('GEMINI_API_KEY')
-            if not api_key:
-                raise Exception("GEMINI_API_KEY not found in environment variables")
-            
-            generator = AuditChecklistGenerator(api_key)
-            
-            # Generate checklist using chat.py
-            checklist_text = generator.generate_checklist(
-                audit_type=audit.audit_type,
-                organization=audit.organization,
-                industry=audit.industry,
-                specific_requirements=audit.specific_requirements,
-                complexity_level=audit.complexity_level
+            audit = serializer.save(created_by=request.user)
+            job = ChecklistJob.objects.create(audit=audit, force_refresh=self.force_refresh())
+            # Only hand the job to a worker once the audit row is visible to it
+            transaction.on_commit(lambda: enqueue_checklist_job(job.id))
+
+        data = dict(serializer.data)
+        data['job'] = ChecklistJobSerializer(job).data
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        description="Create an audit and stream its checklist as Server-Sent Events",
+        parameters=[refresh_parameter],
+        responses={(200, 'text/event-stream'): OpenApiTypes.STR}
+    )
+    @action(detail=False, methods=['post'], url_path='stream',
+            renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def create_stream(self, request):
+        """Create an audit and stream its checklist as Server-Sent Events"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        audit = serializer.save(created_by=request.user)
+
+        response = StreamingHttpResponse(
+            streaming_content(request, self.checklist_events(audit, serializer.data)),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Stop proxies from buffering the stream
+        return response
+
+    @extend_schema(
+        description="Create many audits and queue a checklist job for each; poll the jobs for their results",
+        parameters=[refresh_parameter],
+        request=BulkAuditCreateSerializer,
+        responses={202: OpenApiTypes.OBJECT}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def create_bulk(self, request):
+        """Create many audits and queue their checklist generation"""
+        serializer = BulkAuditCreateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        jobs = queue_bulk(
+            serializer.validated_data['audits'],
+            user=request.user,
+            force_refresh=self.force_refresh()
+        )
+        return Response({'jobs': ChecklistJobSerializer(jobs, many=True).data}, status=status.HTTP_202_ACCEPTED)
+
+    def checklist_events(self, audit, audit_data):
+        yield format_event('audit', audit_data)
+
+        rows = 0
+        try:
+            chunks = stream_checklist_text(audit, force_refresh=self.force_refresh())
+            for entry, row in stream_materialize_checklist(audit, chunks, prompt_version=checklist_prompt().tag):
+                rows += 1
+                yield format_event(
+                    'category' if entry.is_category else 'item',
+                    {'item': row.item, 'order': row.order}
+                )
+        except Exception as e:
+            yield format_event('error', {'error': str(e), 'rows': rows})
+            return
+        if not rows:
+            yield format_event('error', {'error': "Generated output contains no checklist questions", 'rows': 0})
+            return
+
+        yield format_event('done', {'audit': audit.id, 'rows': rows})
+
+    @extend_schema(
+        description="Printable report of the audit with its checklist and notes, as HTML or PDF; 202 while it renders, poll the Location",
+        parameters=[OpenApiParameter('report_format', str, OpenApiParameter.PATH, enum=list(REPORT_FORMATS))],
+        responses={(200, 'application/pdf'): OpenApiTypes.BINARY, 202: None, 400: None, 404: None}
+    )
+    @action(detail=True, methods=['get'], renderer_classes=[JSONRenderer, ExportRenderer])
+    def report(self, request, pk=None, report_format='pdf'):
+        """Serve the copy cached for this content, or answer 202 while the report worker pool renders it"""
+        audit = get_object_or_404(self.visible_audits(Audit.objects.all()), pk=pk)
+        try:
+            report = render_report(REPORT_TEMPLATE, report_context(audit), report_format)
+        except ReportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if report is None:
+            # Rendering on the pool; the client polls this same URL until it gets the file
+            response = Response({'status': 'rendering'}, status=status.HTTP_202_ACCEPTED)
+            response['Location'] = request.build_absolute_uri()
+            response['Retry-After'] = str(REPORT_RETRY_AFTER)
+            return response
+        return FileResponse(
+            report,
+            as_attachment=report_format == 'pdf',
+            filename=f'audit-{audit.pk}-report.{report_format}',
+            content_type=REPORT_FORMATS[report_format]
+        )
+
+    def list(self, request, *args, **kwargs):
+        # Any change to a visible audit moves the newest updated_at or the count
+        summary = self.visible_audits(Audit.objects.all()).aggregate(
+            latest=Max('updated_at'), count=Count('id')
+        )
+        stamp = f"{summary['latest']}:{summary['count']}"
+        variant = f"{request.get_host()}?{response_cache.variant_of(request)}"
+        etag = response_cache.make_etag(request.user.pk, stamp, variant)
+        if response_cache.not_modified(request, etag):
+            return response_cache.with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        key = response_cache.list_key(request.user.pk, variant)
+        data = response_cache.get_list_data(key, stamp)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            response_cache.set_list_data(key, stamp, data)
+        return response_cache.with_etag(Response(data), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Read only the version stamp first; the nested checklist is loaded on a cache miss
+        stamped = get_object_or_404(
+            self.visible_audits(
+                Audit.objects.select_related('created_by').only('id', 'updated_at', 'created_by__username')
+            ),
+            pk=kwargs[self.lookup_field]
+        )
+        self.check_object_permissions(request, stamped)
+        stamp = response_cache.audit_stamp(stamped)
+        variant = response_cache.variant_of(request)
+        etag = response_cache.make_etag(stamped.pk, stamp, variant)
+        if response_cache.not_modified(request, etag):
+            return response_cache.with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        data = response_cache.get_audit_data(stamped.pk, stamp, variant)
+        if data is None:
+            data = self.get_serializer(self.get_object()).data
+            response_cache.set_audit_data(stamped.pk, stamp, variant, data)
+        return response_cache.with_etag(Response(data), etag)
+
+    def visible_audits(self, queryset):
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(created_by=self.request.user)
+
+    def get_queryset(self):
+        queryset = Audit.objects.select_related('created_by')
+        # Skip loading checklist rows entirely when the client did not ask for them
+        if 'checklists' in self.get_serializer().fields:
+            queryset = queryset.prefetch_related(
+                Prefetch('checklists', queryset=Checklist.objects.order_by('order', 'id'))
             )
-            
-            # Process the checklist text
-            current_category = None
-            order = 1
-            
-            for line in checklist_text.split('\n'):
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                # Check if this is a category line
-                if line.startswith('Category'):
-                    current_category = line
-                    # Create the category as a checklist item
-                    Checklist.objects.create(
-                        audit=audit,
-                        item=current_category,
-                        order=order,
-                        is_completed=False
-                    )
-                    order += 1
-                # Check if this is a question line (starts with -)
-                elif line.startswith('-'):
-                    question = line[1:].strip()  # Remove the - and any extra spaces
-                    Checklist.objects.create(
-                        audit=audit,
-                        item=question,
-                        order=order,
-                        is_completed=False
-                    )
-                    order += 1
+        return self.visible_audits(queryset)
+
+# Checklist Generation Job Views
+@extend_schema_view(
+    result=extend_schema(
+        description="Get the generated audit once the job has succeeded",
+        responses={200: AuditSerializer, 202: ChecklistJobSerializer, 500: ChecklistJobSerializer}
+    )
+)
+class ChecklistJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ChecklistJob.objects.all()
+    serializer_class = ChecklistJobSerializer
+    permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        queryset = ChecklistJob.objects.select_related('audit')
         if self.request.user.is_staff:
-            return Audit.objects.all()
-        return Audit.objects.filter(created_by=self.request.user)
+            return queryset
+        return queryset.filter(audit__created_by=self.request.user)
+
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """Get the generated audit once the job has succeeded"""
+        job = self.get_object()
+        if job.status == 'succeeded':
+            audit = Audit.objects.select_related('created_by').get(pk=job.audit_id)
+            return Response(AuditSerializer(audit, context={'request': request}).data)
+        if job.status == 'failed':
+            return Response(ChecklistJobSerializer(job).data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(ChecklistJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+@extend_schema(
+    description="Hit/miss counters for the generated checklist cache",
+    responses={200: OpenApiTypes.OBJECT}
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def checklist_cache_stats(request):
+    """Hit/miss counters for the generated checklist cache and coalesced generations"""
+    return Response({**get_checklist_cache().stats(), 'single_flight': get_single_flight().stats()})
+
+@extend_schema(
+    description="Dashboard statistics for the audits the user can see, cached briefly",
+    parameters=[OpenApiParameter('refresh', bool, description="Recompute instead of using the cached statistics")],
+    responses={200: OpenApiTypes.OBJECT}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def audit_stats(request):
+    """Counts by status, industry and complexity, completion rates, scores and recent activity"""
+    refresh = request.query_params.get('refresh', '').lower() in ('1', 'true', 'yes')
+    return Response(get_stats(request.user, refresh=refresh))
+
+@extend_schema(
+    description="Stream the audits the user can see with their checklists as CSV, JSONL or XLSX",
+    parameters=[
+        OpenApiParameter('export_format', str, OpenApiParameter.PATH, enum=list(EXPORT_FORMATS)),
+        OpenApiParameter('audit', int, many=True, description="Only export these audits"),
+        OpenApiParameter('completed', bool, description="Only export completed (or, if false, open) audits"),
+    ],
+    responses={(200, 'application/octet-stream'): OpenApiTypes.BINARY, 400: None}
+)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, ExportRenderer])
+def export_audits(request, export_format):
+    """Stream audits and checklist rows; memory stays constant however many rows there are"""
+    try:
+        check_format(export_format)
+        audit_ids = [int(audit_id) for audit_id in request.query_params.getlist('audit')]
+    except (ExportError, ValueError) as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    audits = visible_audits(request.user)
+    if audit_ids:
+        audits = audits.filter(pk__in=audit_ids)
+    completed = request.query_params.get('completed')
+    if completed is not None:
+        audits = audits.filter(is_completed=completed.lower() in ('1', 'true', 'yes'))
+
+    content_type, extension = EXPORT_FORMATS[export_format]
+    filename = f'audits.{extension}'
+    rows = export_rows(audits)
+    if export_format == 'xlsx':
+        try:
+            return FileResponse(xlsx_file(rows), as_attachment=True, filename=filename, content_type=content_type)
+        except ExportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    lines = csv_lines(rows) if export_format == 'csv' else jsonl_lines(rows)
+    response = StreamingHttpResponse(streaming_content(request, lines), content_type=f'{content_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 # Checklist Management Views
+@extend_schema_view(list=extend_schema(parameters=fields_parameters))
 class ChecklistViewSet(viewsets.ModelViewSet):
     queryset = Checklist.objects.all()
     serializer_class = ChecklistSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ChecklistCursorPagination
 
     def get_queryset(self):
         if self.request.user.is_staff:
             return Checklist.objects.all()
         return Checklist.objects.filter(audit__created_by=self.request.user)
 
+    @extend_schema(
+        description="Tick, untick or annotate many checklist items in one request",
+        request=ChecklistBatchUpdateSerializer,
+        responses={200: ChecklistBatchResultSerializer, 400: None}
+    )
+    @action(detail=False, methods=['patch'], url_path='batch')
+    def batch(self, request):
+        """Apply {id, is_completed, notes} deltas and return the rows and their audits' completion"""
+        serializer = ChecklistBatchUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            rows = apply_checklist_updates(self.get_queryset(), serializer.validated_data['items'])
+        except ChecklistUpdateError as e:
+            return Response({'error': str(e), 'missing_ids': e.missing_ids}, status=status.HTTP_400_BAD_REQUEST)
+
+        audits = Audit.objects.filter(pk__in={row.audit_id for row in rows}).order_by('pk')
+        return Response(ChecklistBatchResultSerializer({'items': rows, 'audits': audits}).data)
+
 # Admin Management Views
 @extend_schema_view(
     validate_token=extend_schema(
         description="Validate an admin invitation token",
         responses={200: AdminInvitationSerializer, 400: None}
+    ),
+    create_bulk=extend_schema(
+        description="Create admin invitations for a list of emails; the emails are sent in the background",
+        request=AdminInvitationBulkCreateSerializer,
+        responses={201: OpenApiTypes.OBJECT, 400: None, 409: None}
     )
 )
 class AdminInvitationViewSet(viewsets.ModelViewSet):
@@ -212,24 +453,30 @@ class AdminInvitationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
 
     def perform_create(self, serializer):
-        invitation = serializer.save(invited_by=self.request.user)
-        
-        # Send invitation email
-        context = {
-            'invitation': invitation,
-            'registration_url': f"{settings.FRONTEND_URL}/register?token={invitation.token}"
-        }
-        html_message = render_to_string('email/admin_invitation.html', context)
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            'Admin Invitation - Audit Checklist System',
-            plain_message,
-            settings.DEFAULT_FROM_EMAIL,
-            [invitation.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+        # The email is queued with the invitation and sent in the background (see outbox.py)
+        with transaction.atomic():
+            invitation = serializer.save(invited_by=self.request.user)
+            queue_emails([invitation_email(invitation)])
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def create_bulk(self, request):
+        """Invite many admins at once; addresses that already have an invitation are skipped"""
+        serializer = AdminInvitationBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        emails = serializer.validated_data['emails']
+
+        existing = set(AdminInvitation.objects.filter(email__in=emails).values_list('email', flat=True))
+        try:
+            invitations = create_invitations([email for email in emails if email not in existing], request.user)
+        except IntegrityError:
+            return Response(
+                {'error': 'Some of these addresses were invited concurrently; retry the request'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response({
+            'created': AdminInvitationSerializer(invitations, many=True).data,
+            'skipped': [email for email in emails if email in existing],
+        }, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['get'])
     def validate_token(self, request):
@@ -8,4 +8,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'audit_checklist.settings')
 
-application = get_asgi_application() 
\ No newline at end of file
+application = get_asgi_application() 
+
+# Resume background work (checklist jobs, queued email) left pending by the previous process
+from audit.apps import start_background_workers  # noqa: E402
+
+start_background_workers()
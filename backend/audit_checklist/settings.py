@@ -1,7 +1,9 @@
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from password_hashers import password_hashers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -84,6 +86,16 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: 'scrypt', 'pbkdf2' or 'argon2' (needs the argon2-cffi package), see password_hashers.py.
+# Passwords stored with another hasher or cost are rehashed on the user's next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='scrypt')
+PASSWORD_HASHERS = password_hashers(PASSWORD_HASHER)
+PASSWORD_SCRYPT_WORK_FACTOR = config('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14, cast=int)
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=720000, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=102400, cast=int)
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=8, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -100,7 +112,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Builds request.user from the token claims instead of a query (see token_auth.py)
+        'token_auth.ClaimsJWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -119,8 +132,15 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Reloads the user, so refreshed access tokens carry current claims (see token_auth.py)
+    'TOKEN_REFRESH_SERIALIZER': 'token_auth.ClaimsTokenRefreshSerializer',
 }
 
+# Revoke a user's tokens when the user is saved or deleted; the revocation time is kept in this cache,
+# so use a shared one (CACHE_BACKEND=redis) with several processes
+JWT_REVOCATION = config('JWT_REVOCATION', default=False, cast=bool)
+JWT_REVOCATION_CACHE_ALIAS = config('JWT_REVOCATION_CACHE_ALIAS', default='default')
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -157,7 +177,8 @@ CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# django.core.mail.backends.locmem.EmailBackend or .console.EmailBackend keep email local during development
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
@@ -165,6 +186,74 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='')
 
+# Email outbox (see audit/outbox.py): 'local' sender thread or 'database' + run_email_sender
+EMAIL_OUTBOX_BROKER = config('EMAIL_OUTBOX_BROKER', default='local')
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
+EMAIL_OUTBOX_POLL_INTERVAL = config('EMAIL_OUTBOX_POLL_INTERVAL', default=30, cast=int)
+
+# Largest number of admin invitations accepted by one bulk request
+ADMIN_INVITATION_BULK_MAX_ITEMS = config('ADMIN_INVITATION_BULK_MAX_ITEMS', default=500, cast=int)
+
+# Checklist generation jobs ('local' thread pool or 'database' + run_checklist_worker)
+CHECKLIST_JOB_BROKER = config('CHECKLIST_JOB_BROKER', default='local')
+CHECKLIST_JOB_WORKERS = config('CHECKLIST_JOB_WORKERS', default=4, cast=int)
+# Seconds before a running job's worker is presumed dead and the job may be claimed again
+CHECKLIST_JOB_CLAIM_TIMEOUT = config('CHECKLIST_JOB_CLAIM_TIMEOUT', default=600, cast=int)
+# Seconds between the local broker's sweeps for jobs no process has queued (0 disables)
+CHECKLIST_JOB_SWEEP_INTERVAL = config('CHECKLIST_JOB_SWEEP_INTERVAL', default=60, cast=int)
+
+# Seconds one checklist LLM call may take, retries included (0 for no limit); keep it below the claim timeout
+CHECKLIST_GENERATION_DEADLINE = config('CHECKLIST_GENERATION_DEADLINE', default=300, cast=int)
+
+# Most audits accepted by one bulk create request
+CHECKLIST_BULK_MAX_ITEMS = config('CHECKLIST_BULK_MAX_ITEMS', default=500, cast=int)
+
+# Largest number of checklist items accepted by one batch PATCH
+CHECKLIST_BATCH_MAX_ITEMS = config('CHECKLIST_BATCH_MAX_ITEMS', default=1000, cast=int)
+
+# Generated checklist cache ('locmem', 'django' or 'sqlite')
+CHECKLIST_CACHE = {
+    'BACKEND': config('CHECKLIST_CACHE_BACKEND', default='locmem'),
+    'ALIAS': config('CHECKLIST_CACHE_ALIAS', default='default'),
+    'LOCATION': config('CHECKLIST_CACHE_LOCATION', default=str(BASE_DIR / 'checklist_cache.sqlite3')),
+    'TTL': config('CHECKLIST_CACHE_TTL', default=60 * 60 * 24 * 7, cast=int),
+    'MAX_ENTRIES': config('CHECKLIST_CACHE_MAX_ENTRIES', default=1000, cast=int),
+}
+
+# Django cache: 'locmem', 'file' or 'redis' (a local Redis such as redis://127.0.0.1:6379/1, needs the redis package)
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_DEFAULTS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'audit-checklist'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(tempfile.gettempdir(), 'audit-checklist-cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_DEFAULTS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_DEFAULTS[CACHE_BACKEND][1]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+# Serialized audit list/retrieve responses (see audit/response_cache.py)
+AUDIT_RESPONSE_CACHE_ALIAS = config('AUDIT_RESPONSE_CACHE_ALIAS', default='default')
+AUDIT_RESPONSE_CACHE_TTL = config('AUDIT_RESPONSE_CACHE_TTL', default=60 * 60, cast=int)
+AUDIT_STATS_CACHE_TTL = config('AUDIT_STATS_CACHE_TTL', default=30, cast=int)
+
+# Lock files that coalesce identical generations across worker processes ('' disables)
+CHECKLIST_LOCK_DIR = config('CHECKLIST_LOCK_DIR', default=os.path.join(tempfile.gettempdir(), 'audit-checklist-locks'))
+
+# Rows fetched per query while streaming exports (see audit/export.py)
+AUDIT_EXPORT_CHUNK_SIZE = config('AUDIT_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Printable audit reports (see reports.py); PDF output needs the xhtml2pdf package.
+# Renders run on REPORT_RENDER_WORKERS threads; requests answer 202 until the file is cached
+REPORT_CACHE_DIR = config('REPORT_CACHE_DIR', default=os.path.join(tempfile.gettempdir(), 'audit-reports'))
+REPORT_CACHE_MAX_FILES = config('REPORT_CACHE_MAX_FILES', default=500, cast=int)
+REPORT_RENDER_WORKERS = config('REPORT_RENDER_WORKERS', default=2, cast=int)
+
 # Frontend URL for email templates
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
 
@@ -3,7 +3,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from audit.views import (
     AuthViewSet, UserViewSet, AuditViewSet, 
-    ChecklistViewSet, AdminInvitationViewSet
+    ChecklistViewSet, ChecklistJobViewSet, AdminInvitationViewSet,
+    checklist_cache_stats, audit_stats, export_audits
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
@@ -56,7 +57,23 @@ urlpatterns = [
             'patch': 'partial_update',
             'delete': 'destroy'
         }), name='audit-detail'),
+        path('list/<int:pk>/report/<str:report_format>/', AuditViewSet.as_view({'get': 'report'}), name='audit-report'),
         path('create/', AuditViewSet.as_view({'post': 'create'}), name='audit-create'),
+        path('create/bulk/', AuditViewSet.as_view({'post': 'create_bulk'}), name='audit-create-bulk'),
+        path('create/stream/', AuditViewSet.as_view({'post': 'create_stream'}, **AuditViewSet.create_stream.kwargs), name='audit-create-stream'),
+        path('jobs/<int:pk>/', ChecklistJobViewSet.as_view({'get': 'retrieve'}), name='checklist-job-detail'),
+        path('jobs/<int:pk>/result/', ChecklistJobViewSet.as_view({'get': 'result'}), name='checklist-job-result'),
+        path('cache/stats/', checklist_cache_stats, name='checklist-cache-stats'),
+        path('stats/', audit_stats, name='audit-stats'),
+        path('export/<str:export_format>/', export_audits, name='audit-export'),
+        path('checklists/', ChecklistViewSet.as_view({'get': 'list', 'post': 'create'}), name='checklist-list'),
+        path('checklists/batch/', ChecklistViewSet.as_view({'patch': 'batch'}), name='checklist-batch'),
+        path('checklists/<int:pk>/', ChecklistViewSet.as_view({
+            'get': 'retrieve',
+            'put': 'update',
+            'patch': 'partial_update',
+            'delete': 'destroy'
+        }), name='checklist-detail'),
     ])),
     
     # Admin management endpoints
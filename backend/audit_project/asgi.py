@@ -12,5 +12,12 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'audit_project.settings')
+# Under ASGI the audit endpoints that wait on the LLM run as async views
+os.environ.setdefault('AUDIT_ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+# Resume background work (e.g. recommendations) left pending by the previous process
+from apps.audits.apps import start_background_workers  # noqa: E402
+
+start_background_workers()
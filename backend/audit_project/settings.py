@@ -11,9 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
+from password_hashers import password_hashers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -66,7 +68,8 @@ ROOT_URLCONF = 'audit_project.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        # Shared templates such as the printable audit report
+        'DIRS': [os.path.join(BASE_DIR, 'audit', 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -117,6 +120,16 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing: 'scrypt', 'pbkdf2' or 'argon2' (needs the argon2-cffi package), see password_hashers.py.
+# Passwords stored with another hasher or cost are rehashed on the user's next login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'scrypt')
+PASSWORD_HASHERS = password_hashers(PASSWORD_HASHER)
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', str(2 ** 14)))
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', '720000'))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', '2'))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', '102400'))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', '8'))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -148,7 +161,8 @@ AUTH_USER_MODEL = 'authentication.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Builds request.user from the token claims instead of a query (see token_auth.py)
+        'token_auth.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -159,8 +173,15 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    # Reloads the user, so refreshed access tokens carry current claims (see token_auth.py)
+    'TOKEN_REFRESH_SERIALIZER': 'token_auth.ClaimsTokenRefreshSerializer',
 }
 
+# Revoke a user's tokens when the user is saved or deleted; the revocation time is kept in this cache,
+# so use a shared one (CACHE_BACKEND=redis) with several processes
+JWT_REVOCATION = os.getenv('JWT_REVOCATION', 'False').lower() == 'true'
+JWT_REVOCATION_CACHE_ALIAS = os.getenv('JWT_REVOCATION_CACHE_ALIAS', 'default')
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -170,6 +191,46 @@ CORS_ALLOWED_ORIGINS = [
 
 # OpenAI API settings
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', 'your-openai-api-key')
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')  # Point at fake_llm_server.py for offline testing
+
+# Background threads that generate audit recommendations
+RECOMMENDATION_WORKERS = int(os.getenv('RECOMMENDATION_WORKERS', '2'))
+# Seconds a result may stay pending before the sweeper queues it again (e.g. lost in a restart)
+RECOMMENDATION_TIMEOUT = int(os.getenv('RECOMMENDATION_TIMEOUT', '600'))
+# Generation starts before a pending result is marked failed
+RECOMMENDATION_MAX_ATTEMPTS = int(os.getenv('RECOMMENDATION_MAX_ATTEMPTS', '3'))
+# Retries of a failed LLM call within one generation, and the base delay doubled between them
+RECOMMENDATION_RETRIES = int(os.getenv('RECOMMENDATION_RETRIES', '2'))
+RECOMMENDATION_RETRY_BACKOFF = float(os.getenv('RECOMMENDATION_RETRY_BACKOFF', '2'))
+# Seconds between sweeps for stale pending results (0 disables)
+RECOMMENDATION_SWEEP_INTERVAL = int(os.getenv('RECOMMENDATION_SWEEP_INTERVAL', '60'))
+
+# Django cache: 'locmem', 'file' or 'redis' (a local Redis such as redis://127.0.0.1:6379/1, needs the redis package)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+CACHE_DEFAULTS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'audit-project'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(tempfile.gettempdir(), 'audit-project-cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_DEFAULTS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('CACHE_LOCATION', CACHE_DEFAULTS[CACHE_BACKEND][1]),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', '300')),
+    }
+}
+
+# Seconds the per-user dashboard statistics are cached
+AUDIT_STATS_CACHE_TTL = int(os.getenv('AUDIT_STATS_CACHE_TTL', '30'))
+
+# Printable audit reports (see reports.py); PDF output needs the xhtml2pdf package.
+# Renders run on REPORT_RENDER_WORKERS threads; requests answer 202 until the file is cached
+REPORT_CACHE_DIR = os.getenv('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'audit-project-reports'))
+REPORT_CACHE_MAX_FILES = int(os.getenv('REPORT_CACHE_MAX_FILES', '500'))
+REPORT_RENDER_WORKERS = int(os.getenv('REPORT_RENDER_WORKERS', '2'))
+
+# Serve create/generate_checklist/submit_responses with async views (enabled by asgi.py)
+AUDIT_ASYNC_VIEWS = os.getenv('AUDIT_ASYNC_VIEWS', 'False').lower() == 'true'
 
 # Security settings for production
 if not DEBUG:
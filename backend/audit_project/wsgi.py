@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'audit_project.settings')
 
 application = get_wsgi_application()
+
+# Resume background work (e.g. recommendations) left pending by the previous process
+from apps.audits.apps import start_background_workers  # noqa: E402
+
+start_background_workers()
@@ -8,23 +8,47 @@ import os
 import json
 import argparse
 from datetime import datetime
-import google.generativeai as genai
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 from dotenv import load_dotenv
+from checklist_schema import parse_checklist
+from llm_client import GeminiProvider, LLMClient, LLMRequest, get_client
+from prompts import PromptTemplate, get_prompt
 
 class AuditChecklistGenerator:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, client: Optional[LLMClient] = None,
+                 prompt: Optional[PromptTemplate] = None):
         """Initialize the Gemini API client"""
-        genai.configure(api_key=api_key)
         # Use Gemini 1.5 Flash which is available on free tier
-        self.model = genai.GenerativeModel('models/gemini-1.5-flash')
+        self.model_name = 'models/gemini-1.5-flash'
+        # The latest checklist prompt unless a pinned version is given
+        self.prompt = prompt or get_prompt('checklist')
+        # Clients are shared per key/model so connections are pooled across generators
+        self.client = client or get_client(
+            GeminiProvider, api_key, self.model_name, os.getenv('GEMINI_BASE_URL')
+        )
     
+    def build_prompt(self, 
+                     audit_type: str, 
+                     organization: str = "", 
+                     industry: str = "", 
+                     specific_requirements: str = "",
+                     complexity_level: str = "intermediate") -> LLMRequest:
+        """Construct the checklist request; the static instructions go in its system part"""
+        return self.prompt.request(
+            audit_type=audit_type,
+            organization=organization if organization else "General Organization",
+            industry=industry if industry else "General",
+            complexity_level=complexity_level,
+            specific_requirements=specific_requirements if specific_requirements else "Standard requirements",
+        )
+
     def generate_checklist(self, 
                           audit_type: str, 
                           organization: str = "", 
                           industry: str = "", 
                           specific_requirements: str = "",
-                          complexity_level: str = "intermediate") -> str:
+                          complexity_level: str = "intermediate",
+                          deadline: Optional[float] = None) -> str:
         """
         Generate an audit checklist based on input parameters
         
@@ -34,49 +58,32 @@ class AuditChecklistGenerator:
             industry: Industry sector (e.g., "Healthcare", "Finance", "Manufacturing")
             specific_requirements: Any specific requirements or focus areas
             complexity_level: "basic", "intermediate", or "advanced"
+            deadline: Seconds the whole call, retries included, may take
         """
         
-        # Construct the prompt
-        prompt = f"""
-Create a comprehensive audit checklist for the following requirements:
-
-**Audit Type:** {audit_type}
-**Organization:** {organization if organization else "General Organization"}
-**Industry:** {industry if industry else "General"}
-**Complexity Level:** {complexity_level}
-**Specific Requirements:** {specific_requirements if specific_requirements else "Standard requirements"}
-
-Please generate a detailed audit checklist with the following format:
-
-Category 1: [Category Name]
-- Question 1
-- Question 2
-- Question 3
-
-Category 2: [Category Name]
-- Question 1
-- Question 2
-- Question 3
-
-And so on...
-
-Requirements:
-1. Use 4-6 main categories relevant to the audit type
-2. Each category should have 5-8 specific questions
-3. Questions should be clear and actionable
-4. Focus on the specific industry and requirements provided
-5. Adjust complexity based on the specified level
-6. Include questions about compliance with relevant laws and regulations
-7. Questions should be specific to the organization type
-
-Do not include any markdown formatting, tables, or additional metadata. Just provide the categories and questions in the format shown above.
-"""
+        request = self.build_prompt(audit_type, organization, industry,
+                                    specific_requirements, complexity_level)
 
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self.client.generate(request, deadline=deadline)
         except Exception as e:
             return f"Error generating checklist: {str(e)}"
+
+    def generate_checklist_stream(self, 
+                                  audit_type: str, 
+                                  organization: str = "", 
+                                  industry: str = "", 
+                                  specific_requirements: str = "",
+                                  complexity_level: str = "intermediate",
+                                  deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Generate an audit checklist, yielding text chunks as Gemini produces them.
+        Takes the same arguments as generate_checklist; errors are raised, not returned.
+        """
+        request = self.build_prompt(audit_type, organization, industry,
+                                    specific_requirements, complexity_level)
+
+        yield from self.client.stream(request, deadline=deadline)
     
     def save_checklist(self, checklist: str, filename: str = None) -> str:
         """Save the generated checklist to a file"""
@@ -156,6 +163,15 @@ def main():
         print(f"❌ {checklist}")
         return
     
+    # The model answers in JSON; show and save the readable text format
+    parsed = parse_checklist(checklist)
+    for diagnostic in parsed.diagnostics:
+        print(f"⚠️  {diagnostic}")
+    if not parsed.question_count:
+        print("❌ The generated output contains no checklist questions")
+        return
+    checklist = parsed.to_text()
+    
     # Display the checklist
     print("\n" + "="*80)
     print("GENERATED AUDIT CHECKLIST")
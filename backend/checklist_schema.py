@@ -0,0 +1,433 @@
+"""
+Shared checklist schema and a tolerant single-pass parser for generated checklists.
+
+Used by the Gemini generator (chat.py, the audit app) and the OpenAI audit
+service (apps/audits/ai_service.py). Both ask the model for JSON matching
+CHECKLIST_JSON_SCHEMA, and ChecklistParser reads whatever comes back:
+
+- JSON, optionally inside a ``` fence or after a line of prose, including
+  truncated documents; questions may be strings or {"question": ...} objects
+- the "Category N: Name" / "- question" text format and its common variants:
+  markdown headings, bold headings, "Name:" lines, numbered, lettered,
+  bulleted and checkbox questions
+
+Chunks can be fed as they stream in and entries are returned as soon as they
+are complete. Input is read once. Anything that is skipped or repaired is
+reported as a Diagnostic instead of being dropped silently. Categories without
+questions are left out.
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+CHECKLIST_JSON_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'categories': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string'},
+                    'description': {'type': 'string'},
+                    'questions': {'type': 'array', 'items': {'type': 'string'}},
+                },
+                'required': ['name', 'questions'],
+            },
+        },
+    },
+    'required': ['categories'],
+}
+
+DEFAULT_CATEGORY = 'General'
+MAX_DIAGNOSTICS = 50
+
+CATEGORY_NAME_KEYS = {'name', 'title', 'category'}
+CATEGORY_QUESTION_KEYS = {'questions', 'items', 'checks'}
+QUESTION_TEXT_KEYS = {'question', 'text', 'item'}
+
+_CATEGORY_LINE = re.compile(
+    r'^(?:#{1,6}\s*)?(?:\*\*|__)?\s*(?:category|section)\s*(?:\d+|[ivx]+|[a-z](?=\s*[:.)\-–—]))?\s*(?:[:.)\-–—]\s*|\s+)(?P<name>.+)$',
+    re.IGNORECASE
+)
+_HEADING_LINE = re.compile(r'^#{1,6}\s+(?P<name>.+?)\s*#*$')
+_BOLD_LINE = re.compile(r'^(?:\*\*|__)(?P<name>[^*_].*?)(?:\*\*|__):?$')
+_QUESTION_LINE = re.compile(
+    r'^(?:[-*+•·–—]\s*|(?:\d{1,3}|[a-zA-Z])[.)]\s+|\(\d{1,3}\)\s+|Q\d{1,3}[:.)]\s*)'
+    r'(?:\[[ xX]?\]\s*)?(?P<text>.+)$'
+)
+_RULE_LINE = re.compile(r'^[-*_=~]{3,}$')
+_STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_LITERAL = re.compile(r'[-+0-9.eEa-zA-Z]+')
+
+
+class ChecklistParseError(Exception):
+    """Raised when generated output contains no usable checklist"""
+
+    def __init__(self, message: str, diagnostics=()):
+        super().__init__(message)
+        self.diagnostics = list(diagnostics)
+
+
+@dataclass
+class Diagnostic:
+    line: int
+    message: str
+    text: str = ''
+
+    def __str__(self):
+        return f"line {self.line}: {self.message}" + (f" ({self.text[:80]!r})" if self.text else '')
+
+
+@dataclass
+class CategoryData:
+    name: str
+    description: str = ''
+    questions: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ChecklistEntry:
+    """One parsed entry in output order: a category heading or one of its questions"""
+    text: str
+    is_category: bool = False
+
+
+@dataclass
+class ParsedChecklist:
+    categories: List[CategoryData] = field(default_factory=list)
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    format: str = ''
+
+    @property
+    def question_count(self) -> int:
+        return sum(len(category.questions) for category in self.categories)
+
+    def entries(self) -> List[ChecklistEntry]:
+        entries = []
+        for category in self.categories:
+            entries.append(ChecklistEntry(category.name, is_category=True))
+            entries.extend(ChecklistEntry(question) for question in category.questions)
+        return entries
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The checklist in CHECKLIST_JSON_SCHEMA form"""
+        return {'categories': [asdict(category) for category in self.categories]}
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), ensure_ascii=False)
+
+    def to_text(self) -> str:
+        """The "Category N: Name" / "- question" text format"""
+        blocks = []
+        for number, category in enumerate(self.categories, start=1):
+            lines = [f"Category {number}: {category.name}"]
+            lines.extend(f"- {question}" for question in category.questions)
+            blocks.append('\n'.join(lines))
+        return '\n\n'.join(blocks) + '\n' if blocks else ''
+
+
+def _clean(text: str) -> str:
+    return ' '.join(text.replace('**', '').replace('__', '').split()).strip(' :')
+
+
+class ChecklistParser:
+    """
+    Incremental, single-pass checklist parser. feed() returns the entries that became
+    complete; close() returns the rest. The full result is in .result afterwards.
+    A category's heading entry is returned together with its first question.
+    """
+
+    def __init__(self):
+        self.result = ParsedChecklist()
+        self.buffer = ''
+        self.mode = None
+        self.line = 1
+        self._current: Optional[CategoryData] = None
+        self._emitted = False
+        self._held: List[str] = []
+        self._out: List[ChecklistEntry] = []
+        # JSON state: a stack of open containers, see _open()
+        self._stack: List[Dict[str, Any]] = []
+        self._json_done = False
+
+    # Shared category bookkeeping
+
+    def _diagnose(self, message: str, text: str = '', line: Optional[int] = None) -> None:
+        if len(self.result.diagnostics) < MAX_DIAGNOSTICS:
+            self.result.diagnostics.append(Diagnostic(line or self.line, message, text.strip()))
+
+    def _start_category(self, name: str) -> None:
+        self._end_category()
+        self._current = CategoryData(name=name)
+        self._emitted = False
+
+    def _end_category(self) -> None:
+        if self._current is not None and not self._emitted:
+            if self._held:
+                self._current.name = self._current.name or f"Category {len(self.result.categories) + 1}"
+                self._diagnose("category without a name", self._current.name)
+                self._emit_held()
+            else:
+                self._diagnose("category without questions was left out", self._current.name or '')
+        self._current = None
+        self._emitted = False
+
+    def _add_question(self, text: str) -> None:
+        text = _clean(text)
+        if not text:
+            self._diagnose("empty question was left out")
+            return
+        if self._current is None:
+            self._diagnose(f"question before any category was put under '{DEFAULT_CATEGORY}'", text)
+            self._start_category(DEFAULT_CATEGORY)
+        self._held.append(text)
+        if self._current.name:
+            self._emit_held()
+
+    def _emit_held(self) -> None:
+        if not self._emitted:
+            self.result.categories.append(self._current)
+            self._out.append(ChecklistEntry(self._current.name, is_category=True))
+            self._emitted = True
+        for question in self._held:
+            self._current.questions.append(question)
+            self._out.append(ChecklistEntry(question))
+        self._held = []
+
+    def _take(self) -> List[ChecklistEntry]:
+        out, self._out = self._out, []
+        return out
+
+    # Feeding
+
+    def feed(self, chunk: str) -> List[ChecklistEntry]:
+        self.buffer += chunk
+        self._run(final=False)
+        return self._take()
+
+    def close(self) -> List[ChecklistEntry]:
+        self._run(final=True)
+        if self.mode == 'json' and not self._json_done and self._stack:
+            self._diagnose("JSON ended before the document was complete (truncated output?)")
+            while self._stack:
+                self._close_container()
+        self._end_category()
+        return self._take()
+
+    def _run(self, final: bool) -> None:
+        while True:
+            if self.mode is None and not self._detect(final):
+                return
+            if self.mode == 'json':
+                self._scan_json(final)
+                return
+            if not self._scan_text(final):
+                return
+
+    def _detect(self, final: bool) -> bool:
+        stripped = self.buffer.lstrip()
+        if not stripped:
+            self.line += self.buffer.count('\n')
+            self.buffer = ''
+            return False
+        if stripped.startswith('`') or stripped.startswith('~'):
+            if '\n' not in stripped and not final:
+                return False
+            # Skip a ``` or ```json fence line and look again
+            if stripped.startswith('```') or stripped.startswith('~~~'):
+                fence_end = self.buffer.find('\n', len(self.buffer) - len(stripped))
+                fence_end = len(self.buffer) if fence_end == -1 else fence_end + 1
+                self.line += self.buffer[:fence_end].count('\n')
+                self.buffer = self.buffer[fence_end:]
+                return self._detect(final)
+        self.mode = 'json' if stripped[0] in '{[' else 'text'
+        self.result.format = self.mode
+        return True
+
+    # Text format
+
+    def _scan_text(self, final: bool) -> bool:
+        """Parse complete lines; True if the parser switched to JSON and should run again"""
+        lines = self.buffer.split('\n')
+        self.buffer = '' if final else lines.pop()
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            # Prose followed by a JSON document: parse the rest as JSON
+            if stripped[:1] in ('{', '[') and not self.result.categories:
+                self._current, self._held = None, []
+                self.mode, self.result.format = 'json', 'json'
+                self.buffer = '\n'.join(lines[index:]) + ('' if final else '\n' + self.buffer)
+                return True
+            self._text_line(stripped)
+            self.line += 1
+        return False
+
+    def _text_line(self, line: str) -> None:
+        if not line or line.startswith('```') or line.startswith('~~~') or _RULE_LINE.match(line):
+            return
+        match = _CATEGORY_LINE.match(line) or _HEADING_LINE.match(line) or _BOLD_LINE.match(line)
+        if match and _clean(match.group('name')):
+            self._start_category(_clean(match.group('name')))
+            return
+        match = _QUESTION_LINE.match(line)
+        if match:
+            self._add_question(match.group('text'))
+            return
+        if line.endswith(':'):
+            self._start_category(_clean(line))
+        elif line.endswith('?') and self._current is not None:
+            self._diagnose("question without a bullet was accepted", line)
+            self._add_question(line)
+        else:
+            self._diagnose("unrecognized line was skipped", line)
+
+    # JSON format
+
+    def _open(self, kind: str) -> None:
+        parent = self._stack[-1] if self._stack else None
+        key = parent['key'] if parent and parent['kind'] == 'object' else None
+        parent_role = parent['role'] if parent else None
+
+        if parent is None:
+            role = 'categories' if kind == 'array' else 'root'
+        elif kind == 'array' and key == 'categories':
+            role = 'categories'
+        elif parent_role == 'categories' and kind == 'object':
+            role = 'category'
+        elif parent_role == 'category' and kind == 'array' and key in CATEGORY_QUESTION_KEYS:
+            role = 'questions'
+        elif parent_role == 'questions' and kind == 'object':
+            role = 'question'
+        elif parent_role in ('root', 'other') and kind == 'object':
+            role = 'other'
+        else:
+            role = 'ignored'
+
+        if role == 'category':
+            self._start_category('')
+        self._stack.append({'kind': kind, 'role': role, 'key': None, 'expect_key': kind == 'object'})
+
+    def _close_container(self) -> None:
+        frame = self._stack.pop()
+        if frame['role'] == 'category':
+            self._end_category()
+        if not self._stack:
+            self._json_done = True
+        else:
+            self._after_value()
+
+    def _after_value(self) -> None:
+        parent = self._stack[-1]
+        if parent['kind'] == 'object':
+            parent['key'] = None
+
+    def _string(self, value: str) -> None:
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            return
+        if frame['kind'] == 'object' and frame['expect_key']:
+            frame['key'] = value.strip().lower()
+            frame['expect_key'] = False
+            return
+
+        role, key = frame['role'], frame['key']
+        if role == 'category' and key in CATEGORY_NAME_KEYS and self._current is not None:
+            if not self._current.name:
+                self._current.name = _clean(value)
+                if self._held and self._current.name:
+                    self._emit_held()
+        elif role == 'category' and key == 'description' and self._current is not None:
+            self._current.description = value.strip()
+        elif role == 'questions':
+            self._add_question(value)
+        elif role == 'question' and key in QUESTION_TEXT_KEYS:
+            self._add_question(value)
+        self._after_value()
+
+    def _scan_json(self, final: bool) -> None:
+        buffer, pos, size = self.buffer, 0, len(self.buffer)
+        while pos < size:
+            char = buffer[pos]
+            if char in ' \t\r\n':
+                if char == '\n':
+                    self.line += 1
+                pos += 1
+            elif self._json_done:
+                rest = buffer[pos:].strip().strip('`~').strip()
+                if rest:
+                    self._diagnose("text after the JSON document was ignored", rest)
+                self.line += buffer.count('\n', pos)
+                pos = size
+            elif char == '"':
+                match = _STRING_BODY.match(buffer, pos + 1)
+                if match is None:
+                    if final:
+                        self._diagnose("unterminated string was left out", buffer[pos:])
+                        pos = size
+                    break
+                raw = buffer[pos:match.end()]
+                try:
+                    value = json.loads(raw, strict=False)
+                except ValueError:
+                    self._diagnose("invalid escape in string", raw)
+                    value = raw[1:-1]
+                self._string(value)
+                self.line += raw.count('\n')
+                pos = match.end()
+            elif char in '{[':
+                self._open('object' if char == '{' else 'array')
+                pos += 1
+            elif char in '}]':
+                if self._stack:
+                    self._close_container()
+                else:
+                    self._diagnose(f"unexpected '{char}' was skipped")
+                pos += 1
+            elif char == ':':
+                pos += 1
+            elif char == ',':
+                if self._stack and self._stack[-1]['kind'] == 'object':
+                    self._stack[-1]['expect_key'] = True
+                pos += 1
+            else:
+                match = _LITERAL.match(buffer, pos)
+                if match is None:
+                    self._diagnose(f"unexpected '{char}' was skipped")
+                    pos += 1
+                elif match.end() == size and not final:
+                    break  # The literal may continue in the next chunk
+                else:
+                    if self._stack:
+                        self._after_value()
+                    pos = match.end()
+        self.buffer = buffer[pos:]
+
+
+def parse_checklist(text: str) -> ParsedChecklist:
+    """Parse a complete generated checklist"""
+    parser = ChecklistParser()
+    parser.feed(text)
+    parser.close()
+    return parser.result
+
+
+def parse_checklist_stream(chunks: Iterable[str]) -> ParsedChecklist:
+    parser = ChecklistParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    return parser.result
+
+
+def require_questions(parsed: ParsedChecklist) -> ParsedChecklist:
+    """Return parsed if it has at least one question, else raise ChecklistParseError"""
+    if not parsed.question_count:
+        details = '; '.join(str(diagnostic) for diagnostic in parsed.diagnostics[:5])
+        raise ChecklistParseError(
+            "Generated output contains no checklist questions" + (f": {details}" if details else ''),
+            parsed.diagnostics
+        )
+    return parsed
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Local fake LLM server for offline development and load tests
+Speaks just enough of the Gemini and OpenAI HTTP APIs for llm_client.py,
+including Server-Sent Events streaming.
+
+Usage:
+    python fake_llm_server.py --port 8765 --delay 2
+    GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python manage.py runserver
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHECKLIST = """Category 1: Governance
+- Is there a documented policy approved by management?
+- Are roles and responsibilities clearly assigned?
+- Is the policy reviewed at least annually?
+
+Category 2: Operations
+- Are procedures documented and followed?
+- Are exceptions logged and reviewed?
+- Is staff trained on the procedures?
+
+Category 3: Compliance
+- Are applicable laws and regulations identified?
+- Is compliance monitored and reported?
+- Are findings from previous audits remediated?
+"""
+
+
+def checklist_json(text: str) -> str:
+    """CHECKLIST in the JSON shape requested by JSON mode, one value per line so it streams in pieces"""
+    categories = []
+    for line in text.splitlines():
+        if line.startswith('Category'):
+            categories.append({'name': line.split(':', 1)[1].strip(), 'description': '', 'questions': []})
+        elif line.startswith('-'):
+            categories[-1]['questions'].append(line[1:].strip())
+    return json.dumps({'categories': categories}, indent=2)
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+    chunk_delay = 0.05
+    fail_rate = 0.0
+    # Answer this many upcoming requests with 503, for deterministic retry tests
+    fail_next = 0
+    requests = 0
+    _lock = threading.Lock()
+    response_text = CHECKLIST
+    json_text = checklist_json(CHECKLIST)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        with self._lock:
+            type(self).requests += 1
+            fail = self.fail_next > 0
+            if fail:
+                type(self).fail_next -= 1
+        if fail or random.random() < self.fail_rate:
+            self.send_json({'error': 'overloaded'}, status=503)
+            return
+
+        # JSON mode as requested by llm_client for OpenAI and Gemini
+        wants_json = (
+            (body.get('response_format') or {}).get('type') == 'json_object'
+            or (body.get('generationConfig') or {}).get('responseMimeType') == 'application/json'
+        )
+        text = self.json_text if wants_json else self.response_text
+
+        if self.path.startswith('/v1/chat/completions'):
+            self.handle_openai(body, text)
+        elif ':streamGenerateContent' in self.path:
+            self.handle_stream(text, lambda chunk: {'candidates': [{'content': {'parts': [{'text': chunk}]}}]})
+        elif ':generateContent' in self.path:
+            time.sleep(self.delay)
+            self.send_json({'candidates': [{'content': {'parts': [{'text': text}]}}]})
+        else:
+            self.send_json({'error': 'not found'}, status=404)
+
+    def handle_openai(self, body, text):
+        if body.get('stream'):
+            self.handle_stream(text, lambda chunk: {'choices': [{'delta': {'content': chunk}}]}, done_marker=True)
+            return
+        time.sleep(self.delay)
+        self.send_json({'choices': [{'message': {'role': 'assistant', 'content': text}}]})
+
+    def handle_stream(self, text, event, done_marker=False):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        # Time to first token is a fraction of the full delay, like a real model
+        time.sleep(self.delay / 10)
+        for line in text.splitlines(keepends=True):
+            self.wfile.write(f"data: {json.dumps(event(line))}\n\n".encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(self.chunk_delay)
+        if done_marker:
+            self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def send_json(self, data, status=200):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 serializes connection bursts during load tests
+    request_queue_size = 128
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-response, which is expected here
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a fake Gemini/OpenAI server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=1.0, help='Seconds before a full response is returned')
+    parser.add_argument('--chunk-delay', type=float, default=0.05, help='Seconds between streamed chunks')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    FakeLLMHandler.delay = args.delay
+    FakeLLMHandler.chunk_delay = args.chunk_delay
+    FakeLLMHandler.fail_rate = args.fail_rate
+
+    server = FakeLLMServer((args.host, args.port), FakeLLMHandler)
+    print(f"Fake LLM server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
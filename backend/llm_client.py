@@ -0,0 +1,515 @@
+"""
+Provider-agnostic LLM client
+Shared by the Gemini checklist generator (chat.py) and the OpenAI audit
+service (apps/audits/ai_service.py).
+
+- one pooled HTTP transport per client, reused across calls
+- a per-provider cap on concurrent calls, shared by every client in the process, sync and async
+- per-attempt timeouts bounded by an overall deadline
+- retries with jittered exponential backoff on rate limits, 5xx and transport errors
+- sync (generate/stream) and async (agenerate/astream) facades
+
+Base URLs can be pointed at a local fake server (see fake_llm_server.py).
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+import httpx
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when a provider call fails after all retries"""
+
+
+class LLMTimeoutError(LLMError):
+    """Raised when a call cannot finish before its deadline"""
+
+
+@dataclass
+class LLMRequest:
+    prompt: str
+    system: str = ""
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    # Ask for a JSON response; providers that support it also get the schema
+    json_schema: Optional[Dict] = None
+
+
+class ProviderStats:
+    """In-flight and completed call counters for one provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def failed(self):
+        with self._lock:
+            self.failures += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+            }
+
+
+class Provider:
+    """Knows how to build requests for, and read responses from, one LLM API"""
+    name = ""
+    default_base_url = ""
+
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = (base_url or self.default_base_url).rstrip('/')
+
+    def build(self, request: LLMRequest, stream: bool) -> Tuple[str, Dict[str, str], Dict]:
+        """Return (url, headers, json body) for a call"""
+        raise NotImplementedError
+
+    def parse(self, data: Dict) -> str:
+        """Extract the generated text from a complete response body"""
+        raise NotImplementedError
+
+    def parse_stream_event(self, data: Dict) -> str:
+        """Extract the text delta from one streamed event"""
+        raise NotImplementedError
+
+
+def _gemini_schema(schema: Dict) -> Dict:
+    """Gemini takes an OpenAPI-style schema whose type names are upper case"""
+    converted = {}
+    for key, value in schema.items():
+        if key == "type":
+            converted[key] = value.upper()
+        elif key == "properties":
+            converted[key] = {name: _gemini_schema(prop) for name, prop in value.items()}
+        elif key == "items":
+            converted[key] = _gemini_schema(value)
+        else:
+            converted[key] = value
+    return converted
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+    default_base_url = "https://generativelanguage.googleapis.com/v1beta"
+
+    def build(self, request, stream):
+        method = "streamGenerateContent?alt=sse" if stream else "generateContent"
+        model = self.model if self.model.startswith("models/") else f"models/{self.model}"
+        body = {"contents": [{"role": "user", "parts": [{"text": request.prompt}]}]}
+        if request.system:
+            body["systemInstruction"] = {"parts": [{"text": request.system}]}
+        generation_config = {}
+        if request.max_tokens is not None:
+            generation_config["maxOutputTokens"] = request.max_tokens
+        if request.temperature is not None:
+            generation_config["temperature"] = request.temperature
+        if request.json_schema is not None:
+            generation_config["responseMimeType"] = "application/json"
+            generation_config["responseSchema"] = _gemini_schema(request.json_schema)
+        if generation_config:
+            body["generationConfig"] = generation_config
+        return f"{self.base_url}/{model}:{method}", {"x-goog-api-key": self.api_key}, body
+
+    def parse(self, data):
+        return self.parse_stream_event(data)
+
+    def parse_stream_event(self, data):
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+    default_base_url = "https://api.openai.com/v1"
+
+    def build(self, request, stream):
+        messages = []
+        if request.system:
+            messages.append({"role": "system", "content": request.system})
+        messages.append({"role": "user", "content": request.prompt})
+        body = {"model": self.model, "messages": messages}
+        if request.max_tokens is not None:
+            body["max_tokens"] = request.max_tokens
+        if request.temperature is not None:
+            body["temperature"] = request.temperature
+        if request.json_schema is not None:
+            # JSON mode works on every chat model; the schema itself is described in the prompt
+            body["response_format"] = {"type": "json_object"}
+        if stream:
+            body["stream"] = True
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        return f"{self.base_url}/chat/completions", headers, body
+
+    def parse(self, data):
+        return data["choices"][0]["message"]["content"] or ""
+
+    def parse_stream_event(self, data):
+        choices = data.get("choices") or []
+        if not choices:
+            return ""
+        return choices[0].get("delta", {}).get("content") or ""
+
+
+class ProviderLimit:
+    """
+    A cap on concurrent calls shared by sync and async callers. Threads block on
+    a condition; coroutines poll instead so they never block the event loop.
+    """
+    poll_interval = 0.01
+    max_poll_interval = 0.1
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_use >= self.limit:
+                return False
+            self.in_use += 1
+            return True
+
+    def acquire(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self.in_use < self.limit)
+            self.in_use += 1
+
+    async def aacquire(self):
+        delay = self.poll_interval
+        while not self.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+
+    def release(self):
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+# Concurrency limits are per provider, not per client, so every caller in the process,
+# sync or async, shares them
+_limits: Dict[str, ProviderLimit] = {}
+_stats: Dict[str, ProviderStats] = {}
+_registry_lock = threading.Lock()
+
+
+def provider_stats(provider_name: str) -> ProviderStats:
+    with _registry_lock:
+        return _stats.setdefault(provider_name, ProviderStats())
+
+
+def provider_limit(provider_name: str, limit: int) -> ProviderLimit:
+    with _registry_lock:
+        return _limits.setdefault(provider_name, ProviderLimit(limit))
+
+
+def _iter_sse_data(lines) -> Iterator[Dict]:
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+        payload = line[len("data:"):].strip()
+        if not payload or payload == "[DONE]":
+            continue
+        try:
+            yield json.loads(payload)
+        except ValueError as e:
+            raise LLMError(f"Unreadable stream event: {payload[:100]!r}") from e
+
+
+class LLMClient:
+    def __init__(self,
+                 provider: Provider,
+                 timeout: float = 60.0,
+                 connect_timeout: float = 10.0,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 max_concurrency: int = 8,
+                 max_connections: int = 20):
+        self.provider = provider
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency = max_concurrency
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        self.stats = provider_stats(provider.name)
+        self._http = httpx.Client(limits=self.limits, timeout=self._timeout(timeout))
+        self._async_http = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls, provider: Provider) -> "LLMClient":
+        """Build a client whose limits come from LLM_* environment variables"""
+        return cls(
+            provider,
+            timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", "3")),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+        )
+
+    def _timeout(self, seconds: float) -> httpx.Timeout:
+        return httpx.Timeout(seconds, connect=min(self.connect_timeout, seconds))
+
+    def _remaining(self, deadline: Optional[float]) -> float:
+        """Per-attempt timeout: the client timeout, cut short by the overall deadline"""
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise LLMTimeoutError(f"{self.provider.name} call exceeded its deadline")
+        return min(self.timeout, remaining)
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter keeps retries from many workers from lining up
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _should_retry(self, attempt: int, error: Exception) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRY_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
+
+    def _deadline(self, deadline: Optional[float]) -> Optional[float]:
+        return time.monotonic() + deadline if deadline is not None else None
+
+    def _sleep_before_retry(self, attempt, error, deadline):
+        response = error.response if isinstance(error, httpx.HTTPStatusError) else None
+        delay = self._backoff(attempt, response)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            raise LLMTimeoutError(f"{self.provider.name} call exceeded its deadline") from error
+        self.stats.retried()
+        return delay
+
+    def _parse(self, response: httpx.Response) -> str:
+        try:
+            return self.provider.parse(response.json())
+        except (ValueError, LookupError, TypeError, AttributeError) as e:
+            raise LLMError(f"{self.provider.name} returned an unreadable response: {e}") from e
+
+    def _parse_event(self, data) -> str:
+        try:
+            return self.provider.parse_stream_event(data)
+        except (LookupError, TypeError, AttributeError) as e:
+            raise LLMError(f"{self.provider.name} returned an unreadable stream event: {e}") from e
+
+    # Sync facade
+
+    def generate(self, request: LLMRequest, deadline: Optional[float] = None) -> str:
+        """Return the full completion; deadline is the overall time budget in seconds"""
+        deadline = self._deadline(deadline)
+        url, headers, body = self.provider.build(request, stream=False)
+        with provider_limit(self.provider.name, self.max_concurrency):
+            self.stats.started()
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        response = self._http.post(
+                            url, headers=headers, json=body,
+                            timeout=self._timeout(self._remaining(deadline))
+                        )
+                        response.raise_for_status()
+                        return self._parse(response)
+                    except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                        if not self._should_retry(attempt, e):
+                            raise LLMError(f"{self.provider.name} call failed: {e}") from e
+                        time.sleep(self._sleep_before_retry(attempt, e, deadline))
+                        attempt += 1
+            except LLMError:
+                self.stats.failed()
+                raise
+            finally:
+                self.stats.finished()
+
+    def stream(self, request: LLMRequest, deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Yield text deltas as the provider produces them. Connecting is retried;
+        once text has been yielded a failure is raised rather than replayed.
+        """
+        deadline = self._deadline(deadline)
+        url, headers, body = self.provider.build(request, stream=True)
+        with provider_limit(self.provider.name, self.max_concurrency):
+            self.stats.started()
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        with self._http.stream(
+                            "POST", url, headers=headers, json=body,
+                            timeout=self._timeout(self._remaining(deadline))
+                        ) as response:
+                            response.raise_for_status()
+                            for data in _iter_sse_data(response.iter_lines()):
+                                text = self._parse_event(data)
+                                if text:
+                                    attempt = self.max_retries  # Never retry after output has started
+                                    yield text
+                        return
+                    except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                        if not self._should_retry(attempt, e):
+                            raise LLMError(f"{self.provider.name} stream failed: {e}") from e
+                        time.sleep(self._sleep_before_retry(attempt, e, deadline))
+                        attempt += 1
+            except LLMError:
+                self.stats.failed()
+                raise
+            finally:
+                self.stats.finished()
+
+    # Async facade
+
+    def _get_async_http(self) -> httpx.AsyncClient:
+        # An AsyncClient is bound to the event loop it was first used on
+        loop = asyncio.get_running_loop()
+        client = self._async_http.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self._timeout(self.timeout))
+            self._async_http[loop] = client
+        return client
+
+    async def agenerate(self, request: LLMRequest, deadline: Optional[float] = None) -> str:
+        """Async version of generate()"""
+        deadline = self._deadline(deadline)
+        url, headers, body = self.provider.build(request, stream=False)
+        http = self._get_async_http()
+
+        async with provider_limit(self.provider.name, self.max_concurrency):
+            self.stats.started()
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        response = await http.post(
+                            url, headers=headers, json=body,
+                            timeout=self._timeout(self._remaining(deadline))
+                        )
+                        response.raise_for_status()
+                        return self._parse(response)
+                    except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                        if not self._should_retry(attempt, e):
+                            raise LLMError(f"{self.provider.name} call failed: {e}") from e
+                        await asyncio.sleep(self._sleep_before_retry(attempt, e, deadline))
+                        attempt += 1
+            except LLMError:
+                self.stats.failed()
+                raise
+            finally:
+                self.stats.finished()
+
+    async def astream(self, request: LLMRequest, deadline: Optional[float] = None) -> AsyncIterator[str]:
+        """Async version of stream()"""
+        deadline = self._deadline(deadline)
+        url, headers, body = self.provider.build(request, stream=True)
+        http = self._get_async_http()
+
+        async with provider_limit(self.provider.name, self.max_concurrency):
+            self.stats.started()
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        async with http.stream(
+                            "POST", url, headers=headers, json=body,
+                            timeout=self._timeout(self._remaining(deadline))
+                        ) as response:
+                            response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                for data in _iter_sse_data([line]):
+                                    text = self._parse_event(data)
+                                    if text:
+                                        attempt = self.max_retries
+                                        yield text
+                        return
+                    except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                        if not self._should_retry(attempt, e):
+                            raise LLMError(f"{self.provider.name} stream failed: {e}") from e
+                        await asyncio.sleep(self._sleep_before_retry(attempt, e, deadline))
+                        attempt += 1
+            except LLMError:
+                self.stats.failed()
+                raise
+            finally:
+                self.stats.finished()
+
+    def close(self):
+        self._http.close()
+
+
+_clients: Dict[Tuple, LLMClient] = {}
+
+
+def get_client(provider_class, api_key: str, model: str, base_url: Optional[str] = None) -> LLMClient:
+    """Return a process-wide client for a provider/model so connections are pooled across callers"""
+    key = (provider_class, api_key, model, base_url)
+    with _registry_lock:
+        client = _clients.get(key)
+    if client is None:
+        client = LLMClient.from_env(provider_class(api_key, model, base_url))
+        with _registry_lock:
+            client = _clients.setdefault(key, client)
+    return client
@@ -0,0 +1,72 @@
+"""
+Password hashers whose cost comes from settings, for both Django projects.
+
+PASSWORD_HASHER picks the hasher new passwords use: 'pbkdf2' (Django's
+default, CPU-bound), 'scrypt' (memory-hard, in the standard library) or
+'argon2' (memory-hard, needs the argon2-cffi package). The others stay
+listed so existing hashes keep verifying. On a successful login Django
+rehashes the password when its algorithm or cost differs from the preferred
+one (User.check_password saves the new hash), so switching hashers or tuning
+a cost setting migrates users as they log in.
+
+The subclasses keep Django's algorithm names, so hashes they write are
+ordinary Django hashes.
+"""
+
+import importlib.util
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    # n = 2 ** work factor; memory per hash is about 128 * n * block_size bytes (16 MiB by default)
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', hashers.ScryptPasswordHasher.work_factor)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_ARGON2_TIME_COST', hashers.Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        # KiB per hash
+        return getattr(settings, 'PASSWORD_ARGON2_MEMORY_COST', hashers.Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', hashers.Argon2PasswordHasher.parallelism)
+
+
+HASHERS = {
+    'pbkdf2': 'password_hashers.PBKDF2PasswordHasher',
+    'scrypt': 'password_hashers.ScryptPasswordHasher',
+    'argon2': 'password_hashers.Argon2PasswordHasher',
+}
+
+
+def password_hashers(preferred: str):
+    """
+    PASSWORD_HASHERS with the preferred hasher first. argon2 falls back to scrypt
+    when argon2-cffi is not installed, and is then left out of the list.
+    """
+    if preferred not in HASHERS:
+        raise ValueError(f"Unknown PASSWORD_HASHER '{preferred}', expected one of {', '.join(HASHERS)}")
+    available = [name for name in HASHERS if name != 'argon2' or importlib.util.find_spec('argon2')]
+    if preferred not in available:
+        preferred = 'scrypt'
+    ordered = [preferred] + [name for name in available if name != preferred]
+    # The rest of Django's default list, so hashes imported from elsewhere keep verifying
+    return [HASHERS[name] for name in ordered] + [
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    ]
@@ -0,0 +1,230 @@
+"""
+Versioned prompt templates for the checklist and recommendation prompts.
+
+Used by the Gemini generator (chat.py, the audit app) and the OpenAI audit
+service (apps/audits/ai_service.py). Each prompt is split in two:
+
+- ``system``: the static instructions, identical on every call. It is sent
+  first (as the system instruction/message), so providers that cache prompt
+  prefixes (OpenAI automatically, Gemini via implicit or explicit context
+  caching) can reuse it across calls
+- ``template``: the per-call part, in str.format syntax with plain field names
+
+Templates are parsed once when they are registered; rendering only joins the
+pieces. A template is identified by its tag (``name@version``), which is
+recorded on generated audits, and its fingerprint (a hash of its content),
+which goes into cache keys so an edited prompt never serves stale output.
+Bump the version whenever the wording changes.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from dataclasses import dataclass, field
+from string import Formatter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from checklist_schema import CHECKLIST_JSON_SCHEMA
+from llm_client import LLMRequest
+
+# Rough size of a token in English text, for estimates without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+class PromptError(Exception):
+    """Raised for unknown prompts and for missing or unexpected template values"""
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+@dataclass
+class PromptSize:
+    """Estimated tokens of a rendered prompt; system is the cacheable static prefix"""
+    system: int
+    prompt: int
+
+    @property
+    def total(self) -> int:
+        return self.system + self.prompt
+
+
+@dataclass
+class PromptTemplate:
+    name: str
+    version: int
+    system: str
+    template: str
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    json_schema: Optional[Dict] = None
+    fields: FrozenSet[str] = field(init=False)
+    fingerprint: str = field(init=False)
+    _parts: Tuple[Tuple[str, Optional[str], str], ...] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        parts = []
+        for literal, name, format_spec, conversion in Formatter().parse(self.template):
+            if name is not None and (not name.isidentifier() or conversion):
+                raise ValueError(f"Prompt {self.tag}: unsupported placeholder {{{name}}}")
+            parts.append((literal, name, format_spec or ''))
+        self._parts = tuple(parts)
+        self.fields = frozenset(name for _, name, _ in parts if name)
+        content = json.dumps([self.system, self.template, self.max_tokens, self.temperature, self.json_schema],
+                             sort_keys=True)
+        self.fingerprint = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+
+    @property
+    def tag(self) -> str:
+        """What generated audits record, e.g. "checklist@1" """
+        return f'{self.name}@{self.version}'
+
+    @property
+    def cache_key(self) -> str:
+        """Tag plus content hash, for cache keys of generated output"""
+        return f'{self.tag}:{self.fingerprint}'
+
+    def render(self, **values) -> str:
+        """The per-call part of the prompt"""
+        if values.keys() != self.fields:
+            missing = ', '.join(sorted(self.fields - values.keys()))
+            unexpected = ', '.join(sorted(values.keys() - self.fields))
+            raise PromptError(f"Prompt {self.tag}: missing values [{missing}], unexpected values [{unexpected}]")
+        pieces = []
+        for literal, name, format_spec in self._parts:
+            pieces.append(literal)
+            if name is not None:
+                pieces.append(format(values[name], format_spec))
+        return ''.join(pieces)
+
+    def request(self, **values) -> LLMRequest:
+        return LLMRequest(
+            prompt=self.render(**values),
+            system=self.system,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            json_schema=self.json_schema,
+        )
+
+    def estimate(self, **values) -> PromptSize:
+        return PromptSize(system=estimate_tokens(self.system), prompt=estimate_tokens(self.render(**values)))
+
+
+_registry: Dict[str, Dict[int, PromptTemplate]] = {}
+_registry_lock = threading.Lock()
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    """Add a template; re-registering a tag with different content is an error"""
+    with _registry_lock:
+        versions = _registry.setdefault(template.name, {})
+        existing = versions.get(template.version)
+        if existing is not None and existing.fingerprint != template.fingerprint:
+            raise ValueError(f"Prompt {template.tag} is already registered with different content")
+        versions[template.version] = template
+    return template
+
+
+def get_prompt(name: str, version: Optional[int] = None) -> PromptTemplate:
+    """A registered template; the latest version unless one is given"""
+    versions = _registry.get(name)
+    if not versions:
+        raise PromptError(f"Unknown prompt '{name}'")
+    if version is None:
+        version = max(versions)
+    if version not in versions:
+        raise PromptError(f"Unknown prompt version {name}@{version}")
+    return versions[version]
+
+
+def registered_prompts() -> List[PromptTemplate]:
+    return [template for _, versions in sorted(_registry.items()) for _, template in sorted(versions.items())]
+
+
+# Gemini checklist generator (chat.py and the audit app)
+CHECKLIST_PROMPT = register(PromptTemplate(
+    name='checklist',
+    version=1,
+    system="""You are an expert auditor who creates comprehensive audit checklists.
+
+Generate a detailed audit checklist as a JSON object with this structure:
+
+{"categories": [{"name": "Category name", "description": "One sentence", "questions": ["Question 1", "Question 2"]}]}
+
+Requirements:
+1. Use 4-6 main categories relevant to the audit type
+2. Each category should have 5-8 specific questions
+3. Questions should be clear and actionable
+4. Focus on the specific industry and requirements provided
+5. Adjust complexity based on the specified level
+6. Include questions about compliance with relevant laws and regulations
+7. Questions should be specific to the organization type
+
+Return only the JSON object, without markdown formatting or additional text.""",
+    template="""Create a comprehensive audit checklist for the following requirements:
+
+**Audit Type:** {audit_type}
+**Organization:** {organization}
+**Industry:** {industry}
+**Complexity Level:** {complexity_level}
+**Specific Requirements:** {specific_requirements}
+""",
+    json_schema=CHECKLIST_JSON_SCHEMA,
+))
+
+# OpenAI checklist for apps.audits
+AUDIT_CHECKLIST_PROMPT = register(PromptTemplate(
+    name='audit-checklist',
+    version=1,
+    system="""You are an expert auditor. Generate comprehensive audit checklists in JSON format.
+
+Create 5-7 categories with 5-8 questions each. Return as JSON with this structure:
+{
+    "categories": [
+        {
+            "name": "Category Name",
+            "description": "Category description",
+            "questions": [
+                "Question 1 text",
+                "Question 2 text"
+            ]
+        }
+    ]
+}""",
+    template="""Generate a comprehensive audit checklist for the following company:
+- Company: {company_name}
+- Industry: {industry}
+- Standard: {standard}
+- Size: {company_size}
+- Country: {country}
+
+Focus on {standard} compliance requirements for {industry} industry.
+""",
+    max_tokens=2000,
+    temperature=0.7,
+    json_schema=CHECKLIST_JSON_SCHEMA,
+))
+
+# OpenAI recommendations for completed apps.audits audits
+RECOMMENDATIONS_PROMPT = register(PromptTemplate(
+    name='audit-recommendations',
+    version=1,
+    system="""You are an expert compliance consultant. Provide specific, actionable recommendations.
+
+Given an audit's scores by category, recommend how to improve compliance. Focus on:
+1. Areas with scores below 7
+2. Industry-specific best practices
+3. Requirements of the audited standard
+4. Priority actions (immediate vs long-term)
+
+Format as clear, numbered recommendations.""",
+    template="""Based on the audit results for {company_name} ({industry} industry, {standard} standard):
+
+Scores by category:
+{scores}
+""",
+    max_tokens=1500,
+    temperature=0.7,
+))
@@ -0,0 +1,64 @@
+"""
+EXPLAIN-based checks that hot queries are served by indexes.
+
+Used by the check_query_plans management commands of both Django projects.
+Understands SQLite's EXPLAIN QUERY PLAN and PostgreSQL's EXPLAIN output.
+On PostgreSQL sequential scans are disabled for the check, because the
+planner rightly prefers them on the small tables of a fresh database.
+"""
+
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import List
+
+from django.db import connection
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    table: str
+    plan: str
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+@contextmanager
+def index_friendly_planner():
+    """Ask PostgreSQL to pick an index whenever one applies; a no-op elsewhere"""
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    yield
+
+
+def check_plan(name: str, queryset, sorted_by_index: bool = False) -> PlanCheck:
+    """
+    EXPLAIN queryset and report full scans of its main table, and sorts that the
+    index should have served when sorted_by_index is set.
+    """
+    table = queryset.model._meta.db_table
+    plan = queryset.explain()
+    check = PlanCheck(name=name, table=table, plan=plan)
+
+    if connection.vendor == 'sqlite':
+        # e.g. "SCAN audit_audit" vs "SEARCH audit_audit USING INDEX ..."
+        for line in plan.splitlines():
+            if re.search(rf'\bSCAN {re.escape(table)}\b', line) and 'USING' not in line:
+                check.problems.append(f'full scan of {table}')
+        if sorted_by_index and 'TEMP B-TREE FOR ORDER BY' in plan:
+            check.problems.append('ORDER BY is not served by an index')
+    elif connection.vendor == 'postgresql':
+        if re.search(rf'Seq Scan on {re.escape(table)}\b', plan):
+            check.problems.append(f'sequential scan of {table}')
+        if sorted_by_index and re.search(r'^\s*(->\s*)?(Incremental )?Sort\b', plan, re.MULTILINE):
+            check.problems.append('ORDER BY is not served by an index')
+    else:
+        check.problems.append(f'no plan checks for {connection.vendor}')
+    return check
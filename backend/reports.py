@@ -0,0 +1,201 @@
+"""
+Printable audit reports rendered from Django templates to HTML or PDF.
+
+Used by the report endpoints of both Django projects. A report is keyed by a
+hash of its template source, its context and the output format, and the
+rendered file is kept in REPORT_CACHE_DIR, so downloading an unchanged report
+again is served from disk without rendering. Renders run on a small thread
+pool (REPORT_RENDER_WORKERS), which bounds how many run at once, and concurrent
+requests for the same report share one render. Requests never wait for a
+render: until the file is on disk the endpoints answer 202 with a Location to
+poll, and a failed render is reported to the next poll. PDF output needs the
+xhtml2pdf package; HTML works without it.
+
+Reports are returned as open files rather than paths: pruning may remove any
+cached file, and a file that is already open stays readable.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Dict, Optional
+
+from django.conf import settings
+from django.template.loader import get_template, render_to_string
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = {
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+# Seconds a client is asked to wait before polling a report that is still rendering
+REPORT_RETRY_AFTER = 2
+
+
+class ReportError(Exception):
+    """Raised when a report cannot be rendered in the requested format"""
+
+
+def report_key(template_name: str, context: Dict[str, Any], report_format: str) -> str:
+    """Content hash of everything that goes into a rendered report"""
+    template_source = get_template(template_name).template.source
+    digest = hashlib.sha256()
+    for part in (template_name, template_source, report_format,
+                 json.dumps(context, sort_keys=True, default=str)):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def html_to_pdf(html: str, output) -> None:
+    from xhtml2pdf import pisa
+
+    status = pisa.CreatePDF(html, dest=output, encoding='utf-8')
+    if status.err:
+        raise ReportError(f"PDF rendering failed with {status.err} errors")
+
+
+class ReportRenderer:
+    def __init__(self, cache_dir: str, max_workers: int, max_files: int):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        os.makedirs(cache_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-render')
+        self._pending: Dict[str, Future] = {}
+        self._failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def path_for(self, key: str, report_format: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.{report_format}')
+
+    def fetch(self, template_name: str, context: Dict[str, Any], report_format: str) -> Optional[IO[bytes]]:
+        """
+        Return the rendered report open for reading, or None while it renders on the
+        pool; the first call for a report starts its render. Never blocks on a render.
+        Raises ReportError for a bad format, and once for a render that failed.
+        """
+        if report_format not in REPORT_FORMATS:
+            raise ReportError(f"Unknown report format '{report_format}', expected one of {', '.join(REPORT_FORMATS)}")
+        if report_format == 'pdf' and importlib.util.find_spec('xhtml2pdf') is None:
+            raise ReportError("PDF reports need the xhtml2pdf package")
+
+        key = report_key(template_name, context, report_format)
+        path = self.path_for(key, report_format)
+        future = None
+        with self._lock:
+            try:
+                report = open(path, 'rb')
+            except FileNotFoundError:
+                pass
+            else:
+                self.cache_hits += 1
+                self._touch(path)
+                return report
+            error = self._failed.pop(key, None)
+            if error is not None:
+                raise ReportError(f"Rendering the report failed: {error}")
+            if key in self._pending:
+                self.coalesced += 1
+            else:
+                # A report pruned before it was polled for simply renders again
+                future = self._pending[key] = self.executor.submit(
+                    self._render, key, template_name, context, report_format
+                )
+        if future is not None:
+            # Outside the lock: a render that already failed runs the callback right here
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return None
+
+    def _render(self, key, template_name, context, report_format) -> str:
+        html = render_to_string(template_name, context)
+        path = self.path_for(key, report_format)
+        # Write next to the final path and rename, so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                if report_format == 'pdf':
+                    html_to_pdf(html, output)
+                else:
+                    output.write(html.encode('utf-8'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        with self._lock:
+            self.renders += 1
+        self._prune()
+        return path
+
+    def _forget(self, key, future):
+        error = future.exception()
+        if error is not None:
+            logger.warning("Rendering report %s failed: %s", key, error)
+        with self._lock:
+            self._pending.pop(key, None)
+            if error is not None:
+                self.failures += 1
+                self._failed[key] = str(error)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _prune(self):
+        """Drop the least recently used reports beyond max_files"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir)
+                       if entry.is_file() and not entry.name.endswith('.tmp')]
+        except OSError:
+            return
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                logger.warning("Could not remove cached report %s", entry.path)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'renders': self.renders,
+                'cache_hits': self.cache_hits,
+                'coalesced': self.coalesced,
+                'failures': self.failures,
+                'in_flight': len(self._pending),
+            }
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_report_renderer() -> ReportRenderer:
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ReportRenderer(
+                cache_dir=getattr(settings, 'REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'audit-reports')),
+                max_workers=getattr(settings, 'REPORT_RENDER_WORKERS', 2),
+                max_files=getattr(settings, 'REPORT_CACHE_MAX_FILES', 500),
+            )
+        return _renderer
+
+
+def render_report(template_name: str, context: Dict[str, Any], report_format: str) -> Optional[IO[bytes]]:
+    """The report open for reading, or None while it renders (answer 202 and let the client poll)"""
+    return get_report_renderer().fetch(template_name, context, report_format)
@@ -0,0 +1,219 @@
+"""
+JWT authentication that does not load the user row on every request.
+
+Tokens from ClaimsRefreshToken carry the username, is_staff and (for user
+models that have one) role claims. ClaimsJWTAuthentication turns them into
+a ClaimsUser: those attributes, pk and isinstance checks are answered from
+the token, so permission checks and queries such as
+Audit.objects.filter(created_by=request.user) run without a user query. Any
+other attribute (email, is_superuser, ...) loads the row once, on first use.
+Tokens issued before the claims existed fall back to the usual lookup.
+
+Claims are a snapshot of when the user logged in or last refreshed.
+ClaimsTokenRefreshSerializer (SIMPLE_JWT's TOKEN_REFRESH_SERIALIZER) reloads
+the user on refresh, refuses inactive and deleted users, and issues the new
+access token with the claims read from the row. With JWT_REVOCATION on,
+saving or deleting a user revokes the tokens issued to them so far, refresh
+tokens included, and a revoked user has to log in again. The revocation time is kept in the
+JWT_REVOCATION_CACHE_ALIAS cache; a per-process cache such as locmem only
+revokes tokens in the process that made the change.
+"""
+
+import copy
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Time the claims were taken from the user row, copied into refreshed access tokens
+AUTH_TIME_CLAIM = 'auth_time'
+
+# User fields whose change makes earlier tokens stale
+CLAIM_SOURCE_FIELDS = {'username', 'is_staff', 'role', 'is_active', 'password'}
+
+
+def user_claims(user):
+    claims = {'username': user.get_username(), 'is_staff': user.is_staff}
+    if hasattr(user, 'role'):
+        claims['role'] = user.role
+    return claims
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """A refresh token whose access tokens carry the user claims"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_claims(user)
+        return token
+
+    def set_claims(self, user):
+        for claim, value in user_claims(user).items():
+            self[claim] = value
+        self[AUTH_TIME_CLAIM] = int(time.time())
+
+
+class ClaimsUser(SimpleLazyObject):
+    """A user built from token claims; the database row is loaded only when needed"""
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        model = get_user_model()
+        super().__init__(lambda: model.objects.get(**{api_settings.USER_ID_FIELD: user_id}))
+        # LazyObject forwards attribute writes to the wrapped user, so set these directly
+        self.__dict__.update(_token=token, _user_id=user_id, _model=model)
+
+    # Lets Django treat this as a user instance (e.g. filter(created_by=user)) without loading it
+    @property
+    def __class__(self):
+        return self.__dict__['_model']
+
+    @property
+    def _meta(self):
+        return self.__dict__['_model']._meta
+
+    @property
+    def pk(self):
+        return self.__dict__['_user_id']
+
+    id = pk
+
+    @property
+    def username(self):
+        return self.__dict__['_token']['username']
+
+    @property
+    def is_staff(self):
+        return self.__dict__['_token']['is_staff']
+
+    @property
+    def role(self):
+        return self.__dict__['_token'].get('role')
+
+    # Only active users get tokens, and refresh checks again; revocation covers live access tokens
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __getattr__(self, name):
+        # A freshly loaded user only has the model's attributes and _state, so probes such as
+        # hasattr(user, 'resolve_expression') in queryset filters are answered without loading it
+        if self._wrapped is empty and name != '_state' and not hasattr(self.__dict__['_model'], name):
+            raise AttributeError(name)
+        return super().__getattr__(name)
+
+    def __copy__(self):
+        if self._wrapped is empty:
+            return type(self)(self.__dict__['_token'])
+        return copy.copy(self._wrapped)
+
+    def __deepcopy__(self, memo):
+        if self._wrapped is empty:
+            return type(self)(self.__dict__['_token'])
+        return copy.deepcopy(self._wrapped, memo)
+
+    def __bool__(self):
+        return True
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def get_username(self):
+        return self.username
+
+    def __str__(self):
+        return self.username
+
+
+def revocation_cache():
+    return caches[getattr(settings, 'JWT_REVOCATION_CACHE_ALIAS', 'default')]
+
+
+def revocation_key(user_id):
+    return f'jwt-revoked:{user_id}'
+
+
+def revoke_user_tokens(user_id):
+    """Reject the tokens issued to a user so far, when JWT_REVOCATION is on"""
+    if not getattr(settings, 'JWT_REVOCATION', False):
+        return
+    # Refreshed access tokens keep the claims of their refresh token, so remember for both lifetimes
+    ttl = api_settings.REFRESH_TOKEN_LIFETIME + api_settings.ACCESS_TOKEN_LIFETIME
+    revocation_cache().set(revocation_key(user_id), int(time.time()), int(ttl.total_seconds()))
+
+
+def is_revoked(token) -> bool:
+    """Whether the user's tokens were revoked after this one took its claims"""
+    if not getattr(settings, 'JWT_REVOCATION', False):
+        return False
+    revoked_at = revocation_cache().get(revocation_key(token[api_settings.USER_ID_CLAIM]))
+    # Same-second tokens are kept, so a login that saves the user (a password rehash) keeps its token
+    issued_at = token.get(AUTH_TIME_CLAIM, token.get('iat'))
+    return revoked_at is not None and issued_at is not None and issued_at < revoked_at
+
+
+def revoke_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    """post_save receiver for the user model"""
+    if not created and (update_fields is None or CLAIM_SOURCE_FIELDS & set(update_fields)):
+        revoke_user_tokens(instance.pk)
+
+
+def revoke_on_user_delete(sender, instance, **kwargs):
+    """post_delete receiver for the user model"""
+    revoke_user_tokens(instance.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that builds request.user from the token claims"""
+
+    def get_user(self, validated_token):
+        if 'is_staff' not in validated_token or AUTH_TIME_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise AuthenticationFailed(_("Token contained no recognizable user identification"))
+
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(_("Token has been revoked"), code='token_revoked')
+        return ClaimsUser(validated_token)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that reloads the user, so new access tokens never carry stale claims"""
+
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if api_settings.USER_ID_CLAIM not in refresh:
+            raise AuthenticationFailed(_("Token contained no recognizable user identification"))
+        if is_revoked(refresh):
+            raise AuthenticationFailed(_("Token has been revoked"), code='token_revoked')
+
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(_("User not found or inactive"), code='user_inactive')
+        refresh.set_claims(user)
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    pass  # The token_blacklist app is not installed
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
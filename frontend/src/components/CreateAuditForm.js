@@ -17,7 +17,7 @@ import {
   Text,
 } from '@chakra-ui/react';
 import { useNavigate } from 'react-router-dom';
-import { createAudit } from '../services/audit';
+import { createAudit, waitForChecklistJob } from '../services/audit';
 
 const AUDIT_TYPES = [
   'IT Security',
@@ -78,8 +78,26 @@ const CreateAuditForm = () => {
     e.preventDefault();
     setIsLoading(true);
 
+    let response;
     try {
-      const response = await createAudit(formData);
+      response = await createAudit(formData);
+    } catch (error) {
+      toast({
+        title: 'Error',
+        description: error.message || 'Failed to create audit',
+        status: 'error',
+        duration: 5000,
+        isClosable: true,
+      });
+      setIsLoading(false);
+      return;
+    }
+
+    try {
+      // The checklist is generated by a background job; stay on the loading modal until it is done
+      if (response.job) {
+        await waitForChecklistJob(response.job.id);
+      }
       toast({
         title: 'Audit Created',
         description: 'Your audit has been created successfully.',
@@ -90,8 +108,8 @@ const CreateAuditForm = () => {
       navigate(`/audits/${response.id}`);
     } catch (error) {
       toast({
-        title: 'Error',
-        description: error.message || 'Failed to create audit',
+        title: 'Checklist generation failed',
+        description: `The audit was created, but its checklist could not be generated: ${error.message}`,
         status: 'error',
         duration: 5000,
         isClosable: true,
@@ -18,6 +18,7 @@ import {
 } from '@mui/material';
 import { ArrowBack as ArrowBackIcon } from '@mui/icons-material';
 import { auditApi } from '../../services/api';
+import type { ChecklistJobStatus } from '../../types/api';
 
 const industries = [
     'Manufacturing',
@@ -65,6 +66,7 @@ const CreateAudit: React.FC = () => {
     const [error, setError] = useState('');
     const [loading, setLoading] = useState(false);
     const [generatingChecklist, setGeneratingChecklist] = useState(false);
+    const [jobStatus, setJobStatus] = useState<ChecklistJobStatus>('pending');
 
     const handleChange = (e: React.ChangeEvent<HTMLInputElement>) => {
         const { name, value } = e.target;
@@ -79,19 +81,32 @@ const CreateAudit: React.FC = () => {
         setLoading(true);
         setError('');
 
+        // Show the checklist generation dialog
+        setGeneratingChecklist(true);
+        setJobStatus('pending');
+
+        let response;
         try {
-            // Show the checklist generation dialog
-            setGeneratingChecklist(true);
-            
-            // Create the audit and generate the checklist
-            const response = await auditApi.createAudit(formData);
-            
-            // Navigate to the audit details page with the new audit ID
-            navigate(`/audits/${response.id}`);
+            // Create the audit; its checklist is generated by a background job
+            response = await auditApi.createAudit(formData);
         } catch (err) {
             setError('Failed to create audit. Please try again.');
             console.error('Error creating audit:', err);
             setGeneratingChecklist(false);
+            setLoading(false);
+            return;
+        }
+
+        try {
+            if (response.job) {
+                await auditApi.waitForChecklistJob(response.job.id, (job) => setJobStatus(job.status));
+            }
+            // Navigate to the audit details page once its checklist exists
+            navigate(`/audits/${response.id}`);
+        } catch (err) {
+            setError(`The audit was created, but its checklist could not be generated: ${err instanceof Error ? err.message : err}`);
+            console.error('Error generating checklist:', err);
+            setGeneratingChecklist(false);
         } finally {
             setLoading(false);
         }
@@ -248,7 +263,9 @@ const CreateAudit: React.FC = () => {
                     <Box display="flex" flexDirection="column" alignItems="center" py={2}>
                         <CircularProgress size={60} />
                         <DialogContentText id="checklist-generation-dialog-description" sx={{ mt: 2 }}>
-                            Please wait while we generate your customized audit checklist...
+                            {jobStatus === 'pending'
+                                ? 'Your audit checklist is queued for generation...'
+                                : 'Please wait while we generate your customized audit checklist...'}
                         </DialogContentText>
                     </Box>
                 </DialogContent>
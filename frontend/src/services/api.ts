@@ -1,10 +1,14 @@
 import axios, { AxiosError } from 'axios';
-import type { LoginResponse, User, Audit, AdminInvitation, AuditResponse, AuditResult, Checklist, ChecklistItem } from '../types/api';
+import type { LoginResponse, User, Audit, ChecklistJob, AdminInvitation, AuditResponse, AuditResult, Checklist, ChecklistItem, ChecklistDelta, ChecklistBatchResult, AuditStats, AuditExportFormat, CursorPage } from '../types/api';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
 console.log('API URL:', API_URL);
 
+// How often and how long to poll a checklist generation job
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
 const api = axios.create({
     baseURL: API_URL,
     headers: {
@@ -147,23 +151,93 @@ export const userApi = {
     },
 };
 
+// Follow cursor pagination links until the last page
+const getAllPages = async <T>(url: string): Promise<T[]> => {
+    const items: T[] = [];
+    let next: string | null = url;
+    while (next) {
+        const response: { data: CursorPage<T> } = await api.get(next);
+        items.push(...response.data.results);
+        next = response.data.next;
+    }
+    return items;
+};
+
 // Audit API
 export const auditApi = {
     getAudits: async (): Promise<Audit[]> => {
-        const response = await api.get('/audits/list/');
+        return getAllPages<Audit>('/audits/list/');
+    },
+
+    getStats: async (refresh = false): Promise<AuditStats> => {
+        const response = await api.get('/audits/stats/', { params: refresh ? { refresh: true } : undefined });
+        return response.data;
+    },
+
+    exportAudits: async (format: AuditExportFormat, params?: { audit?: number[]; completed?: boolean }): Promise<Blob> => {
+        const response = await api.get(`/audits/export/${format}/`, {
+            params,
+            paramsSerializer: { indexes: null },
+            responseType: 'blob',
+        });
         return response.data;
     },
 
+    // The server answers 202 while the report renders; poll the same URL until the file arrives
+    getReport: async (id: number, format: 'pdf' | 'html' = 'pdf', timeoutMs = JOB_POLL_TIMEOUT_MS): Promise<Blob> => {
+        const deadline = Date.now() + timeoutMs;
+        for (;;) {
+            const response = await api.get(`/audits/list/${id}/report/${format}/`, { responseType: 'blob' });
+            if (response.status !== 202) {
+                return response.data;
+            }
+            const retryMs = (Number(response.headers['retry-after']) || 2) * 1000;
+            if (Date.now() + retryMs > deadline) {
+                throw new Error('The report is taking longer than expected to render');
+            }
+            await new Promise((resolve) => setTimeout(resolve, retryMs));
+        }
+    },
+
     getAudit: async (id: number): Promise<Audit> => {
         const response = await api.get(`/audits/list/${id}/`);
         return response.data;
     },
 
+    // Responds 202 with the audit and the job that generates its checklist, see waitForChecklistJob
     createAudit: async (data: Partial<Audit>): Promise<Audit> => {
         const response = await api.post('/audits/create/', data);
         return response.data;
     },
 
+    getChecklistJob: async (jobId: number): Promise<ChecklistJob> => {
+        const response = await api.get(`/audits/jobs/${jobId}/`);
+        return response.data;
+    },
+
+    // Polls until the job succeeds; rejects if it fails or is still pending after the timeout
+    waitForChecklistJob: async (
+        jobId: number,
+        onStatus?: (job: ChecklistJob) => void,
+        timeoutMs = JOB_POLL_TIMEOUT_MS
+    ): Promise<ChecklistJob> => {
+        const deadline = Date.now() + timeoutMs;
+        for (;;) {
+            const job = await auditApi.getChecklistJob(jobId);
+            onStatus?.(job);
+            if (job.status === 'succeeded') {
+                return job;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Checklist generation failed');
+            }
+            if (Date.now() + JOB_POLL_INTERVAL_MS > deadline) {
+                throw new Error('Checklist generation is taking longer than expected');
+            }
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+    },
+
     updateAudit: async (id: number, data: Partial<Audit>): Promise<Audit> => {
         const response = await api.patch(`/audits/list/${id}/`, data);
         return response.data;
@@ -211,8 +285,7 @@ export const auditApi = {
 
     getAllAudits: async (): Promise<Audit[]> => {
         try {
-            const response = await api.get('/audits/list/');
-            return Array.isArray(response.data) ? response.data : [];
+            return await getAllPages<Audit>('/audits/list/');
         } catch (error) {
             console.error('Error fetching audits:', error);
             return [];
@@ -264,6 +337,11 @@ export const checklistApi = {
     deleteChecklist: async (id: number): Promise<void> => {
         await api.delete(`/audits/checklists/${id}/`);
     },
+
+    batchUpdateChecklists: async (items: ChecklistDelta[]): Promise<ChecklistBatchResult> => {
+        const response = await api.patch('/audits/checklists/batch/', { items });
+        return response.data;
+    },
 };
 
 // Admin API
@@ -278,6 +356,12 @@ export const adminApi = {
         return response.data;
     },
 
+    // Addresses that already have an invitation come back in skipped
+    createInvitations: async (emails: string[]): Promise<{ created: AdminInvitation[]; skipped: string[] }> => {
+        const response = await api.post('/admin/admin-invitations/bulk/', { emails });
+        return response.data;
+    },
+
     validateToken: async (token: string): Promise<{ email: string }> => {
         const response = await api.get(`/admin/admin-invitations/validate_token/?token=${token}`);
         return response.data;
@@ -28,10 +28,52 @@ export const createAudit = async (auditData) => {
   }
 };
 
-export const getAudits = async () => {
+// How often and how long to poll a checklist generation job
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+export const getChecklistJob = async (jobId) => {
   try {
-    const response = await api.get('/audits/list/');
+    const response = await api.get(`/audits/jobs/${jobId}/`);
     return response.data;
+  } catch (error) {
+    throw new Error(error.response?.data?.message || 'Failed to fetch checklist job');
+  }
+};
+
+// createAudit responds with the job that generates the checklist; resolves once it succeeds
+export const waitForChecklistJob = async (jobId, timeoutMs = JOB_POLL_TIMEOUT_MS) => {
+  const deadline = Date.now() + timeoutMs;
+  for (;;) {
+    const job = await getChecklistJob(jobId);
+    if (job.status === 'succeeded') {
+      return job;
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Checklist generation failed');
+    }
+    if (Date.now() + JOB_POLL_INTERVAL_MS > deadline) {
+      throw new Error('Checklist generation is taking longer than expected');
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+};
+
+// Follow cursor pagination links until the last page
+const getAllPages = async (url) => {
+  const items = [];
+  let next = url;
+  while (next) {
+    const response = await api.get(next);
+    items.push(...response.data.results);
+    next = response.data.next;
+  }
+  return items;
+};
+
+export const getAudits = async () => {
+  try {
+    return await getAllPages('/audits/list/');
   } catch (error) {
     throw new Error(error.response?.data?.message || 'Failed to fetch audits');
   }
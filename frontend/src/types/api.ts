@@ -25,10 +25,22 @@ export interface Checklist {
     audit: number;
     item: string;
     is_completed: boolean;
+    completed_at?: string | null;
     notes: string;
     order: number;
 }
 
+export interface ChecklistDelta {
+    id: number;
+    is_completed?: boolean;
+    notes?: string;
+}
+
+export interface ChecklistBatchResult {
+    items: Checklist[];
+    audits: Pick<Audit, 'id' | 'is_completed' | 'completion_date' | 'total_items' | 'completed_items'>[];
+}
+
 export interface Audit {
     id: number;
     title: string;
@@ -43,7 +55,27 @@ export interface Audit {
     created_by: User;
     is_completed: boolean;
     completion_date: string | null;
+    total_items: number;
+    completed_items: number;
+    prompt_version: string;
     checklists: ChecklistItem[];
+    // Only on the create response; the checklist is generated by this job
+    job?: ChecklistJob;
+}
+
+export type ChecklistJobStatus = 'pending' | 'running' | 'succeeded' | 'failed';
+
+export interface ChecklistJob {
+    id: number;
+    audit: number;
+    status: ChecklistJobStatus;
+    force_refresh: boolean;
+    error: string;
+    rows_written: number;
+    materialize_ms: number | null;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
 }
 
 export interface AuditResponse {
@@ -69,6 +101,41 @@ export interface AuditResult {
     updated_at: string;
 }
 
+export interface BreakdownStats {
+    total: number;
+    completed: number;
+    completion_rate: number;
+    item_completion_rate: number;
+}
+
+export interface AuditStats {
+    audits: {
+        total: number;
+        completed: number;
+        in_progress: number;
+        not_started: number;
+        completion_rate: number;
+    };
+    items: {
+        total: number;
+        completed: number;
+        completion_rate: number;
+    };
+    by_industry: (BreakdownStats & { industry: string })[];
+    by_complexity: (BreakdownStats & { complexity_level: string })[];
+    timeline: { date: string; created: number; completed: number }[];
+    recent: Pick<Audit, 'id' | 'title' | 'updated_at' | 'is_completed' | 'total_items' | 'completed_items'>[];
+    generated_at: string;
+}
+
+export interface CursorPage<T> {
+    next: string | null;
+    previous: string | null;
+    results: T[];
+}
+
+export type AuditExportFormat = 'csv' | 'jsonl' | 'xlsx';
+
 export interface AdminInvitation {
     id: number;
     email: string;
@@ -13,7 +13,7 @@ echo ""
 
 echo "📦 Backend Dependencies:"
 echo "- psycopg2-binary (PostgreSQL adapter)"
-echo "- gunicorn (WSGI server)"
+echo "- gunicorn + uvicorn (ASGI server)"
 echo "- whitenoise (Static files)"
 echo "- dj-database-url (Database URL parser)"
 echo ""